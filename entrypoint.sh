@@ -8,6 +8,16 @@ while ! nc -z "$POSTGRES_HOST" "$POSTGRES_PORT"; do
 done
 echo "✅ Database is ready!"
 
+# Prometheus multiprocess mode: gunicorn's workers share their metrics
+# through this directory, and every start begins with empty worker files.
+if [ "$DJANGO_ENV" = "production" ]; then
+  export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-metrics}"
+fi
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 echo "📦 Applying database migrations..."
 python manage.py migrate --noinput
 
@@ -39,12 +49,21 @@ if [ "$#" -gt 0 ]; then
   echo "⚙️  Running custom command: $*"
   exec "$@"
 else
-  if [ "$DJANGO_ENV" = "production" ]; then
+  if [ "$DJANGO_ENV" = "production" ] && [ "$SERVER_MODE" = "asgi" ]; then
+    # Uvicorn workers run the async views (/api/async/*, live results streams)
+    # on an event loop, so one worker holds many concurrent connections.
+    echo "🚀 Starting Gunicorn with Uvicorn workers (ASGI production mode)..."
+    exec gunicorn online_poll_system.asgi:application \
+      --bind 0.0.0.0:8000 \
+      --worker-class uvicorn.workers.UvicornWorker \
+      --workers "${WEB_CONCURRENCY:-4}" \
+      --timeout 120
+  elif [ "$DJANGO_ENV" = "production" ]; then
     echo "🚀 Starting Gunicorn (production mode)..."
     exec gunicorn online_poll_system.wsgi:application \
       --bind 0.0.0.0:8000 \
-      --workers 4 \
-      --threads 2 \
+      --workers "${WEB_CONCURRENCY:-4}" \
+      --threads "${GUNICORN_THREADS:-2}" \
       --timeout 120
   else
     echo "🚀 Starting Django development server..."
@@ -0,0 +1,61 @@
+#!/bin/bash
+# Assertions against the nginx microcache harness (see docker-compose.yml).
+set -euo pipefail
+
+HERE="$(cd "$(dirname "$0")" && pwd)"
+BASE_URL="http://localhost:${NGINX_TEST_PORT:-8080}"
+COMPOSE="docker compose -f $HERE/docker-compose.yml"
+JAR="$(mktemp)"
+trap 'rm -f "$JAR"' EXIT
+FAILED=0
+
+cache_status() {
+  curl -s -o /dev/null -D - "$@" | tr -d '\r' | awk -F': ' 'tolower($1)=="x-cache-status" {print $2}'
+}
+
+expect() {
+  local what="$1" want="$2" got="$3"
+  if [[ " $want " == *" $got "* ]]; then
+    echo "✅ $what: $got"
+  else
+    echo "❌ $what: expected one of [$want], got '${got:-<none>}'"
+    FAILED=1
+  fi
+}
+
+echo "🗳️  Creating a poll..."
+IDS=$($COMPOSE exec -T web python manage.py shell -c "
+from polls.models import Poll, Option
+poll = Poll.objects.create(question='Microcache?')
+option = Option.objects.create(poll=poll, text='Yes')
+print(poll.id, option.id)" | tail -1)
+read -r POLL_ID OPTION_ID <<< "$IDS"
+POLL_URL="$BASE_URL/api/polls/$POLL_ID/"
+
+# -----------------------
+expect "first anonymous read" "MISS EXPIRED" "$(cache_status "$POLL_URL")"
+expect "second anonymous read" "HIT" "$(cache_status "$POLL_URL")"
+expect "browsable API is its own variant" "MISS EXPIRED" "$(cache_status -H 'Accept: text/html' "$POLL_URL")"
+
+# -----------------------
+echo -e "\n⏳ Waiting for the entry to expire, then firing 50 concurrent reads..."
+sleep 2
+STAMPEDE=$(for _ in $(seq 50); do cache_status "$POLL_URL" & done; wait)
+UPSTREAM=$(grep -cE "^(MISS|EXPIRED)$" <<< "$STAMPEDE" || true)
+expect "upstream requests during stampede" "0 1" "$UPSTREAM"
+
+# -----------------------
+echo -e "\n🔐 Credentials and sessions bypass the cache..."
+expect "read with Authorization" "BYPASS" "$(cache_status -H 'Authorization: Bearer test' "$POLL_URL")"
+
+curl -s -c "$JAR" -b "$JAR" -o /dev/null -X POST "$BASE_URL/api/votes/" \
+  -H "Content-Type: application/json" -d "{\"option\": $OPTION_ID}"
+expect "voter's read" "BYPASS" "$(cache_status -b "$JAR" "$POLL_URL")"
+TOTAL=$(curl -s -b "$JAR" "$POLL_URL" | python3 -c "import json, sys; print(json.load(sys.stdin)['total_votes'])")
+expect "voter sees own vote" "1" "$TOTAL"
+
+# -----------------------
+echo -e "\n📡 Live results stream is not cached..."
+expect "stream" "" "$(cache_status --max-time 1 "$BASE_URL/api/polls/$POLL_ID/stream/" || true)"
+
+exit $FAILED
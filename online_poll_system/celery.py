@@ -0,0 +1,15 @@
+"""
+Celery application for online_poll_system.
+
+Workers are started with ``celery -A online_poll_system worker`` and the
+periodic tasks in ``CELERY_BEAT_SCHEDULE`` with ``celery -A online_poll_system beat``.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll_system.settings')
+
+app = Celery('online_poll_system')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
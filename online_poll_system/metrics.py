@@ -0,0 +1,173 @@
+"""
+Prometheus metrics for every request, served at /metrics.
+
+``MetricsMiddleware`` records, per view (the URL name, e.g. ``vote-list``
+or ``login``), method and status class:
+
+- ``http_request_duration_seconds``: latency histogram;
+- ``http_request_db_queries``: SQL queries run for the request;
+- ``http_request_db_duration_seconds``: time spent in those queries.
+
+Queries are counted by an execute wrapper installed on every database
+connection when it is opened. It adds to the stats of the request in
+progress, found through a context variable, so queries a sync view runs
+in sync_to_async's thread under ASGI are counted too, and queries
+outside any request (Celery, management commands) are ignored.
+
+Under gunicorn each worker is a separate process. PROMETHEUS_MULTIPROC_DIR
+names an empty directory shared by the workers (entrypoint.sh sets it for
+production and clears it on start) and /metrics adds up all of them.
+
+/metrics answers staff users and requests bearing METRICS_TOKEN
+(``Authorization: Bearer <token>``, Prometheus' ``bearer_token``); anyone
+else gets a 403, whatever is in front of Django.
+"""
+import contextvars
+import hmac
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LABELS = ("view", "method", "status")
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+# Anything that resolved to no URL pattern, so 404 probes cannot add labels.
+UNMATCHED = "<unmatched>"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response, by view.",
+    LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL queries run per request, by view.",
+    LABELS,
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 25, 50, 100),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL queries per request, by view.",
+    LABELS,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+_request_stats = contextvars.ContextVar("request_db_stats", default=None)
+
+
+class QueryStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+def count_queries(execute, sql, params, many, context):
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.seconds += time.perf_counter() - start
+
+
+def _install(sender, connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+def labels(request, response):
+    match = getattr(request, "resolver_match", None)
+    view = (match.view_name or match.route) if match else UNMATCHED
+    method = request.method if request.method in METHODS else "other"
+    return view, method, f"{response.status_code // 100}xx"
+
+
+class MetricsMiddleware:
+    """Put first in MIDDLEWARE so the latency covers the rest of the stack."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_install, dispatch_uid="online_poll_system.metrics")
+        # Connections this thread opened before the middleware was loaded.
+        for connection in connections.all(initialized_only=True):
+            _install(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token, start = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        self._observe(request, response, stats, start)
+        return response
+
+    async def __acall__(self, request):
+        stats, token, start = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        self._observe(request, response, stats, start)
+        return response
+
+    @staticmethod
+    def _start():
+        stats = QueryStats()
+        return stats, _request_stats.set(stats), time.perf_counter()
+
+    @staticmethod
+    def _observe(request, response, stats, start):
+        values = labels(request, response)
+        REQUEST_DURATION.labels(*values).observe(time.perf_counter() - start)
+        REQUEST_QUERIES.labels(*values).observe(stats.queries)
+        REQUEST_DB_DURATION.labels(*values).observe(stats.seconds)
+
+
+def can_scrape(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_active and user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    scheme, _, given = request.headers.get("Authorization", "").partition(" ")
+    # As bytes: compare_digest refuses str with non-ASCII characters.
+    return (
+        bool(token) and scheme.lower() == "bearer"
+        and hmac.compare_digest(given.encode(), token.encode())
+    )
+
+
+def metrics_view(request):
+    """Everything recorded so far, in the Prometheus text format."""
+    if not can_scrape(request):
+        return HttpResponse(status=403)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,91 @@
+"""
+PostgreSQL backend drawing connections from a psycopg_pool.ConnectionPool.
+
+Django 4.2 has no built-in pool (``OPTIONS["pool"]`` arrived in 5.1), so
+this backend adds the same setting on top of the stock one: with
+``ENGINE = "online_poll_system.pooled_postgresql"`` and CONN_MAX_AGE = 0,
+Django's usual end-of-request close puts the connection back into the
+pool instead of closing it, and the next request takes a warm one.
+
+``OPTIONS["pool"]`` is passed to ConnectionPool as is (min_size,
+max_size, timeout, max_idle, max_lifetime, ...). The pool is per
+process and opened on first use, so forked gunicorn workers never share
+sockets. CONN_HEALTH_CHECKS makes the pool check a connection before
+handing it out. Once on Django 5.1+, switch ENGINE back to
+``django.db.backends.postgresql`` and keep the OPTIONS.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+if not base.is_psycopg3:
+    raise ImproperlyConfigured("The pooled PostgreSQL backend needs psycopg 3.")
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        pool = _pools.get(self.alias)
+        if pool is not None:
+            return pool
+        if self.settings_dict["CONN_MAX_AGE"] != 0:
+            raise ImproperlyConfigured(
+                "The pooled PostgreSQL backend needs CONN_MAX_AGE = 0; the pool keeps connections open."
+            )
+        from psycopg_pool import ConnectionPool
+
+        options = self.settings_dict["OPTIONS"].get("pool") or {}
+        conn_params = self.get_connection_params()
+        # Checked-in connections idle in autocommit; Django sets its own mode on checkout.
+        conn_params["autocommit"] = True
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = ConnectionPool(
+                    kwargs=conn_params,
+                    open=False,
+                    check=ConnectionPool.check_connection if self.settings_dict["CONN_HEALTH_CHECKS"] else None,
+                    name=f"django-{self.alias}",
+                    **options,
+                )
+        return _pools[self.alias]
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = base.IsolationLevel(
+                options.get("isolation_level", base.IsolationLevel.READ_COMMITTED)
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {options['isolation_level']} specified."
+            )
+        pool = self.pool
+        pool.open()
+        connection = pool.getconn()
+        if "isolation_level" in options:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            self.pool.putconn(self.connection)
+            self.connection = None
+
+    def close_pool(self):
+        with _pools_lock:
+            pool = _pools.pop(self.alias, None)
+        if pool is not None:
+            pool.close()
@@ -0,0 +1,206 @@
+"""
+Per-request SQL capture, N+1 detection and slow-query logging.
+
+Opt-in: on for every request with SQL_CAPTURE_ENABLED, or for a single
+request from a staff user that sends the ``X-Debug-SQL`` header. While
+a request is captured, every statement is recorded with its duration and
+the innermost project frame that ran it. At the end of the request:
+
+- statements slower than SQL_SLOW_QUERY_MS are logged, one JSON object
+  per line, to the ``online_poll_system.sql`` logger;
+- query shapes (the SQL with ``IN (%s, %s, ...)`` lists collapsed) run
+  more than SQL_REPEATED_QUERY_THRESHOLD times are logged the same way;
+  that is the signature of an N+1 loop;
+- requests made with the header get ``X-SQL-Queries``, ``X-SQL-Time-Ms``
+  and ``X-SQL-Repeated`` response headers.
+
+Tests can wrap a request in ``detect_n_plus_one()`` to fail on the same
+repeated shapes.
+"""
+import contextvars
+import json
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+HEADER = "X-Debug-SQL"
+
+logger = logging.getLogger("online_poll_system.sql")
+
+_IN_LIST = re.compile(r"\((?:%s|\?)(?:, (?:%s|\?))*\)")
+_TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+_capture = contextvars.ContextVar("sql_capture", default=None)
+
+
+def query_shape(sql):
+    """``sql`` with IN lists collapsed, so one query per batch size counts as one shape."""
+    return _IN_LIST.sub("(...)", sql)
+
+
+def _caller():
+    """``file:line in function`` of the innermost frame in the project's own code."""
+    base = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base) and filename != __file__ and "site-packages" not in filename:
+            return f"{filename[len(base) + 1:]}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class QueryCapture:
+    def __init__(self):
+        self.queries = []
+
+    def record(self, sql, seconds):
+        self.queries.append({"sql": sql, "ms": round(seconds * 1000, 3), "frame": _caller()})
+
+    @property
+    def total_ms(self):
+        return round(sum(query["ms"] for query in self.queries), 3)
+
+    def repeated(self, threshold):
+        """``[{"shape", "count", "frame"}]`` for shapes run more than ``threshold`` times."""
+        counts = Counter()
+        frames = {}
+        for query in self.queries:
+            if query["sql"].startswith(_TRANSACTION_CONTROL):
+                continue
+            shape = query_shape(query["sql"])
+            counts[shape] += 1
+            frames.setdefault(shape, query["frame"])
+        return [
+            {"shape": shape, "count": count, "frame": frames[shape]}
+            for shape, count in counts.most_common()
+            if count > threshold
+        ]
+
+    def slow(self, threshold_ms):
+        return [query for query in self.queries if query["ms"] >= threshold_ms]
+
+
+def capture_queries(execute, sql, params, many, context):
+    capture = _capture.get()
+    if capture is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        capture.record(sql, time.perf_counter() - start)
+
+
+def _install(sender, connection, **kwargs):
+    if capture_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(capture_queries)
+
+
+def install():
+    connection_created.connect(_install, dispatch_uid="online_poll_system.querylog")
+    for connection in connections.all(initialized_only=True):
+        _install(None, connection)
+
+
+@contextmanager
+def capturing():
+    """Capture the SQL run inside the block; yields the ``QueryCapture``."""
+    install()
+    capture = QueryCapture()
+    token = _capture.set(capture)
+    try:
+        yield capture
+    finally:
+        _capture.reset(token)
+
+
+@contextmanager
+def detect_n_plus_one(threshold=None):
+    """
+    Fail with AssertionError if a query shape runs more than ``threshold``
+    (default SQL_REPEATED_QUERY_THRESHOLD) times inside the block.
+    """
+    threshold = settings.SQL_REPEATED_QUERY_THRESHOLD if threshold is None else threshold
+    with capturing() as capture:
+        yield capture
+    repeated = capture.repeated(threshold)
+    if repeated:
+        raise AssertionError(
+            "Repeated queries (N+1?):\n" + "\n".join(
+                f"  {entry['count']}x from {entry['frame']}: {entry['shape']}" for entry in repeated
+            )
+        )
+
+
+def report(request, response, capture):
+    """Log slow and repeated queries; add the summary headers if they were asked for."""
+    context = {"method": request.method, "path": request.path}
+    for query in capture.slow(settings.SQL_SLOW_QUERY_MS):
+        logger.warning(json.dumps({"event": "slow_query", **context, **query}))
+    repeated = capture.repeated(settings.SQL_REPEATED_QUERY_THRESHOLD)
+    for entry in repeated:
+        logger.warning(json.dumps({"event": "repeated_query", **context, **entry}))
+
+    if HEADER in request.headers and _is_staff(request):
+        response["X-SQL-Queries"] = str(len(capture.queries))
+        response["X-SQL-Time-Ms"] = str(capture.total_ms)
+        response["X-SQL-Repeated"] = str(sum(entry["count"] for entry in repeated))
+
+
+def _is_staff(request):
+    # DRF copies the user it authenticated onto the Django request.
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+def _wanted(request):
+    return settings.SQL_CAPTURE_ENABLED or HEADER in request.headers
+
+
+class SQLCaptureMiddleware:
+    """
+    Captures SQL for opted-in requests. A header-only request is captured
+    before the user is known, but is only reported if the view's
+    authentication turned out to be a staff user.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not _wanted(request):
+            return self.get_response(request)
+        with capturing() as capture:
+            response = self.get_response(request)
+        self._finish(request, response, capture)
+        return response
+
+    async def __acall__(self, request):
+        if not _wanted(request):
+            return await self.get_response(request)
+        with capturing() as capture:
+            response = await self.get_response(request)
+        self._finish(request, response, capture)
+        return response
+
+    @staticmethod
+    def _finish(request, response, capture):
+        if settings.SQL_CAPTURE_ENABLED or _is_staff(request):
+            report(request, response, capture)
@@ -111,6 +111,34 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Prometheus request metrics at /metrics (see online_poll_system/metrics.py).
+# Under gunicorn, also set PROMETHEUS_MULTIPROC_DIR so all workers are counted
+# (entrypoint.sh does in production). Only staff users and scrapers sending
+# "Authorization: Bearer <METRICS_TOKEN>" may read it.
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, "online_poll_system.metrics.MetricsMiddleware")
+
+# Opt-in SQL capture and N+1 detection (online_poll_system/querylog.py): on
+# for every request with SQL_CAPTURE_ENABLED, or for one staff request that
+# sends an X-Debug-SQL header.
+SQL_CAPTURE_ENABLED = env.bool("SQL_CAPTURE_ENABLED", default=False)
+SQL_SLOW_QUERY_MS = env.int("SQL_SLOW_QUERY_MS", default=100)
+SQL_REPEATED_QUERY_THRESHOLD = env.int("SQL_REPEATED_QUERY_THRESHOLD", default=3)
+MIDDLEWARE.append("online_poll_system.querylog.SQLCaptureMiddleware")
+
+# Slow and repeated queries, one JSON object per line.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"message": {"format": "%(message)s"}},
+    "handlers": {"sql": {"class": "logging.StreamHandler", "formatter": "message"}},
+    "loggers": {
+        "online_poll_system.sql": {"handlers": ["sql"], "level": "WARNING", "propagate": False},
+    },
+}
+
 ROOT_URLCONF = "online_poll_system.urls"
 
 TEMPLATES = [
@@ -135,6 +163,8 @@ WSGI_APPLICATION = "online_poll_system.wsgi.application"
 # Database
 # ------------------------------------------------------------------
 USE_SQLITE = env.bool("USE_SQLITE", default=True)
+# "asgi" when served by Uvicorn workers (entrypoint.sh), else WSGI.
+SERVER_MODE = env("SERVER_MODE", default="wsgi")
 
 if USE_SQLITE:
     # Production / PythonAnywhere
@@ -154,8 +184,78 @@ else:
             "PASSWORD": env("POSTGRES_PASSWORD", default="secret"),
             "HOST": env("POSTGRES_HOST", default="localhost"),
             "PORT": env("POSTGRES_PORT", default="5432"),
+            # Keep each worker thread's connection between requests instead of
+            # paying a TCP + auth handshake per request; checked before reuse.
+            # Not under ASGI: sync code runs in whichever thread asgiref picks,
+            # so each of those threads would strand a connection of its own.
+            # Use DB_POOL there to reuse connections.
+            "CONN_MAX_AGE": 0 if SERVER_MODE == "asgi" else env.int("DB_CONN_MAX_AGE", default=60),
+            "CONN_HEALTH_CHECKS": True,
+        }
+    }
+    # Or share a bounded pool per process (online_poll_system/pooled_postgresql).
+    # Sized per gunicorn worker: the database sees up to
+    # WEB_CONCURRENCY x DB_POOL_MAX_SIZE connections per web container.
+    if env.bool("DB_POOL", default=False):
+        DATABASES["default"].update({
+            "ENGINE": "online_poll_system.pooled_postgresql",
+            # Connections go back to the pool after every request.
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": env.int("DB_POOL_MIN_SIZE", default=1),
+                    # One per gunicorn thread; requests never wait on each other.
+                    "max_size": env.int("DB_POOL_MAX_SIZE", default=env.int("GUNICORN_THREADS", default=2)),
+                    # Give up (500) rather than queue forever when the pool is exhausted.
+                    "timeout": env.float("DB_POOL_TIMEOUT", default=5.0),
+                    "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+                    "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=1800.0),
+                },
+            },
+        })
+
+# Read replica (polls/routers.py): poll, option and results reads go to
+# "replica"; writes, and a client's reads for DB_REPLICA_MAX_LAG_SECONDS
+# after it votes, go to "default".
+DB_REPLICA = env.bool("DB_REPLICA", default=False)
+DB_REPLICA_MAX_LAG_SECONDS = env.int("DB_REPLICA_MAX_LAG_SECONDS", default=5)
+if DB_REPLICA:
+    if USE_SQLITE:
+        # A copy of db.sqlite3 kept up to date outside Django.
+        replica = {"NAME": env("SQLITE_REPLICA_NAME", default=str(BASE_DIR / "db.replica.sqlite3"))}
+    else:
+        replica = {
+            "HOST": env("POSTGRES_REPLICA_HOST"),
+            "PORT": env("POSTGRES_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
         }
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        **replica,
+        # The test runner reads and writes a single database.
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_ROUTERS = ["polls.routers.PrimaryReplicaRouter"]
+
+# Run on every new SQLite connection, in this order (online_poll_system/sqlite.py).
+# WAL needs a local filesystem: use SQLITE_JOURNAL_MODE=delete if db.sqlite3
+# sits on a network share.
+SQLITE_PRAGMAS = {
+    # Milliseconds a writer waits for the write lock before "database is locked".
+    "busy_timeout": env.int("SQLITE_BUSY_TIMEOUT_MS", default=5000),
+    "journal_mode": env("SQLITE_JOURNAL_MODE", default="wal"),
+    # In WAL mode: no fsync per commit; a power cut can lose the last
+    # commits but never corrupts the database.
+    "synchronous": env("SQLITE_SYNCHRONOUS", default="normal"),
+    "mmap_size": env.int("SQLITE_MMAP_SIZE", default=128 * 1024 * 1024),
+    # Negative values are KiB: a 32 MB page cache per connection.
+    "cache_size": env.int("SQLITE_CACHE_SIZE", default=-32000),
+}
+
+# PostgreSQL only: partition polls_vote by voted_at month (see
+# polls/partitions.py). Applied by migration 0011 or
+# `manage.py vote_partitions convert`; ignored on SQLite.
+VOTE_PARTITIONING = env.bool("VOTE_PARTITIONING", default=False)
+VOTE_PARTITION_MONTHS_AHEAD = env.int("VOTE_PARTITION_MONTHS_AHEAD", default=3)
 
 # ------------------------------------------------------------------
 # Custom user model
@@ -206,8 +306,123 @@ REST_FRAMEWORK = {
         "polls.permissions.ReadOnlyOrAuthenticated",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Proxies in front of Django (nginx): client IPs for throttling are read
+    # from that far back in X-Forwarded-For, so clients cannot spoof them.
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=1),
 }
 
+# ------------------------------------------------------------------
+# Redis / Celery
+# ------------------------------------------------------------------
+REDIS_URL = env("REDIS_URL", default="")
+
+CELERY_BROKER_URL = env("CELERY_BROKER_URL", default=REDIS_URL or "memory://")
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULE = {
+    "flush-vote-buffer": {
+        "task": "polls.tasks.flush_vote_buffer",
+        "schedule": 1.0,
+    },
+    "compact-counter-shards": {
+        "task": "polls.tasks.compact_counter_shards",
+        "schedule": env.float("VOTE_COUNTER_COMPACT_SECONDS", default=10.0),
+    },
+    "close-polls": {
+        "task": "polls.tasks.close_polls",
+        "schedule": env.float("POLL_CLOSE_CHECK_SECONDS", default=30.0),
+    },
+    "ensure-vote-partitions": {
+        "task": "polls.tasks.ensure_vote_partitions",
+        "schedule": 24 * 60 * 60.0,
+    },
+}
+
+# ------------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------------
+# Redis in production; per-process LocMem when REDIS_URL is unset (tests, dev).
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Cached poll results are keyed by a per-poll version that every vote
+# bumps, so this only bounds how long superseded entries linger.
+POLL_RESULTS_CACHE_TIMEOUT = env.int("POLL_RESULTS_CACHE_TIMEOUT", default=300)
+
+# Cache-Control on anonymous poll reads (/api/polls/), sized for the 1-2s
+# nginx microcache in nginx.prod.conf.
+POLL_HTTP_CACHE_SECONDS = env.int("POLL_HTTP_CACHE_SECONDS", default=1)
+POLL_HTTP_CACHE_STALE_SECONDS = env.int("POLL_HTTP_CACHE_STALE_SECONDS", default=5)
+
+# ------------------------------------------------------------------
+# Live results (Server-Sent Events)
+# ------------------------------------------------------------------
+# Channel that carries "poll changed" notifications to stream subscribers:
+# "memory://" for a single process, a redis:// URL across processes/nodes.
+POLL_EVENTS_URL = env("POLL_EVENTS_URL", default=REDIS_URL or "memory://")
+POLL_STREAM_MAX_UPDATES_PER_SECOND = env.float("POLL_STREAM_MAX_UPDATES_PER_SECOND", default=2)
+POLL_STREAM_KEEPALIVE_SECONDS = env.int("POLL_STREAM_KEEPALIVE_SECONDS", default=15)
+# A stream ends after this long and the client reconnects; Django cannot
+# tell when a streaming client disconnects, so this bounds abandoned ones.
+POLL_STREAM_MAX_SECONDS = env.int("POLL_STREAM_MAX_SECONDS", default=300)
+
+# ------------------------------------------------------------------
+# Vote ingestion
+# ------------------------------------------------------------------
+# "sync" writes each vote in the request. "buffered" queues it in
+# VOTE_BUFFER_URL and answers 202; the flush_vote_buffer task writes
+# queued votes in batches. "memory://" keeps the buffer in-process and
+# is only meant for tests and single-process development servers.
+# "serialized" also writes each vote before answering, but hands it to one
+# writer thread per process that commits concurrent votes together
+# (polls/writer.py); meant for SQLite, which allows a single writer.
+VOTE_INGESTION_MODE = env("VOTE_INGESTION_MODE", default="sync")
+VOTE_BUFFER_URL = env("VOTE_BUFFER_URL", default=REDIS_URL or "memory://")
+VOTE_BUFFER_BATCH_SIZE = env.int("VOTE_BUFFER_BATCH_SIZE", default=500)
+VOTE_WRITER_BATCH_SIZE = env.int("VOTE_WRITER_BATCH_SIZE", default=200)
+# How long a request waits for the writer before answering 503.
+VOTE_WRITER_TIMEOUT_SECONDS = env.float("VOTE_WRITER_TIMEOUT_SECONDS", default=10)
+
+# How anonymous voters are told apart: "session" keys votes on the Django
+# session (one django_session row per voter); "token" on a random id in a
+# signed cookie / X-Voter-Token header, with no session storage at all.
+VOTER_IDENTITY = env("VOTER_IDENTITY", default="session")
+VOTER_COOKIE_NAME = "voter"
+VOTER_COOKIE_AGE = env.int("VOTER_COOKIE_AGE", default=365 * 24 * 60 * 60)
+
+# POST /api/votes/bulk/ limits
+VOTE_BULK_MAX_ITEMS = env.int("VOTE_BULK_MAX_ITEMS", default=10_000)
+VOTE_BULK_CHUNK_SIZE = env.int("VOTE_BULK_CHUNK_SIZE", default=1000)
+
+# Rows fetched per round trip (and sent per chunk) by the streaming
+# /api/polls/{id}/votes/export/.
+VOTE_EXPORT_CHUNK_SIZE = env.int("VOTE_EXPORT_CHUNK_SIZE", default=2000)
+
+# Token-bucket limits on casting votes (polls/throttling.py): "N/period"
+# allows a burst of N and refills N per period (s, min, hour, day). The IP
+# limit is generous because venues put many voters behind one address.
+# An empty value turns that limit off.
+VOTE_THROTTLE_RATES = {
+    "ip": env("VOTE_THROTTLE_IP_RATE", default="300/min"),
+    "voter": env("VOTE_THROTTLE_VOTER_RATE", default="30/min"),
+}
+
+# Sharded counters for hot polls: 0 counts votes straight into
+# Option.votes_count / Poll.total_votes; N > 0 spreads them over N shard
+# rows per option, which compact_counter_shards folds back periodically.
+VOTE_COUNTER_SHARDS = env.int("VOTE_COUNTER_SHARDS", default=0)
+VOTE_COUNTER_SHARD_CACHE_SECONDS = env.int("VOTE_COUNTER_SHARD_CACHE_SECONDS", default=1)
+
 # ------------------------------------------------------------------
 # Spectacular / Swagger
 # ------------------------------------------------------------------
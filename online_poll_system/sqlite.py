@@ -0,0 +1,26 @@
+# online_poll_system/sqlite.py
+"""
+Per-connection tuning for the SQLite deployment (USE_SQLITE).
+
+Every new SQLite connection gets the SQLITE_PRAGMAS from settings, in
+order. The defaults put the database in WAL mode, where readers never
+wait on the writer, and make writers queue on the write lock for
+busy_timeout milliseconds instead of failing with "database is locked".
+journal_mode is stored in the database file; the others only last as long
+as the connection, hence running them on every one.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    # The raw sqlite3 connection: these are not the application's queries,
+    # so keep them out of query counts and SQL capture.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+def install():
+    connection_created.connect(apply_pragmas, dispatch_uid="online_poll_system.sqlite")
@@ -15,6 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 # online_poll_system/urls.py
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
@@ -40,4 +41,10 @@ urlpatterns = [
     # Redirect bare domain → API root
     path("", RedirectView.as_view(url="/api/", permanent=True)),
 ]
+
+if settings.METRICS_ENABLED:
+    from .metrics import metrics_view
+
+    # Prometheus scrape target; keep it off the public internet (see nginx.prod.conf).
+    urlpatterns.append(path("metrics", metrics_view, name="metrics"))
 #testing out my git push 
\ No newline at end of file
@@ -14,10 +14,12 @@ class OptionInline(admin.TabularInline):
 @admin.register(Poll)
 class PollAdmin(admin.ModelAdmin):
     inlines = [OptionInline]
+    readonly_fields = ['total_votes']
 
 @admin.register(Option)
 class OptionAdmin(admin.ModelAdmin):
     inlines = [VoteInline]
+    readonly_fields = ['votes_count']
 
 # Remove Vote from standalone admin registration
 # @admin.register(Vote)
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class PollsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'polls'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from online_poll_system import sqlite
+        from . import partitions
+
+        sqlite.install()
+        post_migrate.connect(
+            partitions.prune_claims_after_flush,
+            sender=self,
+            dispatch_uid="polls.partitions.prune_claims_after_flush",
+        )
@@ -0,0 +1,281 @@
+# polls/async_views.py
+"""
+Async (ASGI) views that do not fit DRF's synchronous viewsets.
+
+Besides the results stream, this module serves native-async versions of
+the hottest endpoints under /api/async/: poll list/detail and vote casting.
+They return the same payloads as PollViewSet/VoteViewSet, but read through
+Django's async ORM, so under an ASGI server a request waiting on the
+database does not hold a thread. Writes that need a transaction (the vote
+INSERT plus its counter UPDATEs) still run as one sync_to_async call,
+because Django's async ORM cannot open transactions.
+"""
+import asyncio
+import base64
+import json
+import math
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import Throttled
+from rest_framework.pagination import _positive_int
+from rest_framework.settings import api_settings
+
+from .models import Poll, Option
+from .pagination import PollCursorPagination
+from .realtime import get_hub
+from .results import get_poll_results
+from .serializers import (
+    PollSerializer, OptionSerializer, DUPLICATE_VOTE_MESSAGE, POLL_CLOSED_MESSAGE,
+)
+from . import buffer, counters, routers, services, throttling, voters, writer
+
+
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+def _retry():
+    return f"retry: {settings.POLL_STREAM_KEEPALIVE_SECONDS * 1000}\n"
+
+
+async def _results_stream(poll_id):
+    # Django 4.2 does not stop a streaming response when the client goes
+    # away, so every stream ends after POLL_STREAM_MAX_SECONDS; a client
+    # still listening reconnects after the ``retry`` delay.
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + settings.POLL_STREAM_MAX_SECONDS
+    hub = get_hub()
+    queue = hub.subscribe(poll_id)
+    try:
+        yield _retry() + _sse("results", await sync_to_async(get_poll_results)(poll_id))
+        while (remaining := ends_at - loop.time()) > 0:
+            try:
+                results = await asyncio.wait_for(
+                    queue.get(), timeout=min(settings.POLL_STREAM_KEEPALIVE_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection.
+                yield ": keep-alive\n\n"
+            else:
+                yield _sse("results", results)
+    finally:
+        hub.unsubscribe(poll_id, queue)
+
+
+async def poll_stream(request, pk):
+    """
+    GET /api/polls/{id}/stream/ — Server-Sent Events feed of the poll's results.
+
+    Sends the current results on connect, then an ``event: results`` message
+    whenever they change, at most POLL_STREAM_MAX_UPDATES_PER_SECOND times a
+    second, for up to POLL_STREAM_MAX_SECONDS; EventSource clients then
+    reconnect. Only streams under ASGI; under WSGI it answers with a single
+    snapshot and a ``retry`` hint, so EventSource clients fall back to
+    reconnecting periodically instead of tying up a worker thread.
+    """
+    if not await Poll.objects.filter(pk=pk).aexists():
+        raise Http404("No Poll matches the given query.")
+
+    if isinstance(request, ASGIRequest):
+        content = _results_stream(pk)
+    else:
+        snapshot = await sync_to_async(get_poll_results)(pk)
+        content = [_retry(), _sse("results", snapshot)]
+
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Ask reverse proxies such as nginx not to buffer the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+# -----------------------
+# Async polls and votes
+# -----------------------
+
+class _PollFieldsSerializer(PollSerializer):
+    """PollSerializer without the nested options, which are fetched separately."""
+    options = None
+
+    class Meta(PollSerializer.Meta):
+        fields = [f for f in PollSerializer.Meta.fields if f != "options"]
+
+
+def _poll_payload(poll, options):
+    return {
+        **_PollFieldsSerializer(poll).data,
+        "options": OptionSerializer(options, many=True).data,
+    }
+
+
+async def _options_by_poll(poll_ids):
+    grouped = defaultdict(list)
+    async for option in Option.objects.filter(poll_id__in=poll_ids).order_by("id"):
+        grouped[option.poll_id].append(option)
+    return grouped
+
+
+async def _apply_pending(polls, options_by_poll):
+    if counters.sharding_enabled():
+        options = [option for group in options_by_poll.values() for option in group]
+        await sync_to_async(counters.apply_pending)(polls, options)
+
+
+def _encode_cursor(poll):
+    raw = f"{poll.pub_date.isoformat()}|{poll.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        pub_date, poll_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        pub_date, poll_id = parse_datetime(pub_date), int(poll_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return (pub_date, poll_id) if pub_date else None
+
+
+def _duplicate_vote():
+    return JsonResponse({api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_VOTE_MESSAGE]}, status=400)
+
+
+def _throttled(wait):
+    response = JsonResponse({"detail": Throttled(wait).detail}, status=429)
+    response["Retry-After"] = str(math.ceil(wait))
+    return response
+
+
+def _method_not_allowed(request):
+    return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+
+
+async def poll_list(request):
+    """GET /api/async/polls/ — newest polls first, keyset-paginated on (pub_date, id)."""
+    if request.method != "GET":
+        return _method_not_allowed(request)
+
+    # As PollCursorPagination.get_page_size: anything but a positive
+    # integer gets the default page size.
+    try:
+        page_size = _positive_int(
+            request.GET["page_size"], strict=True, cutoff=PollCursorPagination.max_page_size
+        )
+    except (KeyError, ValueError):
+        page_size = PollCursorPagination.page_size
+
+    polls = Poll.objects.order_by("-pub_date", "-id")
+    cursor = request.GET.get("cursor")
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return JsonResponse({"detail": "Invalid cursor"}, status=404)
+        pub_date, poll_id = position
+        polls = polls.filter(Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=poll_id))
+
+    page = [poll async for poll in polls[:page_size + 1]]
+    has_next = len(page) > page_size
+    page = page[:page_size]
+    options = await _options_by_poll([poll.pk for poll in page])
+    await _apply_pending(page, options)
+
+    next_url = None
+    if has_next:
+        query = request.GET.copy()
+        query["cursor"] = _encode_cursor(page[-1])
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+    return JsonResponse({
+        "next": next_url,
+        "results": [_poll_payload(poll, options[poll.pk]) for poll in page],
+    })
+
+
+async def poll_detail(request, pk):
+    """GET /api/async/polls/{id}/"""
+    if request.method != "GET":
+        return _method_not_allowed(request)
+    try:
+        poll = await Poll.objects.aget(pk=pk)
+    except Poll.DoesNotExist:
+        raise Http404("No Poll matches the given query.")
+    options = await _options_by_poll([poll.pk])
+    await _apply_pending([poll], options)
+    return JsonResponse(_poll_payload(poll, options[poll.pk]))
+
+
+async def vote_create(request):
+    """
+    POST /api/async/votes/ with ``{"option": id}`` — same rules and responses
+    as POST /api/votes/: anonymous, one vote per voter per poll.
+    """
+    if request.method != "POST":
+        return _method_not_allowed(request)
+
+    # Off the event loop: the buckets are a Redis round trip (or a cache
+    # lock), and the voter key may load the session.
+    wait = await sync_to_async(throttling.vote_wait)(request)
+    if wait:
+        return _throttled(wait)
+
+    try:
+        option_id = json.loads(request.body or b"{}").get("option")
+    except (ValueError, AttributeError):
+        return JsonResponse({"detail": "JSON parse error"}, status=400)
+    if option_id is None:
+        return JsonResponse({"option": ["This field is required."]}, status=400)
+    if not isinstance(option_id, int) or isinstance(option_id, bool):
+        return JsonResponse(
+            {"option": [f"Incorrect type. Expected pk value, received {type(option_id).__name__}."]},
+            status=400,
+        )
+
+    try:
+        option = await (
+            Option.objects.select_related("poll")
+            .only("id", "poll_id", "poll__closes_at")
+            .aget(pk=option_id)
+        )
+    except Option.DoesNotExist:
+        return JsonResponse(
+            {"option": [f'Invalid pk "{option_id}" - object does not exist.']}, status=400
+        )
+    if option.poll.is_closed():
+        return JsonResponse({api_settings.NON_FIELD_ERRORS_KEY: [POLL_CLOSED_MESSAGE]}, status=400)
+
+    if voters.token_mode():
+        voter_key = voters.get_voter_key(request)
+    else:
+        # May create a session, which is a database write.
+        voter_key = await sync_to_async(voters.get_voter_key)(request)
+
+    if buffer.buffering_enabled():
+        if not await sync_to_async(buffer.enqueue_vote)(option, voter_key):
+            return _duplicate_vote()
+        response = JsonResponse({"option": option.pk}, status=202)
+        return voters.attach_token(request, routers.stick_to_primary(response))
+
+    try:
+        if writer.serializing_enabled():
+            # Only waits on the writer thread, so keep it off the shared sync thread.
+            submit = sync_to_async(writer.get_vote_writer().submit, thread_sensitive=False)
+            vote = await submit(option, voter_key)
+        else:
+            vote = await sync_to_async(services.cast_vote)(option, voter_key)
+    except services.DuplicateVote:
+        return _duplicate_vote()
+    except writer.WriterTimeout as exc:
+        return JsonResponse({"detail": exc.detail}, status=exc.status_code)
+    response = JsonResponse({"id": vote.pk, "option": option.pk}, status=201)
+    return voters.attach_token(request, routers.stick_to_primary(response))
+
+
+# Anonymous, session-keyed voting: same CSRF stance as the DRF endpoint, which
+# only enforces CSRF for authenticated sessions. Set as an attribute because
+# Django 4.2's @csrf_exempt wraps the view in a sync function.
+vote_create.csrf_exempt = True
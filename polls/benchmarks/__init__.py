@@ -0,0 +1,6 @@
+"""
+Benchmarks for the polls hot paths.
+
+These are run through management commands against a throwaway database
+(see ``scratch_database``), never against the configured one.
+"""
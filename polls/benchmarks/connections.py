@@ -0,0 +1,73 @@
+# polls/benchmarks/connections.py
+"""
+What a request pays for its database connection, per connection mode.
+
+Each simulated request goes through Django's own connection lifecycle:
+``close_if_unusable_or_obsolete()`` (what runs on request_started and
+request_finished), then one trivial query. With CONN_MAX_AGE = 0 every
+request opens a new connection, paying the TCP and auth handshake.
+Persistent connections and the pool only pay it once, so the difference
+between the modes is the per-request connection overhead.
+"""
+import copy
+import time
+
+from django.db import connections
+from django.db.utils import load_backend
+
+from .timing import percentile
+
+MODES = {
+    "new": {"CONN_MAX_AGE": 0},
+    "persistent": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+    "pooled": {
+        "ENGINE": "online_poll_system.pooled_postgresql",
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "POOL": {"min_size": 1, "max_size": 2, "timeout": 5},
+    },
+}
+
+
+def _wrapper(mode):
+    settings_dict = copy.deepcopy(connections["default"].settings_dict)
+    overrides = dict(MODES[mode])
+    pool = overrides.pop("POOL", None)
+    settings_dict.update(overrides)
+    options = {k: v for k, v in settings_dict["OPTIONS"].items() if k != "pool"}
+    if pool:
+        options["pool"] = pool
+    settings_dict["OPTIONS"] = options
+    backend = load_backend(settings_dict["ENGINE"])
+    return backend.DatabaseWrapper(settings_dict, alias=f"bench_{mode}")
+
+
+def measure(mode, requests):
+    """Latency of ``requests`` simulated requests in ``mode``; returns one report row."""
+    connection = _wrapper(mode)
+    samples = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            connection.close_if_unusable_or_obsolete()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection.close()
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
+    return {
+        "mode": mode,
+        "requests": requests,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else 0.0,
+    }
+
+
+def run(modes, requests):
+    return [measure(mode, requests) for mode in modes]
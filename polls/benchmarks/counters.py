@@ -0,0 +1,92 @@
+# polls/benchmarks/counters.py
+"""
+Vote throughput on a single hot option, with and without counter shards.
+
+Every thread casts votes for the same option through the real write path
+(``services.cast_vote``: INSERT plus counter update in one transaction),
+so with unsharded counters they all serialize on that option's row and
+its poll's row. With N shards the increments spread over N rows.
+
+Contention on a row lock is what shards remove, so the effect shows on
+PostgreSQL. SQLite takes one lock for the whole database per write
+transaction, so there the numbers stay roughly flat whatever the shard
+count; run it with USE_SQLITE=true only as a baseline.
+"""
+import threading
+import time
+
+from django.db import OperationalError, connections
+from django.test import override_settings
+
+from polls import services
+from polls.counters import compact_shards
+from polls.models import Poll, Option
+
+
+def stress(shards, threads, votes_per_thread, max_retries=50):
+    """
+    Cast ``threads * votes_per_thread`` votes concurrently on one new
+    option with VOTE_COUNTER_SHARDS=``shards``, then compact and check
+    the stored count. Returns one report row.
+    """
+    poll = Poll.objects.create(question=f"Stress {shards} shard(s)?")
+    option = Option.objects.create(poll=poll, text="Hot option")
+    barrier = threading.Barrier(threads + 1)
+    lock = threading.Lock()
+    totals = {"cast": 0, "retries": 0, "failed": 0}
+
+    def worker(n):
+        cast = retries = failed = 0
+        try:
+            barrier.wait()
+            for i in range(votes_per_thread):
+                for attempt in range(max_retries + 1):
+                    try:
+                        services.cast_vote(option, f"stress-{poll.pk}-{n}-{i}")
+                    except OperationalError:
+                        # "database is locked" (SQLite) or a serialization
+                        # failure: retry like a client would.
+                        retries += 1
+                        continue
+                    cast += 1
+                    break
+                else:
+                    failed += 1
+        finally:
+            connections.close_all()
+            with lock:
+                totals["cast"] += cast
+                totals["retries"] += retries
+                totals["failed"] += failed
+
+    with override_settings(VOTE_COUNTER_SHARDS=shards):
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    compact_shards()
+    option.refresh_from_db()
+    poll.refresh_from_db()
+    return {
+        "shards": shards,
+        "threads": threads,
+        "votes": totals["cast"],
+        "seconds": round(elapsed, 3),
+        "votes_per_second": round(totals["cast"] / elapsed, 1) if elapsed else 0.0,
+        "retries": totals["retries"],
+        "failed": totals["failed"],
+        "counted": option.votes_count == poll.total_votes == totals["cast"],
+    }
+
+
+def run(shard_counts, threads, votes_per_thread):
+    """One ``stress`` row per entry of ``shard_counts`` (0 = plain counter columns)."""
+    return [
+        stress(shards, threads, votes_per_thread)
+        for shards in shard_counts
+    ]
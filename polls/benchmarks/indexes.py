@@ -0,0 +1,164 @@
+# polls/benchmarks/indexes.py
+"""
+Latency of the hot read queries with and without the index suite.
+
+The seeded data is copied into two throwaway sets of tables that differ
+only in their indexes. "before" has the indexes of migration 0005, the
+last one before the index suite: primary keys and Django's default
+foreign-key indexes. "after" has the suite from migrations 0006, 0008 and
+0009. Both schemas and the queries are spelled out in SQL here, so the
+comparison doesn't depend on what the models look like today.
+"""
+import random
+
+from django.db import connection
+
+from polls.models import Poll, Option, Vote
+
+from .timing import summarize, time_calls
+
+TABLES = {
+    "poll": (
+        "CREATE TABLE {p}poll (id bigint NOT NULL PRIMARY KEY, question varchar(200) NOT NULL, "
+        "pub_date timestamp with time zone NOT NULL)",
+        "INSERT INTO {p}poll (id, question, pub_date) SELECT id, question, pub_date FROM {poll}",
+    ),
+    "option": (
+        "CREATE TABLE {p}option (id bigint NOT NULL PRIMARY KEY, poll_id bigint NOT NULL, "
+        "text varchar(200) NOT NULL)",
+        "INSERT INTO {p}option (id, poll_id, text) SELECT id, poll_id, text FROM {option}",
+    ),
+    "vote": (
+        "CREATE TABLE {p}vote (id bigint NOT NULL PRIMARY KEY, poll_id bigint NOT NULL, "
+        "option_id bigint NOT NULL, session_key varchar(40), "
+        "voted_at timestamp with time zone NOT NULL)",
+        "INSERT INTO {p}vote (id, poll_id, option_id, session_key, voted_at) "
+        "SELECT id, poll_id, option_id, session_key, voted_at FROM {vote}",
+    ),
+}
+
+INDEXES = {
+    "before": [
+        "CREATE INDEX {p}option_poll ON {p}option (poll_id)",
+        "CREATE INDEX {p}vote_option ON {p}vote (option_id)",
+        # vote.poll arrived with 0008; this is the FK index it came with.
+        "CREATE INDEX {p}vote_poll ON {p}vote (poll_id)",
+    ],
+    "after": [
+        "CREATE INDEX {p}poll_pub_date_id ON {p}poll (pub_date, id)",
+        "CREATE INDEX {p}option_poll_id ON {p}option (poll_id, id)",
+        "CREATE INDEX {p}vote_option ON {p}vote (option_id)",
+        "CREATE INDEX {p}vote_voted_at_id ON {p}vote (voted_at, id)",
+        "CREATE UNIQUE INDEX {p}vote_poll_session ON {p}vote (poll_id, session_key)",
+    ],
+}
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def create_schema(cursor, name):
+    prefix = f"bench_{name}_"
+    tables = {
+        "poll": Poll._meta.db_table,
+        "option": Option._meta.db_table,
+        "vote": Vote._meta.db_table,
+    }
+    for create, copy in TABLES.values():
+        cursor.execute(create.format(p=prefix))
+        cursor.execute(copy.format(p=prefix, **tables))
+    for statement in INDEXES[name]:
+        cursor.execute(statement.format(p=prefix))
+    cursor.execute("ANALYZE")
+    return prefix
+
+
+def drop_schema(cursor, prefix):
+    for table in TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {prefix}{table}")
+
+
+def hot_queries(cursor, p, poll_ids, rng):
+    """Name -> zero-argument callable running one instance of each hot query."""
+    cursor.execute(f"SELECT id FROM {p}option")
+    option_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute(f"SELECT voted_at FROM {p}vote ORDER BY voted_at")
+    voted_at = [row[0] for row in cursor.fetchall()][::1000]
+
+    def run(sql, params=()):
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+    def some(ids, n):
+        return rng.sample(ids, min(n, len(ids)))
+
+    def poll_options_prefetch():
+        ids = some(poll_ids, 20)
+        return run(
+            f"SELECT id, poll_id, text FROM {p}option "
+            f"WHERE poll_id IN ({_placeholders(ids)}) ORDER BY id",
+            ids,
+        )
+
+    def vote_counts_by_option():
+        ids = some(option_ids, 100)
+        return run(
+            f"SELECT option_id, COUNT(id) FROM {p}vote "
+            f"WHERE option_id IN ({_placeholders(ids)}) GROUP BY option_id",
+            ids,
+        )
+
+    return {
+        # Duplicate-vote lookup (buffered mode / IntegrityError path)
+        "vote_by_poll_and_session": lambda: run(
+            f"SELECT 1 FROM {p}vote WHERE poll_id = %s AND session_key = %s LIMIT 1",
+            [rng.choice(poll_ids), f"bench-{rng.randrange(10**6)}"],
+        ),
+        # PollViewSet list: first page, then its prefetched options
+        "poll_list_page": lambda: run(
+            f"SELECT id, question, pub_date FROM {p}poll ORDER BY pub_date DESC, id DESC LIMIT 20"
+        ),
+        "poll_options_prefetch": poll_options_prefetch,
+        # VoteViewSet list: a page from the middle of the table
+        "vote_list_deep_page": lambda: run(
+            f"SELECT id, option_id, voted_at FROM {p}vote WHERE voted_at < %s "
+            f"ORDER BY voted_at DESC, id DESC LIMIT 20",
+            [rng.choice(voted_at)],
+        ),
+        # Results cache miss (polls.results.compute_poll_results)
+        "poll_results_group_by": lambda: run(
+            f"SELECT p.id, p.question, o.id, o.text, COUNT(v.id) FROM {p}poll p "
+            f"LEFT JOIN {p}option o ON o.poll_id = p.id LEFT JOIN {p}vote v ON v.option_id = o.id "
+            f"WHERE p.id = %s GROUP BY p.id, p.question, o.id, o.text ORDER BY o.id",
+            [rng.choice(poll_ids)],
+        ),
+        # rebuild_vote_counters batch
+        "vote_counts_by_option": vote_counts_by_option,
+    }
+
+
+def measure(name, poll_ids, repeat, seed=7):
+    with connection.cursor() as cursor:
+        prefix = create_schema(cursor, name)
+        try:
+            queries = hot_queries(cursor, prefix, poll_ids, random.Random(seed))
+            return {query: summarize(time_calls(fn, repeat)) for query, fn in queries.items()}
+        finally:
+            drop_schema(cursor, prefix)
+
+
+def compare(poll_ids, repeat):
+    """Time the hot queries on the "before" and "after" index sets over the seeded data."""
+    before = measure("before", poll_ids, repeat)
+    after = measure("after", poll_ids, repeat)
+
+    return {
+        name: {
+            "before_ms": before[name]["median_ms"],
+            "after_ms": after[name]["median_ms"],
+            "speedup": round(before[name]["median_ms"] / after[name]["median_ms"], 2)
+            if after[name]["median_ms"] else None,
+        }
+        for name in after
+    }
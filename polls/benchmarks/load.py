@@ -0,0 +1,228 @@
+# polls/benchmarks/load.py
+"""
+Load test of the public API: concurrent clients driving votes, the poll
+list, poll detail and results, with throughput, p50/p95/p99 latency and
+SQL queries per request for each scenario.
+
+Two drivers:
+
+- ``in_process_client``: Django's test client in this process, one per
+  worker thread. No server or network in the way, so the numbers isolate
+  the app, and the queries each request ran are counted.
+- ``http_client``: plain HTTP against a running server (e.g. gunicorn on
+  localhost), which includes the server and its workers. Query counts
+  are not visible from outside and are reported as null. Every request
+  comes from this one IP, so run the server with vote throttling off
+  (``VOTE_THROTTLE_IP_RATE=``); 429s are counted as errors, and also as
+  ``throttled``.
+
+Every request comes from a fresh visitor (no cookies), so each vote is a
+new voter and never a duplicate.
+"""
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test import Client, override_settings
+
+from polls.models import Option
+
+from .timing import percentile
+
+
+def _vote(rng, targets):
+    _, option_ids = rng.choice(targets)
+    return "POST", "/api/votes/", {"option": rng.choice(option_ids)}
+
+
+def _poll_list(rng, targets):
+    return "GET", "/api/polls/", None
+
+
+def _poll_detail(rng, targets):
+    return "GET", f"/api/polls/{rng.choice(targets)[0]}/", None
+
+
+def _results(rng, targets):
+    return "GET", f"/api/polls/{rng.choice(targets)[0]}/results/", None
+
+
+SCENARIOS = {
+    "vote": _vote,
+    "poll_list": _poll_list,
+    "poll_detail": _poll_detail,
+    "results": _results,
+}
+
+
+def in_process_settings():
+    """
+    Settings for an in-process run: the test client's host is allowed, and
+    vote throttling is off. Every test-client request comes from 127.0.0.1,
+    so the per-IP vote limit would otherwise turn most votes into 429s.
+    """
+    return override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        VOTE_THROTTLE_RATES={},
+    )
+
+
+def in_process_client():
+    """A ``send(method, path, data) -> (status, queries)`` through the test client."""
+    client = Client(raise_request_exception=False)
+
+    def send(method, path, data):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        client.cookies.clear()
+        with connection.execute_wrapper(count):
+            if method == "POST":
+                response = client.post(path, data, content_type="application/json")
+            else:
+                response = client.get(path, HTTP_ACCEPT="application/json")
+        return response.status_code, queries
+
+    return send
+
+
+def http_client(base_url, timeout=30):
+    """A ``send(method, path, data) -> (status, None)`` over HTTP to ``base_url``."""
+    base_url = base_url.rstrip("/")
+
+    def send(method, path, data):
+        request = urllib.request.Request(
+            base_url + path,
+            data=None if data is None else json.dumps(data).encode(),
+            method=method,
+            headers={"Accept": "application/json", "Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            return exc.code, None
+        except OSError:
+            return 0, None
+
+    return send
+
+
+def targets_from_db():
+    """``[(poll_id, [option_ids])]`` for every poll with options."""
+    targets = {}
+    for option_id, poll_id in Option.objects.order_by("id").values_list("id", "poll_id"):
+        targets.setdefault(poll_id, []).append(option_id)
+    return list(targets.items())
+
+
+def fetch_json(base_url, path, timeout=30):
+    request = urllib.request.Request(
+        base_url.rstrip("/") + path, headers={"Accept": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def targets_from_api(base_url):
+    """The same, read from the first page of ``GET /api/polls/`` on a running server."""
+    page = fetch_json(base_url, "/api/polls/")
+    return [
+        (poll["id"], [option["id"] for option in poll["options"]])
+        for poll in page["results"]
+        if poll["options"]
+    ]
+
+
+def run_scenario(name, make_client, targets, requests, concurrency, warmup=5, seed=0):
+    """
+    Send ``requests`` requests of scenario ``name`` from ``concurrency``
+    workers, each with a client from ``make_client()``. Returns one report row.
+    """
+    build = SCENARIOS[name]
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    latencies, queries = [], []
+    errors = throttled = 0
+
+    def worker(n, own_thread):
+        nonlocal errors, throttled
+        rng = random.Random(f"{seed}-{name}-{n}")
+        send = make_client()
+        mine, my_queries, my_errors, my_throttled = [], [], 0, 0
+        try:
+            if n == 0:
+                for _ in range(warmup):
+                    send(*build(rng, targets))
+            barrier.wait()
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                request = build(rng, targets)
+                start = time.perf_counter()
+                status, count = send(*request)
+                mine.append((time.perf_counter() - start) * 1000)
+                if count is not None:
+                    my_queries.append(count)
+                if not 200 <= status < 400:
+                    my_errors += 1
+                    my_throttled += status == 429
+        except BaseException:
+            barrier.abort()
+            raise
+        finally:
+            if own_thread:
+                connections.close_all()
+            with lock:
+                latencies.extend(mine)
+                queries.extend(my_queries)
+                errors += my_errors
+                throttled += my_throttled
+
+    started = []
+    barrier = threading.Barrier(concurrency, action=lambda: started.append(time.perf_counter()))
+    if concurrency == 1:
+        worker(0, own_thread=False)
+    else:
+        threads = [threading.Thread(target=worker, args=(n, True)) for n in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started[0]
+
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "throttled": throttled,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries_per_request": round(statistics.mean(queries), 2) if queries else None,
+    }
+
+
+def run(scenarios, make_client, targets, requests, concurrency, warmup=5):
+    """One ``run_scenario`` row per name in ``scenarios``, in order."""
+    if not targets:
+        raise ValueError("No polls with options to benchmark against.")
+    return [
+        run_scenario(name, make_client, targets, requests, concurrency, warmup)
+        for name in scenarios
+    ]
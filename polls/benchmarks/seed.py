@@ -0,0 +1,87 @@
+# polls/benchmarks/seed.py
+"""Synthetic datasets for the benchmarks."""
+import os
+import random
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from polls.models import Poll, Option, Vote
+
+
+@contextmanager
+def scratch_database(verbosity=0):
+    """
+    Create an empty, fully migrated copy of the default database (the
+    same one the test runner would use), point the connection at it for
+    the duration of the block, then drop it.
+
+    SQLite gets a temporary file rather than the test runner's in-memory
+    database, so benchmark threads with their own connections share it.
+    """
+    old_name = connection.settings_dict["NAME"]
+    test_settings = connection.settings_dict["TEST"]
+    old_test_name = test_settings.get("NAME")
+    tmpdir = None
+    if connection.vendor == "sqlite" and not old_test_name:
+        tmpdir = tempfile.mkdtemp(prefix="polls-bench-")
+        test_settings["NAME"] = os.path.join(tmpdir, "bench.sqlite3")
+
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings["NAME"] = old_test_name
+        if tmpdir:
+            # With the WAL and shared-memory files the database leaves behind.
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def seed(polls=100, options_per_poll=4, votes=100_000, batch_size=5000, rng=None):
+    """
+    Insert ``polls`` polls with ``options_per_poll`` options each and
+    ``votes`` votes from distinct sessions spread randomly over them,
+    then bring the stored counters in line. Returns the poll ids.
+    """
+    rng = rng or random.Random(42)
+
+    poll_objs = Poll.objects.bulk_create(
+        (Poll(question=f"Benchmark question {i}?") for i in range(polls)),
+        batch_size=batch_size,
+    )
+    Option.objects.bulk_create(
+        (
+            Option(poll=poll, text=f"Option {j}")
+            for poll in poll_objs
+            for j in range(options_per_poll)
+        ),
+        batch_size=batch_size,
+    )
+    option_pairs = list(Option.objects.values_list("id", "poll_id"))
+
+    for start in range(0, votes, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, votes)):
+            option_id, poll_id = rng.choice(option_pairs)
+            batch.append(Vote(poll_id=poll_id, option_id=option_id, session_key=f"bench-{i}"))
+        Vote.objects.bulk_create(batch)
+
+    refresh_counters()
+    return [poll.pk for poll in poll_objs]
+
+
+def refresh_counters():
+    """Recompute every stored counter in two UPDATE statements."""
+    Option.objects.update(votes_count=Coalesce(Subquery(
+        Vote.objects.filter(option=OuterRef("pk"))
+        .order_by().values("option").annotate(n=Count("id")).values("n")
+    ), 0))
+    Poll.objects.update(total_votes=Coalesce(Subquery(
+        Vote.objects.filter(poll=OuterRef("pk"))
+        .order_by().values("poll").annotate(n=Count("id")).values("n")
+    ), 0))
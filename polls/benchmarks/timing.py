@@ -0,0 +1,30 @@
+# polls/benchmarks/timing.py
+import statistics
+import time
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples`` (already in any order)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def time_calls(fn, repeat):
+    """Run ``fn`` ``repeat`` times and return per-call latencies in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    return {
+        "calls": len(samples),
+        "median_ms": round(statistics.median(samples), 3) if samples else 0.0,
+        "p95_ms": round(percentile(samples, 95), 3),
+    }
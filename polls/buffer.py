@@ -0,0 +1,222 @@
+# polls/buffer.py
+"""
+Write-behind buffer for votes (VOTE_INGESTION_MODE = "buffered").
+
+The request path only validates the vote, claims the (poll, session) pair
+and appends the vote to the buffer. ``flush_vote_buffer`` later drains the
+buffer in batches with ``bulk_create``. Claims give duplicate voters an
+immediate 400; the flush re-checks against the Vote table so one vote per
+session per poll still holds if a claim was lost, and the (poll,
+session_key) unique constraint fails the batch, to be retried, if a
+vote slipped in between the check and the insert.
+
+Entries are only removed from the buffer after their batch has committed,
+so a crashed flush is retried by the next run instead of dropping votes.
+"""
+import json
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Option, Vote
+from . import services
+
+
+class InMemoryVoteBuffer:
+    """Process-local buffer, used for ``memory://`` (tests and runserver)."""
+
+    def __init__(self):
+        self._entries = deque()
+        self._claims = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def claim(self, poll_id, session_key):
+        with self._lock:
+            if (poll_id, session_key) in self._claims:
+                return False
+            self._claims.add((poll_id, session_key))
+            return True
+
+    def release(self, pairs):
+        with self._lock:
+            self._claims.difference_update(pairs)
+
+    def push(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def peek(self, count):
+        with self._lock:
+            return [self._entries[i] for i in range(min(count, len(self._entries)))]
+
+    def ack(self, count):
+        with self._lock:
+            for _ in range(min(count, len(self._entries))):
+                self._entries.popleft()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @contextmanager
+    def flush_lock(self, wait=0):
+        if wait:
+            acquired = self._flush_lock.acquire(timeout=wait)
+        else:
+            acquired = self._flush_lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._flush_lock.release()
+
+
+class RedisVoteBuffer:
+    """Buffer shared by every web and worker process through one Redis list."""
+
+    QUEUE_KEY = "polls:vote-buffer"
+    CLAIMS_KEY = "polls:vote-buffer:claims:{poll_id}"
+    LOCK_KEY = "polls:vote-buffer:flush-lock"
+    CLAIM_TTL = 24 * 60 * 60
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def claim(self, poll_id, session_key):
+        key = self.CLAIMS_KEY.format(poll_id=poll_id)
+        pipe = self.client.pipeline()
+        pipe.sadd(key, session_key)
+        pipe.expire(key, self.CLAIM_TTL)
+        added, _ = pipe.execute()
+        return bool(added)
+
+    def release(self, pairs):
+        pipe = self.client.pipeline()
+        for poll_id, session_key in pairs:
+            pipe.srem(self.CLAIMS_KEY.format(poll_id=poll_id), session_key)
+        pipe.execute()
+
+    def push(self, entry):
+        self.client.rpush(self.QUEUE_KEY, json.dumps(entry))
+
+    def peek(self, count):
+        return [json.loads(raw) for raw in self.client.lrange(self.QUEUE_KEY, 0, count - 1)]
+
+    def ack(self, count):
+        self.client.ltrim(self.QUEUE_KEY, count, -1)
+
+    def __len__(self):
+        return self.client.llen(self.QUEUE_KEY)
+
+    @contextmanager
+    def flush_lock(self, wait=0):
+        lock = self.client.lock(self.LOCK_KEY, timeout=60)
+        acquired = lock.acquire(blocking=bool(wait), blocking_timeout=wait or None)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+
+
+@lru_cache(maxsize=None)
+def _buffer_for(url):
+    if url.startswith("memory://"):
+        return InMemoryVoteBuffer()
+    return RedisVoteBuffer(url)
+
+
+def get_vote_buffer():
+    return _buffer_for(settings.VOTE_BUFFER_URL)
+
+
+def buffering_enabled():
+    return settings.VOTE_INGESTION_MODE == "buffered"
+
+
+def enqueue_vote(option, session_key):
+    """
+    Claim the voter's slot on the poll and queue the vote.
+    Returns False if this session has already voted, or queued a vote, on the poll.
+    """
+    if Vote.objects.filter(poll_id=option.poll_id, session_key=session_key).exists():
+        return False
+    buffer = get_vote_buffer()
+    if not buffer.claim(option.poll_id, session_key):
+        return False
+    buffer.push({
+        "option": option.pk,
+        "poll": option.poll_id,
+        "session_key": session_key,
+        "voted_at": timezone.now().isoformat(),
+    })
+    return True
+
+
+def flush_vote_buffer(batch_size=None, wait=0):
+    """
+    Write queued votes to the database. Returns the number of votes
+    inserted, or None if another flush still held the lock after ``wait``
+    seconds (by default, don't wait).
+    """
+    buffer = get_vote_buffer()
+    batch_size = batch_size or settings.VOTE_BUFFER_BATCH_SIZE
+    inserted = 0
+
+    with buffer.flush_lock(wait) as acquired:
+        if not acquired:
+            return None
+        while True:
+            entries = buffer.peek(batch_size)
+            if not entries:
+                break
+            inserted += _write_batch(entries)
+            buffer.ack(len(entries))
+            buffer.release({(e["poll"], e["session_key"]) for e in entries})
+    return inserted
+
+
+def _write_batch(entries):
+    # Keep the first vote per (poll, session) within the batch ...
+    first = {}
+    for entry in entries:
+        first.setdefault((entry["poll"], entry["session_key"]), entry)
+
+    # ... and drop voters already in the table or options deleted since queueing.
+    existing = set(
+        Vote.objects.filter(
+            poll_id__in={poll for poll, _ in first},
+            session_key__in={key for _, key in first},
+        ).values_list("poll_id", "session_key")
+    )
+    live_options = set(
+        Option.objects.filter(pk__in={e["option"] for e in first.values()})
+        .values_list("pk", flat=True)
+    )
+    fresh = [
+        entry for pair, entry in first.items()
+        if pair not in existing and entry["option"] in live_options
+    ]
+    if not fresh:
+        return 0
+
+    with transaction.atomic():
+        Vote.objects.bulk_create(
+            Vote(
+                poll_id=entry["poll"],
+                option_id=entry["option"],
+                session_key=entry["session_key"],
+                voted_at=parse_datetime(entry["voted_at"]),
+            )
+            for entry in fresh
+        )
+        services.record_votes((entry["option"], entry["poll"]) for entry in fresh)
+    return len(fresh)
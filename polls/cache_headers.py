@@ -0,0 +1,50 @@
+# polls/cache_headers.py
+"""
+Cache-Control and Vary for poll reads, aimed at the nginx microcache in
+nginx.prod.conf.
+
+Anonymous GETs may be held by shared caches for POLL_HTTP_CACHE_SECONDS,
+and served stale for up to POLL_HTTP_CACHE_STALE_SECONDS more while one
+request refreshes them. Requests carrying credentials, a session cookie or
+a voter token (logged-in users, and anyone who has voted) get ``private, no-cache``
+instead: shared caches pass them through, so voters see their own vote
+straight away, and browsers revalidate with the ETag.
+"""
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .voters import has_voter_credentials
+
+CACHEABLE_STATUSES = {200, 304}
+
+
+def is_anonymous_request(request):
+    user = getattr(request, "user", None)
+    return (
+        not (user and user.is_authenticated)
+        and "HTTP_AUTHORIZATION" not in request.META
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not has_voter_credentials(request)
+    )
+
+
+class CacheHeadersMixin:
+    """Mark a viewset's successful GET/HEAD responses for shared caches."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in ("GET", "HEAD") or response.status_code not in CACHEABLE_STATUSES:
+            return response
+
+        if is_anonymous_request(request):
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=settings.POLL_HTTP_CACHE_SECONDS,
+                stale_while_revalidate=settings.POLL_HTTP_CACHE_STALE_SECONDS,
+            )
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        # JSON and the browsable API share URLs; credentials decide the above.
+        patch_vary_headers(response, ("Accept", "Authorization", "Cookie", "X-Voter-Token"))
+        return response
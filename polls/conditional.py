@@ -0,0 +1,64 @@
+# polls/conditional.py
+"""
+Conditional GETs for poll-scoped resources.
+
+A poll, its options and its results all change only when the poll's
+results version (Poll.version, see polls.results) is bumped, which the
+vote write path and ``services.poll_changed`` do in the transaction of
+every vote, option or poll edit. That version is the ETag: checking
+``If-None-Match`` costs one primary-key lookup (plus, for an option, one
+more to find its poll), so an unchanged resource gets ``304 Not
+Modified`` before any queryset or serializer work, in whichever process
+the request lands.
+
+Only an ETag is sent. The version is a counter, not a timestamp, so there
+is no honest Last-Modified to go with it. A response read from a replica
+is tagged with the replica's version, read alongside the body.
+"""
+from django.utils.cache import get_conditional_response
+
+from .results import get_poll_version
+
+
+def poll_etag(poll_id, version):
+    # Weak: JSON and the browsable API render the same version differently.
+    return f'W/"{poll_id}-{version}"'
+
+
+class ConditionalRetrieveMixin:
+    """
+    ETag support for ``retrieve`` (and any action routed through
+    ``conditional``) on viewsets whose objects belong to one poll.
+    """
+
+    # The version the ETag was built from, once ``conditional`` has read
+    # it, so ``respond`` needn't look it up again.
+    poll_version = None
+
+    def get_etag_poll_id(self):
+        """Poll id the requested object belongs to, or None if there is none."""
+        raise NotImplementedError
+
+    def conditional(self, request, respond):
+        poll_id = self.get_etag_poll_id()
+        if poll_id is None:
+            return respond()
+        # Read the version before the data, so the tag never claims a newer
+        # state than the body holds.
+        version = get_poll_version(poll_id)
+        if version is None:
+            return respond()
+        self.poll_version = version
+        etag = poll_etag(poll_id, version)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+        response = respond()
+        if response.status_code == 200:
+            response["ETag"] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        respond = super().retrieve
+        return self.conditional(request, lambda: respond(request, *args, **kwargs))
@@ -0,0 +1,144 @@
+# polls/counters.py
+"""
+Sharded vote counters (VOTE_COUNTER_SHARDS > 0).
+
+With a single counter column every vote on a viral poll updates the same
+Option and Poll rows, so concurrent votes queue on those rows' locks. With
+sharding on, the write path instead adds to one of N OptionCounterShard
+rows picked at random, and leaves the Option and Poll rows alone, the
+poll's results version included. The displayed count is then the stored
+column plus the option's shards:
+
+- readers add the pending shard sums, fetched once per poll and cached
+  under the poll's results version (like the results themselves), so a
+  cached sum is never older than the version a response is tagged with;
+- ``compact_shards`` (the compact_counter_shards task, run by beat) folds
+  the shards back into the columns, zeroes them and bumps the versions.
+  Cached results, ETags and live result streams therefore move on at each
+  compaction, VOTE_COUNTER_COMPACT_SECONDS apart, not at each vote.
+
+Turning sharding off again is safe: compaction keeps folding whatever
+the shards still hold.
+"""
+import random
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import Poll, Option, OptionCounterShard
+from .realtime import publish_poll_update
+from .results import get_poll_versions
+
+PENDING_KEY = "polls:poll:{poll_id}:pending-shards:{version}"
+
+
+def sharding_enabled():
+    return settings.VOTE_COUNTER_SHARDS > 0
+
+
+def add(option_id, poll_id, delta):
+    """Add ``delta`` votes to a random shard of ``option_id``."""
+    shard = random.randrange(settings.VOTE_COUNTER_SHARDS)
+    shards = OptionCounterShard.objects.filter(option_id=option_id, shard=shard)
+    if shards.update(count=F("count") + delta):
+        return
+    # First vote on this option since sharding was enabled: create all its
+    # shard rows at once. ignore_conflicts lets racing voters both get here.
+    OptionCounterShard.objects.bulk_create(
+        [
+            OptionCounterShard(option_id=option_id, poll_id=poll_id, shard=n)
+            for n in range(settings.VOTE_COUNTER_SHARDS)
+        ],
+        ignore_conflicts=True,
+    )
+    shards.update(count=F("count") + delta)
+
+
+def pending_counts(poll_ids):
+    """``{poll_id: {option_id: not-yet-compacted votes}}`` for ``poll_ids``."""
+    keys = {
+        PENDING_KEY.format(poll_id=poll_id, version=version): poll_id
+        for poll_id, version in get_poll_versions(poll_ids).items()
+    }
+    cached = cache.get_many(keys)
+    pending = {keys[key]: value for key, value in cached.items()}
+
+    missing = [poll_id for key, poll_id in keys.items() if key not in cached]
+    if missing:
+        fetched = defaultdict(dict)
+        rows = (
+            OptionCounterShard.objects.filter(poll_id__in=missing)
+            .values_list("poll_id", "option_id")
+            .annotate(n=Sum("count"))
+        )
+        for poll_id, option_id, n in rows:
+            if n:
+                fetched[poll_id][option_id] = n
+        fresh = {poll_id: dict(fetched[poll_id]) for poll_id in missing}
+        cache.set_many(
+            {key: fresh[poll_id] for key, poll_id in keys.items() if poll_id in fresh},
+            settings.VOTE_COUNTER_SHARD_CACHE_SECONDS,
+        )
+        pending.update(fresh)
+    return pending
+
+
+def apply_pending(polls=(), options=()):
+    """
+    Add pending shard counts to the in-memory counters of ``polls`` and
+    ``options`` so they render the full tally. For display only: never
+    save instances that went through here.
+    """
+    if not sharding_enabled():
+        return
+    polls, options = list(polls), list(options)
+    poll_ids = {poll.pk for poll in polls} | {option.poll_id for option in options}
+    if not poll_ids:
+        return
+    pending = pending_counts(poll_ids)
+    for poll in polls:
+        poll.total_votes += sum(pending.get(poll.pk, {}).values())
+    for option in options:
+        option.votes_count += pending.get(option.poll_id, {}).get(option.pk, 0)
+
+
+def compact_shards(option_ids=None):
+    """
+    Fold shard counts into Option.votes_count and Poll.total_votes and zero
+    the shards, all in one transaction. Returns the number of shards folded.
+    """
+    with transaction.atomic():
+        shards = OptionCounterShard.objects.exclude(count=0)
+        if option_ids is not None:
+            shards = shards.filter(option_id__in=option_ids)
+        rows = list(
+            shards.select_for_update()
+            .order_by("pk")
+            .values_list("pk", "option_id", "poll_id", "count")
+        )
+        if not rows:
+            return 0
+
+        per_option, per_poll = Counter(), Counter()
+        for _, option_id, poll_id, count in rows:
+            per_option[option_id] += count
+            per_poll[poll_id] += count
+        for option_id, n in per_option.items():
+            if n:
+                Option.objects.filter(pk=option_id).update(votes_count=F("votes_count") + n)
+        for poll_id, n in per_poll.items():
+            # Bumped even when n is 0: votes may have moved between options.
+            Poll.objects.filter(pk=poll_id).update(
+                total_votes=F("total_votes") + n, version=F("version") + 1
+            )
+        OptionCounterShard.objects.filter(pk__in=[pk for pk, *_ in rows]).update(count=0)
+
+        def publish():
+            for poll_id in per_poll:
+                publish_poll_update(poll_id)
+
+        transaction.on_commit(publish)
+    return len(rows)
@@ -0,0 +1,103 @@
+# polls/exports.py
+"""
+Streaming export of a poll's votes (GET /api/polls/{id}/votes/export/).
+
+Rows are read with ``.values_list().iterator(chunk_size=...)``, which on
+PostgreSQL is a server-side cursor: the worker holds one chunk at a time,
+however many votes the poll has, and the first bytes go out as soon as the
+first chunk arrives. Session keys are left out; they are live session
+cookies (or voter ids) and have no business in an analyst's spreadsheet.
+
+Under ASGI, Django drains a synchronous streaming iterator into a list
+before sending anything, so there the chunks are handed over through
+``async_chunks``, which pulls them one at a time off the event loop.
+"""
+import csv
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import BaseRenderer
+
+from .models import Vote
+
+COLUMNS = ("id", "option", "voted_at")
+
+
+def vote_rows(poll_id, chunk_size):
+    return (
+        Vote.objects.filter(poll_id=poll_id)
+        .order_by("id")
+        .values_list("id", "option_id", "voted_at")
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def csv_chunks(rows, rows_per_chunk):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for n, (vote_id, option_id, voted_at) in enumerate(rows, 1):
+        writer.writerow((vote_id, option_id, voted_at.isoformat()))
+        if n % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(rows, rows_per_chunk):
+    lines = []
+    for vote_id, option_id, voted_at in rows:
+        lines.append(json.dumps(
+            {"id": vote_id, "option": option_id, "voted_at": voted_at.isoformat()},
+            separators=(",", ":"),
+        ))
+        if len(lines) == rows_per_chunk:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def async_chunks(chunks):
+    """
+    Yield ``chunks`` to an ASGI server one at a time. Each ``next()`` runs
+    in the request's sync thread, the one whose connection holds the cursor.
+    """
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class CSVRenderer(BaseRenderer):
+    """Selects ``?format=csv``; exports stream themselves, so this only renders errors."""
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([("detail",), (data.get("detail", data),)])
+        return buffer.getvalue().encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Selects ``?format=ndjson``; exports stream themselves, so this only renders errors."""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (json.dumps(data, separators=(",", ":")) + "\n").encode(self.charset)
+
+
+STREAMS = {"csv": csv_chunks, "ndjson": ndjson_chunks}
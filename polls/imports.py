@@ -0,0 +1,266 @@
+# polls/imports.py
+"""
+Bulk import of polls, options and votes from another system
+(``manage.py import_polls``).
+
+Each kind comes from its own NDJSON or CSV file, read one record at a
+time, so memory use does not grow with the file. Field names follow the
+API (and the vote export):
+
+- polls:   ``id``, ``question``, ``pub_date``, ``closes_at``
+- options: ``id``, ``poll``, ``text``
+- votes:   ``option``, ``session_key``, ``voted_at``
+
+Poll and option ids are kept, so the files can reference each other;
+votes get new ids. Missing datetimes default to now, and naive ones are
+read in TIME_ZONE.
+
+Rows bypass the models (no save(), no full_clean()). On PostgreSQL they
+are streamed in with COPY, with the vote table's secondary indexes
+dropped for the load and rebuilt once at the end. Elsewhere they go in
+with bulk_create, batch by batch. Either way the whole import is one
+transaction: a bad record leaves nothing behind, so the same files can
+simply be imported again once it is fixed. (On SQLite that transaction
+holds the write lock, so votes wait for the import.) Stored counters are
+left alone; the command rebuilds them after the load.
+"""
+import csv
+import io
+import json
+import time
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Poll, Option, Vote
+from .results import bump_poll_version
+
+FORMATS = ("ndjson", "csv")
+
+
+class BadRecord(ValueError):
+    def __init__(self, path, line, message):
+        super().__init__(f"{path}, line {line}: {message}")
+
+
+def detect_format(path):
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise ValueError(f"Cannot tell the format of {path}; pass --format.")
+
+
+def read_records(path, fmt=None):
+    """Yield ``(line_number, record)`` from an NDJSON or CSV file. Empty CSV cells count as missing."""
+    fmt = fmt or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for line, row in enumerate(csv.DictReader(f), 2):
+                yield line, {key: value for key, value in row.items() if value != ""}
+            return
+        for line, text in enumerate(f, 1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as exc:
+                raise BadRecord(path, line, f"invalid JSON ({exc})")
+            if not isinstance(record, dict):
+                raise BadRecord(path, line, "expected a JSON object")
+            yield line, record
+
+
+def _required(record, field):
+    value = record.get(field)
+    if value is None:
+        raise ValueError(f"{field} is required")
+    return value
+
+
+def _int(record, field):
+    value = _required(record, field)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an integer, got {value!r}")
+
+
+def _datetime(record, field, default=None):
+    value = record.get(field)
+    if value is None:
+        return default
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError(f"{field} must be an ISO 8601 datetime, got {value!r}")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+# (model, columns, record -> row) per kind; columns are attnames.
+def _poll_row(record, now):
+    return (
+        _int(record, "id"),
+        str(_required(record, "question")),
+        _datetime(record, "pub_date", now),
+        _datetime(record, "closes_at"),
+        0,
+        0,
+    )
+
+
+def _option_row(record, now):
+    return (_int(record, "id"), _int(record, "poll"), str(_required(record, "text")), 0)
+
+
+def _vote_row(record, now):
+    session_key = record.get("session_key")
+    return (
+        None,  # poll_id, filled in from the option
+        _int(record, "option"),
+        None if session_key is None else str(session_key),
+        _datetime(record, "voted_at", now),
+    )
+
+
+KINDS = {
+    "polls": (Poll, ("id", "question", "pub_date", "closes_at", "total_votes", "version"), _poll_row),
+    "options": (Option, ("id", "poll_id", "text", "votes_count"), _option_row),
+    "votes": (Vote, ("poll_id", "option_id", "session_key", "voted_at"), _vote_row),
+}
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value):
+    # COPY's text format: NULL is \N, so it cannot be confused with ''.
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _copy(cursor, model, columns, rows):
+    """COPY ``rows`` into ``model``'s table (psycopg 3 or psycopg2)."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(map(_copy_value, row)) + "\n")
+    quote = connection.ops.quote_name
+    sql = (
+        f"COPY {quote(model._meta.db_table)} ({', '.join(quote(c) for c in columns)}) "
+        f"FROM STDIN"
+    )
+    raw = cursor.cursor
+    if hasattr(raw, "copy"):
+        with raw.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+    else:
+        buffer.seek(0)
+        raw.copy_expert(sql, buffer)
+
+
+def _bulk_create(model, columns, rows):
+    objs = [model(**dict(zip(columns, row))) for row in rows]
+    model.objects.bulk_create(objs)
+    if model is Poll:
+        # bulk_create stamps auto_now_add fields with the current time.
+        for obj, row in zip(objs, rows):
+            obj.pub_date = row[2]
+        Poll.objects.bulk_update(objs, ["pub_date"])
+
+
+def deferred_indexes(model):
+    """
+    ``[(name, definition)]`` of ``model``'s indexes that back no constraint
+    (PostgreSQL), i.e. the ones that can be dropped and rebuilt around a load.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.schemaname = current_schema() AND i.tablename = %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint c
+                  WHERE c.conindid = (quote_ident(i.schemaname) || '.' || quote_ident(i.indexname))::regclass
+              )
+            """,
+            [model._meta.db_table],
+        )
+        return cursor.fetchall()
+
+
+class Importer:
+    """
+    Loads the given files in dependency order. ``progress(kind, rows)``,
+    if given, is called after every batch with the running total.
+    """
+
+    def __init__(self, fmt=None, batch_size=10_000, defer_indexes=True, progress=None):
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.defer_indexes = defer_indexes
+        self.progress = progress
+        self.use_copy = connection.vendor == "postgresql"
+        self.touched_polls = set()
+
+    def run(self, polls=None, options=None, votes=None):
+        """Import the files. Returns ``[(kind, rows, seconds)]``."""
+        files = [(kind, path) for kind, path in
+                 (("polls", polls), ("options", options), ("votes", votes)) if path]
+        with transaction.atomic():
+            if not self.use_copy:
+                report = [self._load(kind, path) for kind, path in files]
+            else:
+                indexes = deferred_indexes(Vote) if votes and self.defer_indexes else []
+                with connection.cursor() as cursor:
+                    for name, _ in indexes:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+                report = [self._load(kind, path) for kind, path in files]
+                start = time.perf_counter()
+                with connection.cursor() as cursor:
+                    for _, definition in indexes:
+                        cursor.execute(definition)
+                    for sql in connection.ops.sequence_reset_sql(no_style(), [Poll, Option]):
+                        cursor.execute(sql)
+                if indexes:
+                    report.append(("indexes", len(indexes), time.perf_counter() - start))
+
+            for poll_id in self.touched_polls:
+                bump_poll_version(poll_id)
+        return report
+
+    def _rows(self, kind, path):
+        make_row = KINDS[kind][2]
+        option_polls = dict(Option.objects.values_list("id", "poll_id")) if kind == "votes" else None
+        now = timezone.now()
+        for line, record in read_records(path, self.fmt):
+            try:
+                row = make_row(record, now)
+                if option_polls is not None:
+                    poll_id = option_polls.get(row[1])
+                    if poll_id is None:
+                        raise ValueError(f"option {row[1]} does not exist")
+                    row = (poll_id,) + row[1:]
+            except ValueError as exc:
+                raise BadRecord(path, line, str(exc))
+            self.touched_polls.add(row[1] if kind == "options" else row[0])
+            yield row
+
+    def _load(self, kind, path):
+        model, columns, _ = KINDS[kind]
+        rows = self._rows(kind, path)
+        total = 0
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            while batch := list(islice(rows, self.batch_size)):
+                if self.use_copy:
+                    _copy(cursor, model, columns, batch)
+                else:
+                    _bulk_create(model, columns, batch)
+                total += len(batch)
+                if self.progress:
+                    self.progress(kind, total)
+        return kind, total, time.perf_counter() - start
@@ -0,0 +1,117 @@
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from polls.benchmarks.load import (
+    SCENARIOS,
+    http_client,
+    in_process_client,
+    in_process_settings,
+    run,
+    targets_from_api,
+    targets_from_db,
+)
+from polls.benchmarks.seed import scratch_database, seed
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test votes, poll list/detail and results with concurrent clients "
+        "and report throughput, p50/p95/p99 latency and queries per request. "
+        "By default runs in-process against a seeded throwaway copy of the "
+        "default database; with --url, drives a running server over HTTP."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(SCENARIOS),
+            help=f"Comma-separated subset of: {', '.join(SCENARIOS)}.",
+        )
+        parser.add_argument("--requests", type=int, default=500, help="Requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario.")
+        parser.add_argument("--polls", type=int, default=100)
+        parser.add_argument("--options-per-poll", type=int, default=4)
+        parser.add_argument("--votes", type=int, default=20_000)
+        parser.add_argument(
+            "--url",
+            help="Benchmark the server at this base URL (e.g. http://127.0.0.1:8000) using its own data.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        scenarios = options["scenarios"].split(",")
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}.")
+
+        args = (options["requests"], options["concurrency"], options["warmup"])
+        report = {
+            "commit": _git_commit(),
+            "concurrency": options["concurrency"],
+            "requests_per_scenario": options["requests"],
+        }
+
+        if options["url"]:
+            send = http_client(options["url"])
+            report.update(mode="http", url=options["url"])
+            try:
+                targets = targets_from_api(options["url"])
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Could not list polls at {options['url']}: {exc}")
+            self.stderr.write(f"Driving {options['url']} ({len(targets)} polls)...")
+            report["scenarios"] = run(scenarios, lambda: send, targets, *args)
+        else:
+            with scratch_database(), in_process_settings():
+                self.stderr.write(
+                    f"Seeding {options['votes']} votes over {options['polls']} polls "
+                    f"on {connection.vendor}..."
+                )
+                seed(
+                    polls=options["polls"],
+                    options_per_poll=options["options_per_poll"],
+                    votes=options["votes"],
+                )
+                report.update(mode="in-process", vendor=connection.vendor, dataset={
+                    "polls": options["polls"],
+                    "options_per_poll": options["options_per_poll"],
+                    "votes": options["votes"],
+                })
+                report["scenarios"] = run(scenarios, in_process_client, targets_from_db(), *args)
+
+        throttled = sum(row["throttled"] for row in report["scenarios"])
+        if throttled:
+            self.stderr.write(self.style.WARNING(
+                f"{throttled} request(s) were throttled (429) and count as errors; "
+                f"run the server with VOTE_THROTTLE_IP_RATE= to benchmark it unthrottled."
+            ))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'scenario':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'queries':>9}{'errors':>8}"
+        )
+        for row in report["scenarios"]:
+            queries = "-" if row["queries_per_request"] is None else row["queries_per_request"]
+            self.stdout.write(
+                f"{row['scenario']:<14}{row['throughput_rps']:>10.1f}{row['p50_ms']:>10.2f}"
+                f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{queries:>9}{row['errors']:>8}"
+            )
+
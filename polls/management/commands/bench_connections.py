@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from polls.benchmarks.connections import MODES, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database connection overhead against the "
+        "configured PostgreSQL server: a new connection per request, "
+        "persistent connections (CONN_MAX_AGE) and the psycopg pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes",
+            default=",".join(MODES),
+            help=f"Comma-separated subset of: {', '.join(MODES)}.",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Connection overhead is measured against PostgreSQL; set USE_SQLITE=false.")
+        modes = options["modes"].split(",")
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}.")
+
+        report = run(modes, options["requests"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"vendor": connection.vendor, "modes": report}, indent=2))
+            return
+
+        self.stdout.write(f"{'mode':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for row in report:
+            self.stdout.write(
+                f"{row['mode']:<12}{row['mean_ms']:>10.3f}{row['p50_ms']:>10.3f}"
+                f"{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}"
+            )
@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from polls.benchmarks.counters import run
+from polls.benchmarks.seed import scratch_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one poll option from many threads on a throwaway copy of the "
+        "default database and report vote throughput per counter shard count. "
+        "Meaningful against PostgreSQL; SQLite serializes all writers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shards",
+            default="0,1,4,16",
+            help="Comma-separated shard counts to try; 0 means plain counter columns.",
+        )
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--votes-per-thread", type=int, default=200)
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            shard_counts = [int(n) for n in options["shards"].split(",")]
+        except ValueError:
+            raise CommandError("--shards must be a comma-separated list of integers.")
+
+        with scratch_database():
+            self.stderr.write(
+                f"{options['threads']} threads x {options['votes_per_thread']} votes "
+                f"on {connection.vendor}..."
+            )
+            report = run(shard_counts, options["threads"], options["votes_per_thread"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"vendor": connection.vendor, "runs": report}, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'shards':>8}{'votes':>8}{'seconds':>10}{'votes/s':>10}{'retries':>9}{'counted':>9}"
+        )
+        for row in report:
+            self.stdout.write(
+                f"{row['shards']:>8}{row['votes']:>8}{row['seconds']:>10.3f}"
+                f"{row['votes_per_second']:>10.1f}{row['retries']:>9}{str(row['counted']):>9}"
+            )
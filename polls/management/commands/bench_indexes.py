@@ -0,0 +1,47 @@
+# polls/management/commands/bench_indexes.py
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from polls.benchmarks.indexes import compare
+from polls.benchmarks.seed import scratch_database, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway copy of the default database and report hot-query "
+        "latency on the indexes from before the polls index migrations (0005) "
+        "and on the current ones. Run once with USE_SQLITE=true and once "
+        "against PostgreSQL to compare backends."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--polls", type=int, default=1000)
+        parser.add_argument("--options-per-poll", type=int, default=4)
+        parser.add_argument("--votes", type=int, default=200_000)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            self.stderr.write(
+                f"Seeding {options['votes']} votes over {options['polls']} polls "
+                f"on {connection.vendor}..."
+            )
+            poll_ids = seed(
+                polls=options["polls"],
+                options_per_poll=options["options_per_poll"],
+                votes=options["votes"],
+            )
+            report = compare(poll_ids, options["repeat"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"vendor": connection.vendor, "queries": report}, indent=2))
+            return
+
+        self.stdout.write(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for name, row in report.items():
+            self.stdout.write(
+                f"{name:<28}{row['before_ms']:>12.3f}{row['after_ms']:>12.3f}{row['speedup'] or 0:>9.2f}x"
+            )
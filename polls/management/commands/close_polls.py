@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from polls.snapshots import close_due_polls
+
+
+class Command(BaseCommand):
+    help = (
+        "Freeze the results of every poll past its closes_at into a "
+        "PollResultSnapshot (what the close_polls Celery task runs)."
+    )
+
+    def handle(self, *args, **options):
+        closed = close_due_polls()
+        self.stdout.write(self.style.SUCCESS(f"Closed {len(closed)} poll(s)."))
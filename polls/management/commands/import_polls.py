@@ -0,0 +1,57 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from polls.imports import FORMATS, BadRecord, Importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load polls, options and votes from NDJSON or CSV files (see "
+        "polls/imports.py for the fields), then rebuild the stored vote "
+        "counters. Uses COPY on PostgreSQL and batched bulk_create elsewhere."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--polls", help="File of polls (id, question, pub_date, closes_at).")
+        parser.add_argument("--options", help="File of options (id, poll, text).")
+        parser.add_argument("--votes", help="File of votes (option, session_key, voted_at).")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of every file; by default guessed from each extension.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--keep-indexes",
+            action="store_true",
+            help="PostgreSQL: keep the vote indexes up during the load instead of rebuilding them after.",
+        )
+
+    def handle(self, *args, polls, options, votes, format, batch_size, keep_indexes, **opts):
+        if not (polls or options or votes):
+            raise CommandError("Nothing to import: pass --polls, --options and/or --votes.")
+
+        def progress(kind, rows):
+            if opts["verbosity"] > 1:
+                self.stderr.write(f"  {kind}: {rows} rows")
+
+        importer = Importer(
+            fmt=format,
+            batch_size=batch_size,
+            defer_indexes=not keep_indexes,
+            progress=progress,
+        )
+        try:
+            report = importer.run(polls=polls, options=options, votes=votes)
+        except (BadRecord, IntegrityError, OSError, ValueError) as exc:
+            raise CommandError(f"Import failed: {exc}")
+
+        for kind, rows, seconds in report:
+            if kind == "indexes":
+                self.stdout.write(f"Rebuilt {rows} vote index(es) in {seconds:.1f}s.")
+            else:
+                rate = rows / seconds if seconds else 0
+                self.stdout.write(f"Imported {rows} {kind} in {seconds:.1f}s ({rate:,.0f} rows/s).")
+
+        call_command("rebuild_vote_counters", batch_size=batch_size, stdout=self.stdout)
@@ -0,0 +1,119 @@
+# polls/management/commands/rebuild_vote_counters.py
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from polls import counters
+from polls.models import Poll, Option, OptionCounterShard, Vote
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Option.votes_count and Poll.total_votes from the Vote table "
+        "and clear any counter shards. Works in primary-key batches so it can run against a live database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted counters without writing them.",
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        fixed_options = self._reconcile(
+            Option, "votes_count", batch_size, dry_run,
+            lambda ids: Vote.objects.filter(option_id__in=ids)
+            .values_list("option_id")
+            .annotate(n=Count("id")),
+            # The recount covers what the shards held, so that is taken off them.
+            before_count=self._hold_shards,
+            on_batch=self._release_shards,
+        )
+        # Options are correct at this point, so poll totals can be summed from them.
+        fixed_polls = self._reconcile(
+            Poll, "total_votes", batch_size, dry_run,
+            lambda ids: Option.objects.filter(poll_id__in=ids)
+            .values_list("poll_id")
+            .annotate(n=Sum("votes_count")),
+        )
+
+        verb = "Found" if dry_run else "Fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {fixed_options} option counter(s) and {fixed_polls} poll total(s)."
+        ))
+
+    def _hold_shards(self, option_ids):
+        """
+        Lock the shard rows of ``option_ids`` before they are recounted and
+        return ``{shard pk: count}``. A vote whose increment would land on
+        one of them now commits after this batch, so it is neither counted
+        nor taken off its shard.
+        """
+        if counters.sharding_enabled():
+            # Create any missing rows now: an increment on a row created
+            # after the lock would be counted and kept on its shard.
+            OptionCounterShard.objects.bulk_create(
+                [
+                    OptionCounterShard(option_id=option_id, poll_id=poll_id, shard=n)
+                    for option_id, poll_id in Option.objects.filter(pk__in=option_ids)
+                    .values_list("pk", "poll_id")
+                    for n in range(settings.VOTE_COUNTER_SHARDS)
+                ],
+                ignore_conflicts=True,
+            )
+        return dict(
+            OptionCounterShard.objects.select_for_update()
+            .filter(option_id__in=option_ids)
+            .order_by("pk")
+            .values_list("pk", "count")
+        )
+
+    def _release_shards(self, held):
+        # Subtract what was seen rather than zero: without row locks
+        # (SQLite) an increment made since is kept.
+        by_count = defaultdict(list)
+        for pk, count in held.items():
+            if count:
+                by_count[count].append(pk)
+        for count, pks in by_count.items():
+            OptionCounterShard.objects.filter(pk__in=pks).update(count=F("count") - count)
+
+    def _reconcile(
+        self, model, field, batch_size, dry_run, count_rows, before_count=None, on_batch=None
+    ):
+        fixed = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    model.objects.select_for_update()
+                    .filter(pk__gt=last_pk)
+                    .order_by("pk")
+                    .only("pk", field)[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                ids = [obj.pk for obj in batch]
+
+                held = before_count(ids) if before_count and not dry_run else None
+                actual = dict(count_rows(ids))
+                drifted = []
+                for obj in batch:
+                    expected = actual.get(obj.pk) or 0
+                    if getattr(obj, field) != expected:
+                        setattr(obj, field, expected)
+                        drifted.append(obj)
+
+                if not dry_run:
+                    if drifted:
+                        model.objects.bulk_update(drifted, [field])
+                    if on_batch:
+                        on_batch(held)
+                fixed += len(drifted)
+        return fixed
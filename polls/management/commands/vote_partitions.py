@@ -0,0 +1,83 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from polls import partitions
+
+
+def _month(value):
+    try:
+        year, month = value.split("-")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise CommandError(f"Expected a month as YYYY-MM, got {value!r}.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage the monthly partitions of the Vote table on PostgreSQL: "
+        "'list' them, 'convert' the plain table, 'ensure' upcoming months "
+        "exist, or 'detach' old ones (optionally archiving or dropping them)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["list", "convert", "ensure", "detach"])
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.VOTE_PARTITION_MONTHS_AHEAD,
+            help="convert/ensure: how many future months to create.",
+        )
+        parser.add_argument(
+            "--before",
+            help="detach: detach partitions ending on or before this month (YYYY-MM).",
+        )
+        parser.add_argument(
+            "--archive-schema",
+            help="detach: move detached partitions into this schema.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="detach: drop detached partitions instead of keeping them.",
+        )
+
+    def handle(self, *args, action, months_ahead, before, archive_schema, drop, **options):
+        if not partitions.is_supported():
+            raise CommandError("Vote partitioning needs PostgreSQL; SQLite keeps a single table.")
+
+        if action == "convert":
+            if partitions.convert(months_ahead):
+                self.stdout.write(self.style.SUCCESS("Partitioned the vote table."))
+            else:
+                self.stdout.write("The vote table is already partitioned.")
+            return
+
+        if not partitions.is_partitioned():
+            raise CommandError("The vote table is not partitioned; run 'convert' first.")
+
+        if action == "list":
+            for name, lower, upper in partitions.list_partitions():
+                if lower is None and upper is None:
+                    span = "DEFAULT"
+                else:
+                    span = f"{lower or '...'} to {upper or '...'}"
+                self.stdout.write(f"{name:<32}{span}")
+        elif action == "ensure":
+            created = partitions.ensure_partitions(months_ahead)
+            self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partition(s)."))
+            for name in created:
+                self.stdout.write(f"  {name}")
+        else:
+            if not before:
+                raise CommandError("detach needs --before YYYY-MM.")
+            if drop and archive_schema:
+                raise CommandError("Use either --drop or --archive-schema, not both.")
+            detached = partitions.detach_partitions(
+                _month(before), archive_schema=archive_schema, drop=drop
+            )
+            verb = "Dropped" if drop else "Detached"
+            self.stdout.write(self.style.SUCCESS(f"{verb} {len(detached)} partition(s)."))
+            for name in detached:
+                self.stdout.write(f"  {name}")
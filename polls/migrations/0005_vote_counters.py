@@ -0,0 +1,44 @@
+# Generated by Django 4.2.24 on 2026-10-18 17:28
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Poll = apps.get_model('polls', 'Poll')
+    Option = apps.get_model('polls', 'Option')
+    Vote = apps.get_model('polls', 'Vote')
+
+    vote_counts = (
+        Vote.objects.filter(option=OuterRef('pk'))
+        .order_by().values('option').annotate(n=Count('id')).values('n')
+    )
+    Option.objects.update(votes_count=Coalesce(Subquery(vote_counts), 0))
+
+    option_sums = (
+        Option.objects.filter(poll=OuterRef('pk'))
+        .order_by().values('poll').annotate(n=Sum('votes_count')).values('n')
+    )
+    Poll.objects.update(total_votes=Coalesce(Subquery(option_sums), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_remove_vote_user_vote_session_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='option',
+            name='votes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poll',
+            name='total_votes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_vote_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['pub_date', 'id'], name='poll_pub_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['voted_at', 'id'], name='vote_voted_at_id_idx'),
+        ),
+    ]
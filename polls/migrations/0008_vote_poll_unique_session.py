@@ -0,0 +1,65 @@
+# Generated by Django 4.2.24 on 2026-10-18 17:41
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_vote_poll(apps, schema_editor):
+    Option = apps.get_model('polls', 'Option')
+    Vote = apps.get_model('polls', 'Vote')
+    Vote.objects.filter(poll__isnull=True).update(
+        poll_id=Subquery(Option.objects.filter(pk=OuterRef('option_id')).values('poll_id')[:1])
+    )
+
+
+def remove_duplicate_votes(apps, schema_editor):
+    """
+    The old check-then-insert could let concurrent requests record two votes
+    for one session. Keep the earliest and uncount the rest, otherwise the
+    unique constraint below cannot be created.
+    """
+    Poll = apps.get_model('polls', 'Poll')
+    Option = apps.get_model('polls', 'Option')
+    Vote = apps.get_model('polls', 'Vote')
+
+    duplicates = (
+        Vote.objects.exclude(session_key=None)
+        .values('poll_id', 'session_key')
+        .annotate(first_id=Min('id'), n=Count('id'))
+        .filter(n__gt=1)
+    )
+    for dup in duplicates.iterator():
+        extra = Vote.objects.filter(
+            poll_id=dup['poll_id'], session_key=dup['session_key']
+        ).exclude(pk=dup['first_id'])
+        for option_id, n in extra.values_list('option_id').annotate(n=Count('id')):
+            Option.objects.filter(pk=option_id).update(votes_count=F('votes_count') - n)
+        Poll.objects.filter(pk=dup['poll_id']).update(total_votes=F('total_votes') - (dup['n'] - 1))
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0007_vote_voted_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='poll',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='polls.poll'),
+        ),
+        migrations.RunPython(backfill_vote_poll, migrations.RunPython.noop),
+        migrations.RunPython(remove_duplicate_votes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='vote',
+            name='poll',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='polls.poll'),
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('poll', 'session_key'), name='unique_vote_per_session'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.24 on 2026-10-18 17:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_vote_poll_unique_session'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='option',
+            name='poll',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='options', to='polls.poll'),
+        ),
+        migrations.AlterField(
+            model_name='vote',
+            name='poll',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='polls.poll'),
+        ),
+        migrations.AddIndex(
+            model_name='option',
+            index=models.Index(fields=['poll', 'id'], name='option_poll_id_idx'),
+        ),
+    ]
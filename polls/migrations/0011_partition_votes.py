@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_votes(apps, schema_editor):
+    # Opt-in and PostgreSQL only; everywhere else polls_vote stays one table.
+    from polls import partitions
+
+    connection = schema_editor.connection
+    if settings.VOTE_PARTITIONING and partitions.is_supported(connection):
+        partitions.convert(settings.VOTE_PARTITION_MONTHS_AHEAD, connection=connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0010_option_counter_shards'),
+    ]
+
+    operations = [
+        # Not reversible in SQL, but harmless to re-run: convert() skips an
+        # already partitioned table.
+        migrations.RunPython(partition_votes, migrations.RunPython.noop),
+    ]
@@ -1,37 +1,126 @@
 # polls/models.py
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 
 class Poll(models.Model):
     question = models.CharField(max_length=255)
     pub_date = models.DateTimeField(auto_now_add=True)
+    # Denormalized tally, kept in step with Vote rows by polls.services
+    total_votes = models.PositiveIntegerField(default=0, editable=False)
+    # No more votes from this moment; None keeps the poll open for good.
+    closes_at = models.DateTimeField(null=True, blank=True)
+    # Results version: bumped with every change to the poll, its options or
+    # its votes. Cached results and ETags are keyed on it (polls.results).
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order for PollCursorPagination
+            models.Index(fields=['pub_date', 'id'], name='poll_pub_date_id_idx'),
+            # polls.snapshots.close_due_polls
+            models.Index(fields=['closes_at'], name='poll_closes_at_idx'),
+        ]
 
     def __str__(self):
         return self.question
 
+    def is_closed(self, now=None):
+        return self.closes_at is not None and self.closes_at <= (now or timezone.now())
+
 
 class Option(models.Model):
-    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='options')
+    # Indexed through Meta.indexes (poll, id) rather than a lone FK index
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='options', db_index=False)
     text = models.CharField(max_length=255)
+    # Denormalized tally, kept in step with Vote rows by polls.services
+    votes_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Options of a poll in display order: the PollViewSet prefetch
+            # and the results GROUP BY both filter on poll and sort by id.
+            models.Index(fields=['poll', 'id'], name='option_poll_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.text} (Poll: {self.poll.question})"
 
 
 class Vote(models.Model):
+    # Copied from option.poll on save so the database itself can enforce
+    # one vote per session per poll (see Meta.constraints). No separate
+    # index: the unique constraint's (poll, session_key) index leads with it.
+    poll = models.ForeignKey(
+        Poll, on_delete=models.CASCADE, related_name='votes', editable=False, db_index=False
+    )
     option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name='votes')
     # Store session key instead of user (since we dropped auth)
     session_key = models.CharField(max_length=40, null=True, blank=True)
-    voted_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: buffered votes keep the time they were cast, not flushed
+    voted_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['poll', 'session_key'], name='unique_vote_per_session'),
+        ]
+        indexes = [
+            # Keyset pagination order for VoteCursorPagination
+            models.Index(fields=['voted_at', 'id'], name='vote_voted_at_id_idx'),
+        ]
 
     def clean(self):
         if self.option is None:
             raise ValidationError("Vote must be linked to an Option.")
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        # No full_clean() here: it re-fetched the option and ran the unique
+        # check as extra queries. The constraint is enforced by the INSERT.
+        if self.option_id is None:
+            raise ValidationError("Vote must be linked to an Option.")
+        self.poll_id = self.option.poll_id
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Session {self.session_key} voted for {self.option.text}"
+
+
+class OptionCounterShard(models.Model):
+    """
+    One of VOTE_COUNTER_SHARDS partial tallies for an option (see polls.counters).
+    Spreading a hot option's increments over several rows keeps concurrent
+    votes from queueing on one row lock. Counts may go negative when votes
+    are removed; only the sum with Option.votes_count is meaningful.
+    """
+    # Indexed through the (option, shard) unique constraint
+    option = models.ForeignKey(
+        Option, on_delete=models.CASCADE, related_name='counter_shards', db_index=False
+    )
+    # Denormalized from option so readers can sum a whole poll's shards
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='counter_shards')
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['option', 'shard'], name='unique_counter_shard'),
+        ]
+
+    def __str__(self):
+        return f"Option {self.option_id} shard {self.shard}: {self.count}"
+
+
+class PollResultSnapshot(models.Model):
+    """
+    Final results of a closed poll, in the GET /results/ shape, written once
+    by polls.snapshots so reads of closed polls never count Vote rows again.
+    """
+    poll = models.OneToOneField(
+        Poll, on_delete=models.CASCADE, primary_key=True, related_name='snapshot'
+    )
+    results = models.JSONField()
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Results of poll {self.poll_id} at {self.taken_at:%Y-%m-%d %H:%M}"
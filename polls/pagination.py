@@ -0,0 +1,115 @@
+# polls/pagination.py
+"""
+Keyset (cursor) pagination for the polls API.
+
+Each page is fetched with ``WHERE (<key>, id) < <cursor position> ORDER BY
+... LIMIT page_size``, so page 1000 costs the same as page 1. The ordering
+of every class below is backed by a matching index in polls/models.py and
+ends in ``id``, so every row has a distinct position.
+"""
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+class KeysetPagination(CursorPagination):
+    """
+    DRF's CursorPagination only seeks on the first ordering field and steps
+    over rows that tie on it with an OFFSET. Here the cursor holds every
+    ordering field of the row it points at, and the page starts strictly
+    after that composite position, so no page needs an offset.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._after(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # One extra row tells whether there is a page beyond this one.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values)
+
+    def _after(self, ordering, position):
+        """
+        Rows strictly after ``position`` in ``ordering``:
+        ``a > x OR (a = x AND b > y) OR ...``, with < for descending fields.
+        """
+        values = json.loads(position)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError("cursor does not match the ordering")
+        condition = Q()
+        for i, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            ties = {prev.lstrip("-"): values[j] for j, prev in enumerate(ordering[:i])}
+            condition |= Q(**ties, **{f"{field.lstrip('-')}__{lookup}": values[i]})
+        return condition
+
+
+class PollCursorPagination(KeysetPagination):
+    ordering = ("-pub_date", "-id")
+
+
+class OptionCursorPagination(KeysetPagination):
+    ordering = ("id",)
+
+
+class VoteCursorPagination(KeysetPagination):
+    ordering = ("-voted_at", "-id")
@@ -0,0 +1,305 @@
+# polls/partitions.py
+"""
+Monthly range partitioning of the Vote table on PostgreSQL.
+
+With VOTE_PARTITIONING on, ``convert`` turns ``polls_vote`` into a table
+partitioned by ``voted_at``, one partition per calendar month:
+
+- The existing table is not copied. It is attached as the partition for
+  everything before next month, after a validated CHECK constraint lets
+  PostgreSQL skip the range scan (it still builds the old table's share
+  of the new primary key). Run it in a quiet period: the table is locked
+  for the duration.
+- New months are created ahead of time by ``ensure_partitions`` (daily
+  task, and ``manage.py vote_partitions ensure``). A DEFAULT partition
+  catches anything outside them, so a missed run never fails an insert;
+  the next run moves those rows into the month's new partition.
+- Old months can be detached, and moved to an archive schema or dropped,
+  with ``detach_partitions``.
+
+A unique constraint on a partitioned table must include the partition
+key, so (poll, session_key) can no longer be enforced on the table itself.
+A trigger keeps a narrow, unpartitioned ``polls_vote_claim`` table in step
+with the votes instead. It still raises a unique violation
+(IntegrityError) on a second vote, so services.cast_vote and the bulk and
+buffered paths behave exactly as before. Claims outlive archived
+partitions, so an archived voter still cannot vote twice. Claims of
+deleted polls are pruned after ``manage.py flush`` (``prune_claims``).
+
+The ORM is unaffected: Django keeps treating ``id`` as the primary key,
+which stays unique through its sequence. SQLite, and PostgreSQL with the
+setting off, keep the single table.
+"""
+import re
+from datetime import date, datetime, timezone
+
+from django.db import connection as default_connection, connections, transaction
+
+from .models import Vote
+
+CLAIMS_TABLE = "polls_vote_claim"
+LEGACY_SUFFIX = "_legacy"
+DEFAULT_SUFFIX = "_default"
+
+_BOUND = re.compile(r"FROM \((?P<lower>[^)]+)\) TO \((?P<upper>[^)]+)\)")
+
+
+def parent_table():
+    return Vote._meta.db_table
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{parent_table()}_y{month.year}m{month.month:02d}"
+
+
+def _bound(month):
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _parse_bound(raw):
+    if raw == "MINVALUE":
+        return None
+    # e.g. '2026-11-01 00:00:00+00': bounds are always UTC month starts.
+    return date.fromisoformat(raw.strip("'")[:10])
+
+
+def is_supported(connection=default_connection):
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned(connection=default_connection):
+    if not is_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [parent_table()])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(connection=default_connection):
+    """``[(name, lower, upper)]`` by lower bound; None for unbounded, both None for DEFAULT."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            """,
+            [parent_table()],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND.search(bound)
+        if match:
+            partitions.append((name, _parse_bound(match["lower"]), _parse_bound(match["upper"])))
+        else:
+            partitions.append((name, None, None))
+    return sorted(partitions, key=lambda p: (p[2] is None, p[1] or date.min))
+
+
+def convert_statements(first_month):
+    """
+    SQL turning the plain vote table into a partitioned one whose first
+    monthly partition starts at ``first_month``; older rows stay in the
+    old table, attached as the partition below that bound.
+    """
+    parent = parent_table()
+    legacy = parent + LEGACY_SUFFIX
+    sequence = f"{parent}_id_seq"
+    return [
+        f"ALTER TABLE {parent} RENAME TO {legacy}",
+        # Identity (or serial) columns cannot be attached as partitions;
+        # ids come from a sequence owned by the new parent instead.
+        f"ALTER TABLE {legacy} ALTER COLUMN id DROP IDENTITY IF EXISTS",
+        f"ALTER TABLE {legacy} ALTER COLUMN id DROP DEFAULT",
+        f"DROP SEQUENCE IF EXISTS {sequence}",
+        f"CREATE SEQUENCE {sequence}",
+        f"SELECT setval('{sequence}', COALESCE((SELECT max(id) FROM {legacy}), 0) + 1, false)",
+        f"CREATE TABLE {parent} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (voted_at)",
+        f"ALTER TABLE {parent} ALTER COLUMN id SET DEFAULT nextval('{sequence}')",
+        f"ALTER SEQUENCE {sequence} OWNED BY {parent}.id",
+        # The partition key must be part of the primary key.
+        f"ALTER TABLE {parent} ADD CONSTRAINT {parent}_pkey_part PRIMARY KEY (id, voted_at)",
+        f"ALTER TABLE {parent} ADD CONSTRAINT {parent}_option_fk FOREIGN KEY (option_id) "
+        f"REFERENCES polls_option (id) DEFERRABLE INITIALLY DEFERRED",
+        f"ALTER TABLE {parent} ADD CONSTRAINT {parent}_poll_fk FOREIGN KEY (poll_id) "
+        f"REFERENCES polls_poll (id) DEFERRABLE INITIALLY DEFERRED",
+        f"CREATE INDEX {parent}_part_option_idx ON {parent} (option_id)",
+        f"CREATE INDEX {parent}_part_poll_session_idx ON {parent} (poll_id, session_key)",
+        f"CREATE INDEX {parent}_part_voted_at_id_idx ON {parent} (voted_at, id)",
+        # Attach the old table without a scan: the validated CHECK proves the range.
+        f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_range "
+        f"CHECK (voted_at IS NOT NULL AND voted_at < {_bound(first_month)}) NOT VALID",
+        f"ALTER TABLE {legacy} VALIDATE CONSTRAINT {legacy}_range",
+        f"ALTER TABLE {parent} ATTACH PARTITION {legacy} "
+        f"FOR VALUES FROM (MINVALUE) TO ({_bound(first_month)})",
+        f"ALTER TABLE {legacy} DROP CONSTRAINT {legacy}_range",
+        f"CREATE TABLE {parent}{DEFAULT_SUFFIX} PARTITION OF {parent} DEFAULT",
+        # One vote per session per poll, enforced outside the partitions.
+        f"CREATE TABLE {CLAIMS_TABLE} ("
+        f"poll_id bigint NOT NULL, session_key varchar(40) NOT NULL, "
+        f"PRIMARY KEY (poll_id, session_key))",
+        f"INSERT INTO {CLAIMS_TABLE} (poll_id, session_key) "
+        f"SELECT poll_id, session_key FROM {legacy} WHERE session_key IS NOT NULL",
+        f"ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS unique_vote_per_session",
+        f"""
+        CREATE FUNCTION {CLAIMS_TABLE}_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') AND OLD.session_key IS NOT NULL THEN
+                DELETE FROM {CLAIMS_TABLE}
+                WHERE poll_id = OLD.poll_id AND session_key = OLD.session_key;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.session_key IS NOT NULL THEN
+                INSERT INTO {CLAIMS_TABLE} (poll_id, session_key)
+                VALUES (NEW.poll_id, NEW.session_key);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """,
+        f"CREATE TRIGGER {CLAIMS_TABLE}_sync "
+        f"AFTER INSERT OR DELETE OR UPDATE OF poll_id, session_key ON {parent} "
+        f"FOR EACH ROW EXECUTE FUNCTION {CLAIMS_TABLE}_sync()",
+    ]
+
+
+def create_partition_statement(month):
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {parent_table()} "
+        f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(add_months(month, 1))})"
+    )
+
+
+def move_into_partition_statements(month):
+    """
+    SQL creating ``month``'s partition when the DEFAULT partition already
+    holds rows for it, which a plain CREATE ... PARTITION OF refuses: the
+    rows are moved into a standalone table that is then attached.
+    """
+    parent = parent_table()
+    name = partition_name(month)
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    return [
+        # Votes wait until the rows (and their claims) are in place.
+        f"LOCK TABLE {parent} IN SHARE ROW EXCLUSIVE MODE",
+        f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)",
+        f"WITH moved AS (DELETE FROM {parent}{DEFAULT_SUFFIX} "
+        f"WHERE voted_at >= {lower} AND voted_at < {upper} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        # The DELETE fired the claims trigger; the votes still exist.
+        f"INSERT INTO {CLAIMS_TABLE} (poll_id, session_key) "
+        f"SELECT poll_id, session_key FROM {name} WHERE session_key IS NOT NULL "
+        f"ON CONFLICT DO NOTHING",
+        f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})",
+    ]
+
+
+def _default_has_rows(cursor, month):
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {parent_table()}{DEFAULT_SUFFIX} "
+        f"WHERE voted_at >= {_bound(month)} AND voted_at < {_bound(add_months(month, 1))})"
+    )
+    return cursor.fetchone()[0]
+
+
+def convert(months_ahead=3, today=None, connection=default_connection):
+    """Partition the vote table in one transaction. Returns False if it already was."""
+    if is_partitioned(connection):
+        return False
+    first_month = add_months(month_start(today or datetime.now(timezone.utc).date()), 1)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for statement in convert_statements(first_month):
+            cursor.execute(statement)
+        for n in range(months_ahead):
+            cursor.execute(create_partition_statement(add_months(first_month, n)))
+    return True
+
+
+def ensure_partitions(months_ahead=3, today=None, connection=default_connection):
+    """
+    Create any missing monthly partitions from the current month up to
+    ``months_ahead`` months ahead. Returns the names created; a no-op
+    unless the table is partitioned.
+    """
+    if not is_partitioned(connection):
+        return []
+    this_month = month_start(today or datetime.now(timezone.utc).date())
+    existing = list_partitions(connection)
+    covered_until = max((upper for _, _, upper in existing if upper), default=None)
+    has_default = any(lower is None and upper is None for _, lower, upper in existing)
+
+    created = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for n in range(months_ahead + 1):
+            month = add_months(this_month, n)
+            if covered_until and month < covered_until:
+                continue
+            # Votes for a month with no partition yet landed in DEFAULT.
+            if has_default and _default_has_rows(cursor, month):
+                statements = move_into_partition_statements(month)
+            else:
+                statements = [create_partition_statement(month)]
+            for statement in statements:
+                cursor.execute(statement)
+            created.append(partition_name(month))
+    return created
+
+
+def detach_partitions(before, archive_schema=None, drop=False, connection=default_connection):
+    """
+    Detach every monthly partition that ends on or before ``before`` (a
+    month start). Detached tables are moved to ``archive_schema``, dropped
+    with ``drop``, or otherwise left in place as plain tables. Returns the
+    names detached.
+    """
+    if not is_partitioned(connection):
+        return []
+    quote = connection.ops.quote_name
+    old = [
+        name for name, lower, upper in list_partitions(connection)
+        if upper is not None and upper <= before
+    ]
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if archive_schema and old:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {quote(archive_schema)}")
+        for name in old:
+            cursor.execute(f"ALTER TABLE {parent_table()} DETACH PARTITION {quote(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {quote(name)}")
+            elif archive_schema:
+                cursor.execute(f"ALTER TABLE {quote(name)} SET SCHEMA {quote(archive_schema)}")
+    return old
+
+
+def prune_claims(connection=default_connection):
+    """
+    Delete the claims of polls that no longer exist. ``manage.py flush``
+    truncates polls_vote without firing the claims trigger, and would
+    otherwise leave every old claim to reject votes on the new polls that
+    reuse those ids. Returns the number of claims deleted.
+    """
+    if not is_partitioned(connection):
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {CLAIMS_TABLE} claim WHERE NOT EXISTS "
+            f"(SELECT 1 FROM polls_poll poll WHERE poll.id = claim.poll_id)"
+        )
+        return cursor.rowcount
+
+
+def prune_claims_after_flush(sender, using, **kwargs):
+    # flush ends with post_migrate; so does migrate, where this is a no-op.
+    prune_claims(connections[using])
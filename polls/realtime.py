@@ -0,0 +1,151 @@
+# polls/realtime.py
+"""
+Live poll results for the Server-Sent Events stream.
+
+The vote write path publishes the bare poll id on a channel once its
+transaction commits (see ``services.poll_changed``). Every ASGI process
+listens on that channel through a single ``PollHub``, which coalesces
+notifications per poll: at most POLL_STREAM_MAX_UPDATES_PER_SECOND times
+a second it fetches the (cached) results once and hands them to every
+stream subscribed to that poll. Slow clients only ever hold the latest
+payload; intermediate updates are dropped rather than queued.
+
+``memory://`` delivers within the current process (single node, tests);
+a ``redis://`` URL fans out across processes and nodes via Redis pub/sub.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .results import get_poll_results
+
+
+class InProcessChannel:
+    def __init__(self):
+        self._listeners = []
+
+    def publish(self, poll_id):
+        for listener in list(self._listeners):
+            listener(poll_id)
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+
+class RedisChannel:
+    CHANNEL = "polls:updates"
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self._thread = None
+
+    def publish(self, poll_id):
+        self.client.publish(self.CHANNEL, poll_id)
+
+    def subscribe(self, listener):
+        def handler(message):
+            listener(int(message["data"]))
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.CHANNEL: handler})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+
+@lru_cache(maxsize=None)
+def _channel_for(url):
+    if url.startswith("memory://"):
+        return InProcessChannel()
+    return RedisChannel(url)
+
+
+def get_channel():
+    return _channel_for(settings.POLL_EVENTS_URL)
+
+
+def publish_poll_update(poll_id):
+    get_channel().publish(poll_id)
+
+
+class _LoopFanout:
+    """Subscribers and pending refreshes belonging to one event loop."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queues = defaultdict(set)
+        self.pending = set()
+
+
+class PollHub:
+    def __init__(self, channel, min_interval, fetch=get_poll_results):
+        self.min_interval = min_interval
+        self._fetch = sync_to_async(fetch)
+        self._fanouts = {}
+        self._lock = threading.Lock()
+        channel.subscribe(self.notify)
+
+    def subscribe(self, poll_id):
+        """Register a stream for ``poll_id``; must be called from its event loop."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=1)
+        with self._lock:
+            fanout = self._fanouts.setdefault(loop, _LoopFanout(loop))
+            fanout.queues[poll_id].add(queue)
+        return queue
+
+    def unsubscribe(self, poll_id, queue):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            fanout = self._fanouts.get(loop)
+            if fanout is None:
+                return
+            fanout.queues[poll_id].discard(queue)
+            if not fanout.queues[poll_id]:
+                del fanout.queues[poll_id]
+            if not fanout.queues:
+                del self._fanouts[loop]
+
+    def notify(self, poll_id):
+        """Channel callback; safe to call from any thread."""
+        with self._lock:
+            loops = [f.loop for f in self._fanouts.values() if poll_id in f.queues]
+        for loop in loops:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._schedule, loop, poll_id)
+
+    def _schedule(self, loop, poll_id):
+        fanout = self._fanouts.get(loop)
+        if fanout is None or poll_id in fanout.pending:
+            return
+        fanout.pending.add(poll_id)
+        loop.create_task(self._refresh(fanout, poll_id))
+
+    async def _refresh(self, fanout, poll_id):
+        # Everything published while we sleep is folded into this one refresh.
+        await asyncio.sleep(self.min_interval)
+        fanout.pending.discard(poll_id)
+        results = await self._fetch(poll_id)
+        for queue in list(fanout.queues.get(poll_id, ())):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(results)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = PollHub(
+                get_channel(),
+                min_interval=1 / settings.POLL_STREAM_MAX_UPDATES_PER_SECOND,
+            )
+        return _hub
@@ -0,0 +1,97 @@
+# polls/results.py
+"""
+Cached poll results.
+
+Each poll has a version number, Poll.version, bumped in the same
+transaction as every change to its votes, options or fields. Results are
+cached under the poll id *and* that version, so a bump makes the old entry
+unreachable without having to delete it, and concurrent readers never see
+a half-invalidated state. The version lives in the database rather than
+the cache, so every web process sees a bump as soon as it commits, shared
+cache or not, and reading it is one primary-key lookup. A cache miss
+recomputes the tallies with a single GROUP BY query, or, for a closed
+poll, reads the snapshot taken when it closed.
+
+Under replica reads (polls.routers) the version comes from the replica,
+like the tallies. A lagging replica's results are therefore cached under
+its own, older version, never under the one a voter reading from the
+primary looks up.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F
+
+from .models import Poll, PollResultSnapshot
+
+RESULTS_KEY = "polls:poll:{poll_id}:results:{version}"
+
+
+def get_poll_version(poll_id):
+    """The poll's current version, or None if there is no such poll."""
+    return Poll.objects.filter(pk=poll_id).values_list("version", flat=True).first()
+
+
+def get_poll_versions(poll_ids):
+    """``{poll_id: version}`` for several polls in one query."""
+    return dict(Poll.objects.filter(pk__in=poll_ids).values_list("pk", "version"))
+
+
+def bump_poll_version(poll_id):
+    """
+    Move ``poll_id`` to a new version. Runs in the caller's transaction, so
+    readers switch to the new version exactly when the change commits.
+    """
+    Poll.objects.filter(pk=poll_id).update(version=F("version") + 1)
+
+
+def compute_poll_results(poll_id):
+    """Tally a poll straight from the Vote table. Returns None if the poll does not exist."""
+    rows = list(
+        Poll.objects.filter(pk=poll_id)
+        .values("id", "question", "options__id", "options__text")
+        .annotate(votes=Count("options__votes"))
+        .order_by("options__id")
+    )
+    if not rows:
+        return None
+
+    options = [
+        {"id": row["options__id"], "text": row["options__text"], "votes": row["votes"]}
+        for row in rows
+        if row["options__id"] is not None
+    ]
+    total = sum(option["votes"] for option in options)
+    for option in options:
+        option["percentage"] = round(100 * option["votes"] / total, 2) if total else 0.0
+
+    return {
+        "poll": rows[0]["id"],
+        "question": rows[0]["question"],
+        "total_votes": total,
+        "options": options,
+    }
+
+
+def get_poll_results(poll_id, version=None):
+    """
+    Results for ``poll_id`` from the cache, recomputing on a miss. Pass the
+    poll's ``version`` if it has already been read.
+    """
+    if version is None:
+        version = get_poll_version(poll_id)
+    if version is None:
+        return None
+    key = RESULTS_KEY.format(poll_id=poll_id, version=version)
+    results = cache.get(key)
+    if results is None:
+        # A closed poll's frozen snapshot, or a fresh tally for an open one.
+        results = (
+            PollResultSnapshot.objects.filter(poll_id=poll_id)
+            .values_list("results", flat=True)
+            .first()
+        )
+        if results is None:
+            results = compute_poll_results(poll_id)
+        if results is not None:
+            cache.set(key, results, settings.POLL_RESULTS_CACHE_TIMEOUT)
+    return results
@@ -0,0 +1,100 @@
+# polls/routers.py
+"""
+Read-replica routing (DB_REPLICA).
+
+Writes always go to the primary ("default"). Reads of the polls models
+go to the "replica" alias only inside ``replica_reads()``, which
+ReplicaReadMixin opens for GET/HEAD requests to the poll and option
+endpoints, results included. Everything else, such as vote handling,
+sessions, admin and management commands, reads from the primary.
+
+A replica trails the primary, so a client that has just voted gets a
+cookie that keeps its reads on the primary for
+DB_REPLICA_MAX_LAG_SECONDS and it sees its own vote. Cached results and
+ETags need nothing extra: both are keyed on Poll.version, read from the
+same database as the body, so what a lagging replica serves is filed
+under its own older version.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA = "replica"
+STICKY_COOKIE_NAME = "primary_until"
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+def replica_configured():
+    return settings.DB_REPLICA
+
+
+@contextmanager
+def replica_reads():
+    """Route the reads made inside the block to the replica, if there is one."""
+    token = _replica_reads.set(replica_configured())
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reading_from_replica():
+    return _replica_reads.get()
+
+
+def is_sticky(request):
+    """Whether ``request`` comes from a client that wrote within the lag window."""
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE_NAME, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def stick_to_primary(response):
+    """Keep the client's reads on the primary until the replica has its write."""
+    if not replica_configured():
+        return response
+    lag = settings.DB_REPLICA_MAX_LAG_SECONDS
+    response.set_cookie(
+        STICKY_COOKIE_NAME,
+        str(int(time.time()) + lag),
+        max_age=lag,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite="Lax",
+    )
+    return response
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Sessions and users stay on the primary: a voter's brand-new
+        # session must be found on their next request.
+        if reading_from_replica() and model._meta.app_label == "polls":
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both sides.
+        return True
+
+
+class ReplicaReadMixin:
+    """Serve a viewset's GET/HEAD requests from the replica, except right after a write."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS and not is_sticky(request):
+            with replica_reads():
+                return super().dispatch(request, *args, **kwargs)
+        response = super().dispatch(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            stick_to_primary(response)
+        return response
@@ -2,46 +2,103 @@
 from rest_framework import serializers
 from .models import Poll, Option, Vote
 
+DUPLICATE_VOTE_MESSAGE = "You have already voted for this poll."
+POLL_CLOSED_MESSAGE = "This poll is closed."
+
+
 class APIRootSerializer(serializers.Serializer):
     polls = serializers.URLField()
     options = serializers.URLField()
     votes = serializers.URLField()
-class OptionSerializer(serializers.ModelSerializer):
-    votes_count = serializers.IntegerField(source='votes.count', read_only=True)
+class CounterSafeUpdateMixin:
+    """
+    Save only the fields the client sent. A plain ModelSerializer.update()
+    saves every column, which would write back the vote counters as they
+    were when the instance was loaded and lose concurrent votes.
+    """
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
 
+class OptionSerializer(CounterSafeUpdateMixin, serializers.ModelSerializer):
     class Meta:
         model = Option
         fields = ['id', 'text', 'poll', 'votes_count']
+        read_only_fields = ['votes_count']
 
+    def validate_poll(self, poll):
+        # The option's votes, and the counters and one-vote-per-poll rule
+        # built on them, belong to its poll.
+        if self.instance is not None and poll.pk != self.instance.poll_id:
+            raise serializers.ValidationError("An option cannot be moved to another poll.")
+        return poll
 
-class PollSerializer(serializers.ModelSerializer):
+
+class PollSerializer(CounterSafeUpdateMixin, serializers.ModelSerializer):
     options = OptionSerializer(many=True, read_only=True)
 
     class Meta:
         model = Poll
-        fields = ['id', 'question', 'pub_date', 'options']
+        fields = ['id', 'question', 'pub_date', 'closes_at', 'total_votes', 'options']
+        read_only_fields = ['total_votes']
+
+
+class OptionResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    text = serializers.CharField()
+    votes = serializers.IntegerField()
+    percentage = serializers.FloatField()
+
+
+class PollResultsSerializer(serializers.Serializer):
+    """Shape of GET /api/polls/{id}/results/ (documentation only)."""
+    poll = serializers.IntegerField()
+    question = serializers.CharField()
+    total_votes = serializers.IntegerField()
+    options = OptionResultSerializer(many=True)
 
 
 class VoteSerializer(serializers.ModelSerializer):
+    # The poll comes along in the same query, for the closing-time check.
+    option = serializers.PrimaryKeyRelatedField(queryset=Option.objects.select_related('poll'))
+
     class Meta:
         model = Vote
         fields = ['id', 'option']
 
     def validate(self, data):
         option = data.get('option')
-        request = self.context.get("request")
 
         if not option:
             raise serializers.ValidationError("Vote must have an option selected.")
 
-        # Ensure session exists
-        if not request.session.session_key:
-            request.session.create()
+        if option.poll.is_closed():
+            raise serializers.ValidationError(POLL_CLOSED_MESSAGE)
 
-        session_key = request.session.session_key
+        # The voter's identity (session or signed token, see polls.voters) is
+        # resolved in VoteViewSet.perform_create. One vote per voter per poll
+        # is enforced by the unique constraint on Vote(poll, session_key)
+        # when the row is inserted.
+        return data
 
-        # Prevent multiple votes per poll by the same session
-        if Vote.objects.filter(session_key=session_key, option__poll=option.poll).exists():
-            raise serializers.ValidationError("You have already voted for this poll.")
 
-        return data
+class BulkVoteItemSerializer(serializers.Serializer):
+    """One entry of POST /api/votes/bulk/ (documentation only)."""
+    option = serializers.IntegerField()
+    voter = serializers.CharField(max_length=40)
+
+
+class BulkVoteResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=["accepted", "rejected"])
+    reason = serializers.CharField(required=False)
+
+
+class BulkVoteReportSerializer(serializers.Serializer):
+    accepted = serializers.IntegerField()
+    rejected = serializers.IntegerField()
+    results = BulkVoteResultSerializer(many=True)
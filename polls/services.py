@@ -0,0 +1,208 @@
+# polls/services.py
+"""
+Vote write-path helpers.
+
+Option.votes_count and Poll.total_votes are denormalized copies of the
+Vote table. Every code path that inserts or removes votes goes through
+these helpers so the counters move in the same transaction as the rows.
+Run ``manage.py rebuild_vote_counters`` to reconcile after bulk edits
+made outside the API (admin, raw SQL, fixtures).
+
+They also bump the results version of every poll they touch in the same
+transaction, which invalidates its cached results and ETags, and publish
+the change to live result streams once that transaction commits.
+
+With VOTE_COUNTER_SHARDS set, votes are counted on shard rows instead of
+the two columns and folded into them later (see polls.counters).
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Poll, Option, Vote
+from . import counters
+from .realtime import publish_poll_update
+from .results import bump_poll_version
+
+
+def poll_changed(poll_id):
+    """
+    Move ``poll_id`` to a new results version, in the current transaction,
+    and notify live result streams once it commits.
+    """
+    bump_poll_version(poll_id)
+    transaction.on_commit(lambda: publish_poll_update(poll_id))
+
+
+def _shift_counts(option_id, poll_id, delta):
+    if counters.sharding_enabled():
+        # The poll row is left alone too: its version moves when
+        # compaction folds these shards in.
+        counters.add(option_id, poll_id, delta)
+        return
+    Option.objects.filter(pk=option_id).update(votes_count=F("votes_count") + delta)
+    # The version bump rides on the counter UPDATE the vote already makes.
+    Poll.objects.filter(pk=poll_id).update(
+        total_votes=F("total_votes") + delta, version=F("version") + 1
+    )
+    transaction.on_commit(lambda: publish_poll_update(poll_id))
+
+
+class DuplicateVote(Exception):
+    """The voter already has a vote on this poll."""
+
+
+def cast_vote(option, session_key):
+    """
+    Insert and count a vote in one transaction.
+
+    The INSERT is the duplicate check: a second vote from the same session
+    trips the (poll, session_key) unique constraint and raises DuplicateVote.
+    """
+    try:
+        with transaction.atomic():
+            vote = Vote.objects.create(option=option, session_key=session_key)
+            record_vote(vote)
+    except IntegrityError:
+        if Vote.objects.filter(poll_id=option.poll_id, session_key=session_key).exists():
+            raise DuplicateVote()
+        raise
+    return vote
+
+
+def record_vote(vote):
+    """Count a freshly inserted vote. Must run inside the insert's transaction."""
+    _shift_counts(vote.option_id, vote.poll_id, 1)
+
+
+def record_votes(option_poll_pairs):
+    """
+    Count a batch of inserted votes, given as ``(option_id, poll_id)`` pairs.
+    Issues one UPDATE per distinct option and poll rather than one per vote.
+    """
+    sharded = counters.sharding_enabled()
+    per_option = Counter(option_poll_pairs)
+    per_poll = Counter()
+    for (option_id, poll_id), n in per_option.items():
+        if sharded:
+            counters.add(option_id, poll_id, n)
+        else:
+            Option.objects.filter(pk=option_id).update(votes_count=F("votes_count") + n)
+        per_poll[poll_id] += n
+    if sharded:
+        return
+    for poll_id, n in per_poll.items():
+        Poll.objects.filter(pk=poll_id).update(
+            total_votes=F("total_votes") + n, version=F("version") + 1
+        )
+        transaction.on_commit(lambda poll_id=poll_id: publish_poll_update(poll_id))
+
+
+def move_vote(vote, previous_option):
+    """Shift one vote from ``previous_option`` to ``vote.option``."""
+    if previous_option.pk == vote.option_id:
+        return
+    _shift_counts(previous_option.pk, previous_option.poll_id, -1)
+    _shift_counts(vote.option_id, vote.poll_id, 1)
+
+
+def delete_vote(vote):
+    """Delete a vote and uncount it, unless a concurrent request got there first."""
+    with transaction.atomic():
+        deleted, _ = Vote.objects.filter(pk=vote.pk).delete()
+        if deleted:
+            _shift_counts(vote.option_id, vote.poll_id, -1)
+
+
+def delete_option(option):
+    """Delete an option and take its cascaded votes off the poll total."""
+    with transaction.atomic():
+        # Its shards are about to cascade away; fold them first so every
+        # removed vote is in the stored totals being decremented.
+        counters.compact_shards(option_ids=[option.pk])
+        _, per_model = option.delete()
+        removed = per_model.get(Vote._meta.label, 0)
+        if removed:
+            Poll.objects.filter(pk=option.poll_id).update(
+                total_votes=F("total_votes") - removed
+            )
+        poll_changed(option.poll_id)
+
+
+def bulk_cast_votes(entries):
+    """
+    Validate and insert a batch of ``{"option": id, "voter": key}`` entries.
+
+    Validation is set-based, with one query for the referenced options (and
+    whether their polls are closed) and one for voters who already voted on
+    those polls, and accepted votes are
+    inserted with ``bulk_create`` in chunks of VOTE_BULK_CHUNK_SIZE. Returns
+    one ``{"index", "status", ["reason"]}`` dict per entry, in input order.
+    """
+    for attempt in range(2):
+        try:
+            return _bulk_cast_votes(entries)
+        except IntegrityError:
+            # A single vote from one of these voters landed between our
+            # duplicate lookup and the insert. Re-validating rejects it.
+            if attempt:
+                raise
+
+
+def _bulk_cast_votes(entries):
+    results = [None] * len(entries)
+    candidates = []
+    for index, entry in enumerate(entries):
+        option = entry.get("option") if isinstance(entry, dict) else None
+        voter = entry.get("voter") if isinstance(entry, dict) else None
+        if not isinstance(option, int) or isinstance(option, bool):
+            results[index] = _rejected(index, "option must be an integer id")
+        elif not isinstance(voter, str) or not 0 < len(voter) <= 40:
+            results[index] = _rejected(index, "voter must be a string of 1-40 characters")
+        else:
+            candidates.append((index, option, voter))
+
+    now = timezone.now()
+    option_polls, closed_polls = {}, set()
+    rows = (
+        Option.objects.filter(pk__in={option for _, option, _ in candidates})
+        .values_list("pk", "poll_id", "poll__closes_at")
+    )
+    for option, poll_id, closes_at in rows:
+        option_polls[option] = poll_id
+        if closes_at is not None and closes_at <= now:
+            closed_polls.add(poll_id)
+    existing = set(
+        Vote.objects.filter(
+            poll_id__in=set(option_polls.values()),
+            session_key__in={voter for _, _, voter in candidates},
+        ).values_list("poll_id", "session_key")
+    )
+
+    accepted = []
+    for index, option, voter in candidates:
+        poll_id = option_polls.get(option)
+        if poll_id is None:
+            results[index] = _rejected(index, "unknown option")
+        elif poll_id in closed_polls:
+            results[index] = _rejected(index, "poll is closed")
+        elif (poll_id, voter) in existing:
+            results[index] = _rejected(index, "already voted for this poll")
+        else:
+            existing.add((poll_id, voter))
+            accepted.append(Vote(poll_id=poll_id, option_id=option, session_key=voter))
+            results[index] = {"index": index, "status": "accepted"}
+
+    chunk_size = settings.VOTE_BULK_CHUNK_SIZE
+    with transaction.atomic():
+        for start in range(0, len(accepted), chunk_size):
+            Vote.objects.bulk_create(accepted[start:start + chunk_size])
+        record_votes((vote.option_id, vote.poll_id) for vote in accepted)
+    return results
+
+
+def _rejected(index, reason):
+    return {"index": index, "status": "rejected", "reason": reason}
@@ -0,0 +1,68 @@
+# polls/snapshots.py
+"""
+Closing polls.
+
+Once a poll's ``closes_at`` has passed, new votes are refused (see
+VoteSerializer, the async vote view and services.bulk_cast_votes), so its
+results can no longer change. ``close_due_polls`` (the close_polls task,
+run by beat, or ``manage.py close_polls``) writes them to a
+PollResultSnapshot once, and ``results.get_poll_results`` serves that row
+from then on instead of counting Vote rows. Reopening a poll through the
+API deletes its snapshot again (``discard_if_reopened``).
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Poll, PollResultSnapshot
+from .results import compute_poll_results
+from . import buffer, services
+
+# How long close_due_polls waits for a vote buffer flush already running
+# in another worker.
+FLUSH_WAIT_SECONDS = 10
+
+
+def take_snapshot(poll_id):
+    """
+    Freeze the current results of ``poll_id``. Returns the snapshot, or
+    None if the poll is gone or no longer closed.
+    """
+    with transaction.atomic():
+        # Lock the poll row: vote transactions still in flight update it
+        # (total_votes), and so does reopening it, so this waits for them.
+        poll = Poll.objects.select_for_update().filter(pk=poll_id).first()
+        if poll is None or not poll.is_closed():
+            return None
+        results = compute_poll_results(poll_id)
+        snapshot, _ = PollResultSnapshot.objects.update_or_create(
+            poll_id=poll_id, defaults={"results": results, "taken_at": timezone.now()}
+        )
+        services.poll_changed(poll_id)
+    return snapshot
+
+
+def close_due_polls(now=None):
+    """Snapshot every poll past its ``closes_at`` that has none yet. Returns the poll ids."""
+    due = list(
+        Poll.objects.filter(closes_at__lte=now or timezone.now(), snapshot__isnull=True)
+        .values_list("pk", flat=True)
+    )
+    if due and buffer.buffering_enabled():
+        # Votes queued before the close still count. Another worker may be
+        # mid-flush with some of them; if it doesn't finish in time, leave
+        # these polls to the next run rather than freeze them without those.
+        if buffer.flush_vote_buffer(wait=FLUSH_WAIT_SECONDS) is None:
+            return []
+    return [poll_id for poll_id in due if take_snapshot(poll_id)]
+
+
+def discard_if_reopened(poll):
+    """
+    Delete the snapshot of ``poll`` if its ``closes_at`` has been moved
+    into the future or cleared: it takes votes again, so its results are
+    counted live until it next closes. Returns whether one was deleted.
+    """
+    if poll.is_closed():
+        return False
+    deleted, _ = PollResultSnapshot.objects.filter(poll_id=poll.pk).delete()
+    return bool(deleted)
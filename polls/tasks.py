@@ -0,0 +1,29 @@
+# polls/tasks.py
+from celery import shared_task
+from django.conf import settings
+
+from . import buffer, counters, partitions, snapshots
+
+
+@shared_task
+def flush_vote_buffer(batch_size=None):
+    """Drain the write-behind vote buffer (scheduled every second by beat)."""
+    return buffer.flush_vote_buffer(batch_size)
+
+
+@shared_task
+def compact_counter_shards():
+    """Fold sharded vote counts into the stored counters (scheduled by beat)."""
+    return counters.compact_shards()
+
+
+@shared_task
+def ensure_vote_partitions():
+    """Create upcoming monthly Vote partitions (daily; no-op unless partitioned)."""
+    return partitions.ensure_partitions(settings.VOTE_PARTITION_MONTHS_AHEAD)
+
+
+@shared_task
+def close_polls():
+    """Snapshot the results of polls past their closing time (scheduled by beat)."""
+    return snapshots.close_due_polls()
@@ -35,7 +35,7 @@ class PollsAPITestCase(APITestCase):
         url = reverse('poll-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data), 1)
+        self.assertGreaterEqual(len(response.data['results']), 1)
 
     def test_retrieve_poll_detail(self):
         url = reverse('poll-detail', args=[self.poll.id])
@@ -78,8 +78,8 @@ class PollsAPITestCase(APITestCase):
         url = reverse('option-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data), 2)
-        texts = [opt['text'] for opt in response.data]
+        self.assertGreaterEqual(len(response.data['results']), 2)
+        texts = [opt['text'] for opt in response.data['results']]
         self.assertIn("Red", texts)
         self.assertIn("Blue", texts)
 
@@ -149,8 +149,8 @@ class PollsAPITestCase(APITestCase):
         url = reverse('vote-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['option'], self.option1.id)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['option'], self.option1.id)
 
     def test_retrieve_vote_detail_authenticated(self):
         self.authenticate()
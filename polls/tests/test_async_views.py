@@ -0,0 +1,93 @@
+# polls/tests/test_async_views.py
+from django.test import TestCase
+from django.urls import reverse
+
+from polls.models import Poll, Option, Vote
+
+
+class AsyncPollReadTests(TestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        Option.objects.create(poll=self.poll, text="Python")
+        Option.objects.create(poll=self.poll, text="Go")
+
+    async def test_detail_matches_drf_payload(self):
+        response = await self.async_client.get(reverse("async-poll-detail", args=[self.poll.id]))
+        self.assertEqual(response.status_code, 200)
+
+        expected = (await self.async_client.get(reverse("poll-detail", args=[self.poll.id]))).json()
+        self.assertEqual(response.json(), expected)
+
+    async def test_detail_unknown_poll_is_404(self):
+        response = await self.async_client.get(reverse("async-poll-detail", args=[self.poll.id + 100]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_list_pages_with_keyset_cursor(self):
+        for i in range(4):
+            await Poll.objects.acreate(question=f"Q{i}?")
+
+        seen, url = [], reverse("async-poll-list") + "?page_size=2"
+        while url:
+            body = (await self.async_client.get(url)).json()
+            seen.extend(poll["id"] for poll in body["results"])
+            url = body["next"]
+
+        expected = [pk async for pk in Poll.objects.order_by("-pub_date", "-id").values_list("id", flat=True)]
+        self.assertEqual(seen, expected)
+
+    async def test_list_page_size_falls_back_to_default_and_is_capped(self):
+        await Poll.objects.abulk_create(Poll(question=f"Q{i}?") for i in range(104))
+
+        for value, expected in [("0", 20), ("-5", 20), ("two", 20), ("3", 3), ("500", 100)]:
+            with self.subTest(page_size=value):
+                response = await self.async_client.get(
+                    reverse("async-poll-list"), {"page_size": value}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()["results"]), expected)
+
+    async def test_list_rejects_bad_cursor(self):
+        response = await self.async_client.get(reverse("async-poll-list"), {"cursor": "nope"})
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncVoteCreateTests(TestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.url = reverse("async-vote-create")
+
+    async def post(self, payload):
+        return await self.async_client.post(self.url, payload, content_type="application/json")
+
+    async def test_vote_is_recorded_and_counted(self):
+        response = await self.post({"option": self.python.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["option"], self.python.id)
+
+        vote = await Vote.objects.aget()
+        self.assertEqual(vote.poll_id, self.poll.id)
+        option = await Option.objects.aget(pk=self.python.id)
+        self.assertEqual(option.votes_count, 1)
+
+    async def test_second_vote_in_same_session_is_rejected(self):
+        await self.post({"option": self.python.id})
+        response = await self.post({"option": self.go.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"non_field_errors": ["You have already voted for this poll."]}
+        )
+        self.assertEqual(await Vote.objects.acount(), 1)
+
+    async def test_invalid_option(self):
+        response = await self.post({"option": 999999})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("option", response.json())
+
+        response = await self.post({})
+        self.assertEqual(response.json(), {"option": ["This field is required."]})
+
+    async def test_only_post_is_allowed(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 405)
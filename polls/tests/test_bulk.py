@@ -0,0 +1,87 @@
+# polls/tests/test_bulk.py
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option, Vote
+
+User = get_user_model()
+
+
+class BulkVoteTests(APITestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.url = reverse("vote-bulk")
+        self.client.force_authenticate(User.objects.create_user(
+            username="kiosk", email="kiosk@example.com", password="password"
+        ))
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(self.url, [], format="json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_accepts_votes_and_updates_counters(self):
+        entries = [{"option": self.python.id, "voter": f"kiosk-{i}"} for i in range(3)]
+        entries.append({"option": self.go.id, "voter": "kiosk-9"})
+
+        response = self.client.post(self.url, entries, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["accepted"], 4)
+        self.assertEqual(response.data["rejected"], 0)
+        self.assertEqual(Vote.objects.count(), 4)
+        self.python.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual(self.python.votes_count, 3)
+        self.assertEqual(self.poll.total_votes, 4)
+
+    def test_reports_each_rejection_in_input_order(self):
+        Vote.objects.create(option=self.go, session_key="returning")
+        entries = [
+            {"option": self.python.id, "voter": "fresh"},
+            {"option": self.go.id, "voter": "fresh"},            # duplicate within batch
+            {"option": self.python.id, "voter": "returning"},    # voted before
+            {"option": 999999, "voter": "someone"},              # unknown option
+            {"option": "1", "voter": "someone"},                 # wrong type
+            {"option": self.python.id, "voter": ""},             # empty voter
+        ]
+
+        response = self.client.post(self.url, entries, format="json")
+
+        self.assertEqual(
+            [(r["index"], r["status"]) for r in response.data["results"]],
+            [(0, "accepted"), (1, "rejected"), (2, "rejected"),
+             (3, "rejected"), (4, "rejected"), (5, "rejected")],
+        )
+        self.assertEqual(response.data["results"][3]["reason"], "unknown option")
+        self.assertEqual(Vote.objects.filter(session_key="fresh").count(), 1)
+
+    def test_validation_is_set_based(self):
+        entries = [{"option": self.python.id, "voter": f"kiosk-{i}"} for i in range(200)]
+        # option lookup + duplicate lookup, then savepoint, one INSERT for the
+        # chunk and one counter UPDATE per option and per poll
+        with self.assertNumQueries(7):
+            self.client.post(self.url, entries, format="json")
+        self.assertEqual(Vote.objects.count(), 200)
+
+    @override_settings(VOTE_BULK_CHUNK_SIZE=2)
+    def test_inserts_in_chunks(self):
+        entries = [{"option": self.go.id, "voter": f"kiosk-{i}"} for i in range(5)]
+        response = self.client.post(self.url, entries, format="json")
+        self.assertEqual(response.data["accepted"], 5)
+        self.assertEqual(Vote.objects.count(), 5)
+
+    @override_settings(VOTE_BULK_MAX_ITEMS=2)
+    def test_rejects_oversized_batches(self):
+        entries = [{"option": self.go.id, "voter": f"kiosk-{i}"} for i in range(3)]
+        response = self.client.post(self.url, entries, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Vote.objects.count(), 0)
+
+    def test_rejects_non_list_body(self):
+        response = self.client.post(self.url, {"option": self.go.id}, format="json")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,63 @@
+# polls/tests/test_cache_headers.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.cache import get_max_age
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option
+
+User = get_user_model()
+
+
+@override_settings(POLL_HTTP_CACHE_SECONDS=2, POLL_HTTP_CACHE_STALE_SECONDS=5)
+class PollCacheHeaderTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Best language?")
+        self.option = Option.objects.create(poll=self.poll, text="Python")
+        self.detail = reverse("poll-detail", args=[self.poll.id])
+
+    def cache_control(self, response):
+        return {part.strip() for part in response["Cache-Control"].split(",")}
+
+    def test_anonymous_reads_are_publicly_cacheable(self):
+        for url in (reverse("poll-list"), self.detail, reverse("poll-results", args=[self.poll.id])):
+            response = self.client.get(url)
+            self.assertEqual(
+                self.cache_control(response),
+                {"public", "max-age=2", "stale-while-revalidate=5"},
+                url,
+            )
+            self.assertEqual(get_max_age(response), 2)
+
+    def test_vary_covers_content_negotiation_and_credentials(self):
+        vary = {v.strip() for v in self.client.get(self.detail)["Vary"].split(",")}
+        self.assertTrue({"Accept", "Authorization", "Cookie"} <= vary)
+
+    def test_not_modified_keeps_cache_headers(self):
+        etag = self.client.get(self.detail)["ETag"]
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("public", self.cache_control(response))
+
+    def test_voters_get_private_responses(self):
+        self.client.post(reverse("vote-list"), {"option": self.option.id}, format="json")
+        self.assertIn("sessionid", self.client.cookies)
+
+        response = self.client.get(self.detail)
+        self.assertEqual(self.cache_control(response), {"private", "no-cache"})
+
+    def test_credentialed_reads_are_private(self):
+        response = self.client.get(self.detail, HTTP_AUTHORIZATION="Bearer whatever")
+        self.assertIn("private", self.cache_control(response))
+
+    def test_errors_and_writes_carry_no_cache_headers(self):
+        self.assertFalse(self.client.get(reverse("poll-detail", args=[999])).has_header("Cache-Control"))
+
+        user = User.objects.create_user(username="admin", email="a@example.com", password="password")
+        self.client.force_authenticate(user)
+        response = self.client.post(reverse("poll-list"), {"question": "New?"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header("Cache-Control"))
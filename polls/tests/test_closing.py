@@ -0,0 +1,133 @@
+# polls/tests/test_closing.py
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from polls import buffer, snapshots
+from polls.models import Poll, Option, PollResultSnapshot, Vote
+from polls.snapshots import close_due_polls
+
+User = get_user_model()
+
+
+class PollClosingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.vote(self.python)
+        self.vote(self.go)
+        self.vote(self.go)
+
+    def vote(self, option, url=None, **kwargs):
+        self.client.cookies.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url or reverse("vote-list"), {"option": option.id}, **kwargs)
+
+    def close(self):
+        Poll.objects.filter(pk=self.poll.pk).update(closes_at=timezone.now() - timedelta(seconds=1))
+
+    def test_votes_after_close_are_rejected(self):
+        self.close()
+        response = self.vote(self.python, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"non_field_errors": ["This poll is closed."]})
+
+        response = self.vote(
+            self.python, url=reverse("async-vote-create"), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Vote.objects.count(), 3)
+
+    def test_closed_check_adds_no_query(self):
+        # The option lookup joins its poll; no separate poll fetch.
+        self.close()
+        self.client.cookies.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("vote-list"), {"option": self.python.id}, format="json")
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_bulk_rejects_entries_for_closed_polls(self):
+        self.close()
+        self.client.force_authenticate(User.objects.create_user(
+            username="kiosk", email="kiosk@example.com", password="password"
+        ))
+        response = self.client.post(
+            reverse("vote-bulk"), [{"option": self.python.id, "voter": "k-1"}], format="json"
+        )
+        self.assertEqual(response.data["results"][0]["reason"], "poll is closed")
+
+    def test_future_close_still_accepts_votes(self):
+        Poll.objects.filter(pk=self.poll.pk).update(closes_at=timezone.now() + timedelta(days=1))
+        self.assertEqual(self.vote(self.python, format="json").status_code, 201)
+        self.assertEqual(close_due_polls(), [])
+
+    def test_closing_snapshots_final_results(self):
+        self.close()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(close_due_polls(), [self.poll.id])
+        snapshot = PollResultSnapshot.objects.get(poll=self.poll)
+        self.assertEqual(snapshot.results["total_votes"], 3)
+        self.assertEqual([o["votes"] for o in snapshot.results["options"]], [1, 2])
+
+        # Already snapshotted polls are skipped next time.
+        self.assertEqual(close_due_polls(), [])
+
+    def test_closed_poll_results_never_touch_votes(self):
+        self.close()
+        call_command("close_polls", stdout=StringIO())
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("poll-results", args=[self.poll.id]))
+        self.assertEqual(response.data["total_votes"], 3)
+        self.assertFalse(any(Vote._meta.db_table in q["sql"] for q in ctx.captured_queries))
+
+    def test_closes_at_is_exposed(self):
+        response = self.client.get(reverse("poll-detail", args=[self.poll.id]))
+        self.assertIn("closes_at", response.data)
+        self.assertIsNone(response.data["closes_at"])
+
+    def test_reopening_discards_the_snapshot(self):
+        self.close()
+        close_due_polls()
+        self.client.force_authenticate(User.objects.create_user(
+            username="editor", email="editor@example.com", password="password"
+        ))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse("poll-detail", args=[self.poll.id]),
+                {"closes_at": (timezone.now() + timedelta(days=1)).isoformat()},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(PollResultSnapshot.objects.filter(poll=self.poll).exists())
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.vote(self.python, format="json").status_code, 201)
+        response = self.client.get(reverse("poll-results", args=[self.poll.id]))
+        self.assertEqual(response.data["total_votes"], 4)
+
+    @override_settings(VOTE_INGESTION_MODE="buffered", VOTE_BUFFER_URL="memory://")
+    def test_closing_waits_for_a_flush_running_elsewhere(self):
+        self.close()
+        lock = buffer.get_vote_buffer()._flush_lock
+        lock.acquire()
+        try:
+            with mock.patch.object(snapshots, "FLUSH_WAIT_SECONDS", 0.01):
+                self.assertEqual(close_due_polls(), [])
+        finally:
+            lock.release()
+        self.assertFalse(PollResultSnapshot.objects.filter(poll=self.poll).exists())
+        self.assertEqual(close_due_polls(), [self.poll.id])
@@ -0,0 +1,96 @@
+# polls/tests/test_conditional.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", password="password"
+        )
+
+    def vote(self, option):
+        self.client.cookies.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("vote-list"), {"option": option.id}, format="json")
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_poll_answers_304_after_one_lookup(self):
+        url = reverse("poll-detail", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+
+        # The poll's version, by primary key
+        with self.assertNumQueries(1):
+            response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_vote_changes_the_etag(self):
+        url = reverse("poll-detail", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.vote(self.python)
+
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["total_votes"], 1)
+
+    def test_editing_the_poll_changes_the_etag(self):
+        url = reverse("poll-detail", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"question": "Renamed?"}, format="json")
+
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_deleted_poll_is_not_reported_unchanged(self):
+        url = reverse("poll-detail", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+
+        self.assertEqual(self.revalidate(url, etag).status_code, 404)
+
+    def test_option_detail_costs_two_lookups_when_unchanged(self):
+        url = reverse("option-detail", args=[self.go.id])
+        etag = self.client.get(url)["ETag"]
+
+        # The option's poll, then that poll's version
+        with self.assertNumQueries(2):
+            self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        self.vote(self.go)
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["votes_count"], 1)
+
+    def test_results_are_conditional(self):
+        url = reverse("poll-results", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        self.vote(self.python)
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_unknown_objects_still_404(self):
+        self.assertEqual(self.client.get(reverse("poll-detail", args=[999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("option-detail", args=[999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("poll-results", args=[999])).status_code, 404)
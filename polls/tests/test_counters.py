@@ -0,0 +1,137 @@
+# polls/tests/test_counters.py
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option, Vote
+from polls.serializers import PollSerializer
+
+User = get_user_model()
+
+
+class VoteCounterTests(APITestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", password="password"
+        )
+
+    def assertCounts(self, python, go):
+        self.python.refresh_from_db()
+        self.go.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual(self.python.votes_count, python)
+        self.assertEqual(self.go.votes_count, go)
+        self.assertEqual(self.poll.total_votes, python + go)
+
+    def test_casting_a_vote_increments_counters(self):
+        response = self.client.post(reverse("vote-list"), {"option": self.python.id}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertCounts(python=1, go=0)
+
+    def test_rejected_duplicate_leaves_counters_alone(self):
+        url = reverse("vote-list")
+        self.client.post(url, {"option": self.python.id}, format="json")
+        self.client.post(url, {"option": self.go.id}, format="json")
+        self.assertCounts(python=1, go=0)
+
+    def test_deleting_a_vote_decrements_counters(self):
+        self.client.post(reverse("vote-list"), {"option": self.python.id}, format="json")
+        vote = Vote.objects.get()
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.delete(reverse("vote-detail", args=[vote.id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertCounts(python=0, go=0)
+
+    def test_moving_a_vote_shifts_counters(self):
+        self.client.post(reverse("vote-list"), {"option": self.python.id}, format="json")
+        vote = Vote.objects.get()
+
+        # Fresh session, so the duplicate-vote check does not see the original voter
+        self.client.cookies.clear()
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch(
+            reverse("vote-detail", args=[vote.id]), {"option": self.go.id}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertCounts(python=0, go=1)
+
+    def test_deleting_an_option_removes_its_votes_from_poll_total(self):
+        self.client.post(reverse("vote-list"), {"option": self.python.id}, format="json")
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.delete(reverse("option-detail", args=[self.python.id]))
+        self.assertEqual(response.status_code, 204)
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.total_votes, 0)
+
+    def test_an_option_cannot_be_moved_to_another_poll(self):
+        self.client.post(reverse("vote-list"), {"option": self.python.id}, format="json")
+        other = Poll.objects.create(question="Best editor?")
+
+        self.client.force_authenticate(self.admin)
+        url = reverse("option-detail", args=[self.python.id])
+        response = self.client.patch(url, {"poll": other.id}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Option.objects.get(pk=self.python.pk).poll_id, self.poll.pk)
+        self.assertCounts(python=1, go=0)
+
+        response = self.client.patch(url, {"poll": self.poll.id, "text": "CPython"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_editing_a_poll_does_not_overwrite_counters(self):
+        stale = Poll.objects.get(pk=self.poll.pk)
+        Poll.objects.filter(pk=self.poll.pk).update(total_votes=5)
+
+        serializer = PollSerializer(stale, data={"question": "Renamed?"}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.question, "Renamed?")
+        self.assertEqual(self.poll.total_votes, 5)
+
+    def test_poll_payload_reads_stored_counters(self):
+        self.client.post(reverse("vote-list"), {"option": self.go.id}, format="json")
+
+        response = self.client.get(reverse("poll-detail", args=[self.poll.id]))
+        self.assertEqual(response.data["total_votes"], 1)
+        counts = {opt["text"]: opt["votes_count"] for opt in response.data["options"]}
+        self.assertEqual(counts, {"Python": 0, "Go": 1})
+
+
+class RebuildVoteCountersCommandTests(APITestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Tabs or spaces?")
+        self.tabs = Option.objects.create(poll=self.poll, text="Tabs")
+        self.spaces = Option.objects.create(poll=self.poll, text="Spaces")
+        # Rows written behind the API's back leave the counters at zero.
+        for key in ("a", "b", "c"):
+            Vote.objects.create(option=self.spaces, session_key=key)
+        Vote.objects.create(option=self.tabs, session_key="d")
+
+    def test_rebuild_fixes_drifted_counters(self):
+        out = StringIO()
+        call_command("rebuild_vote_counters", "--batch-size", "1", stdout=out)
+
+        self.tabs.refresh_from_db()
+        self.spaces.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual(self.tabs.votes_count, 1)
+        self.assertEqual(self.spaces.votes_count, 3)
+        self.assertEqual(self.poll.total_votes, 4)
+        self.assertIn("Fixed 2 option counter(s) and 1 poll total(s)", out.getvalue())
+
+    def test_dry_run_does_not_write(self):
+        out = StringIO()
+        call_command("rebuild_vote_counters", "--dry-run", stdout=out)
+
+        self.spaces.refresh_from_db()
+        self.assertEqual(self.spaces.votes_count, 0)
+        self.assertIn("Found 2 option counter(s)", out.getvalue())
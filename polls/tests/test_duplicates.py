@@ -0,0 +1,69 @@
+# polls/tests/test_duplicates.py
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option, Vote
+
+
+class DuplicateVoteConstraintTests(APITestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.url = reverse("vote-list")
+
+    def test_vote_copies_poll_from_option(self):
+        vote = Vote.objects.create(option=self.go, session_key="abc")
+        self.assertEqual(vote.poll_id, self.poll.id)
+
+    def test_database_rejects_second_vote_on_same_poll(self):
+        Vote.objects.create(option=self.python, session_key="abc")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Vote.objects.create(option=self.go, session_key="abc")
+
+    def test_same_session_may_vote_on_other_polls(self):
+        other = Option.objects.create(poll=Poll.objects.create(question="Other?"), text="Yes")
+        Vote.objects.create(option=self.python, session_key="abc")
+        Vote.objects.create(option=other, session_key="abc")
+        self.assertEqual(Vote.objects.filter(session_key="abc").count(), 2)
+
+    def test_duplicate_maps_to_existing_400_response(self):
+        self.client.post(self.url, {"option": self.python.id}, format="json")
+        response = self.client.post(self.url, {"option": self.go.id}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"non_field_errors": ["You have already voted for this poll."]}
+        )
+        self.assertEqual(Vote.objects.count(), 1)
+
+    def test_moving_a_vote_onto_an_already_voted_poll_is_a_400(self):
+        other_poll = Poll.objects.create(question="Other?")
+        other = Option.objects.create(poll=other_poll, text="Yes")
+        Vote.objects.create(option=other, session_key="abc")
+        vote = Vote.objects.create(option=self.python, session_key="abc")
+        admin = get_user_model().objects.create_user("admin", password="password", is_staff=True)
+        self.client.force_authenticate(admin)
+
+        response = self.client.patch(
+            reverse("vote-detail", args=[vote.id]), {"option": other.id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"non_field_errors": ["You have already voted for this poll."]}
+        )
+        vote.refresh_from_db()
+        self.assertEqual(vote.option_id, self.python.id)
+
+    def test_vote_is_written_without_a_prior_duplicate_lookup(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"option": self.python.id}, format="json")
+        self.assertEqual(response.status_code, 201)
+
+        vote_table = Vote._meta.db_table
+        vote_queries = [q["sql"] for q in ctx.captured_queries if vote_table in q["sql"]]
+        self.assertEqual(len(vote_queries), 1)
+        self.assertTrue(vote_queries[0].startswith("INSERT"))
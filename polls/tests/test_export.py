@@ -0,0 +1,101 @@
+# polls/tests/test_export.py
+import base64
+import csv
+import io
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.exports import vote_rows
+from polls.models import Poll, Option, Vote
+
+User = get_user_model()
+
+
+class VoteExportTests(APITestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        Vote.objects.bulk_create(
+            Vote(poll=self.poll, option=self.python if i % 2 else self.go, session_key=f"s-{i}")
+            for i in range(5)
+        )
+        other = Poll.objects.create(question="Other?")
+        Vote.objects.create(option=Option.objects.create(poll=other, text="Yes"), session_key="s-x")
+        self.url = reverse("poll-export-votes", args=[self.poll.id])
+        self.client.force_authenticate(User.objects.create_user(
+            username="analyst", email="analyst@example.com", password="password"
+        ))
+
+    def export(self, fmt, **kwargs):
+        response = self.client.get(self.url, {"format": fmt}, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_export_streams_every_vote_of_the_poll(self):
+        response, body = self.export("csv")
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        self.assertIn('filename="poll-%d-votes.csv"' % self.poll.id, response["Content-Disposition"])
+
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], ["id", "option", "voted_at"])
+        expected = list(Vote.objects.filter(poll=self.poll).order_by("id").values_list("id", "option_id"))
+        self.assertEqual([(int(r[0]), int(r[1])) for r in rows[1:]], expected)
+
+    @override_settings(VOTE_EXPORT_CHUNK_SIZE=2)
+    def test_ndjson_export_in_small_chunks(self):
+        response, body = self.export("ndjson")
+        self.assertTrue(response["Content-Type"].startswith("application/x-ndjson"))
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(records), 5)
+        self.assertEqual(set(records[0]), {"id", "option", "voted_at"})
+
+    def test_session_keys_are_not_exported(self):
+        _, body = self.export("csv")
+        self.assertNotIn("s-1", body)
+
+    def test_requires_authentication_and_known_poll(self):
+        self.assertEqual(self.client.get(reverse("poll-export-votes", args=[999]), {"format": "csv"}).status_code, 404)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url, {"format": "csv"}).status_code, 403)
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, 404)
+
+    def test_export_is_not_publicly_cacheable(self):
+        response, _ = self.export("csv")
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_export_asks_nginx_not_to_buffer(self):
+        response, _ = self.export("csv")
+        self.assertEqual(response["X-Accel-Buffering"], "no")
+
+    @override_settings(VOTE_EXPORT_CHUNK_SIZE=2)
+    async def test_asgi_export_reads_one_chunk_at_a_time(self):
+        read = []
+
+        def counted_rows(poll_id, chunk_size):
+            for row in vote_rows(poll_id, chunk_size):
+                read.append(row)
+                yield row
+
+        credentials = base64.b64encode(b"analyst:password").decode()
+        with mock.patch("polls.views.vote_rows", counted_rows):
+            response = await self.async_client.get(
+                self.url, {"format": "ndjson"}, headers={"authorization": f"Basic {credentials}"}
+            )
+            self.assertEqual(response.status_code, 200)
+            # How Django's ASGIHandler sends a streaming response.
+            chunks = aiter(response)
+            self.assertEqual(len((await anext(chunks)).splitlines()), 2)
+            # Not drained into a list first: only the rows sent so far are read.
+            self.assertEqual(len(read), 2)
+            rest = [chunk async for chunk in chunks]
+        self.assertEqual(len(read), 5)
+        self.assertEqual(sum(len(chunk.splitlines()) for chunk in rest), 3)
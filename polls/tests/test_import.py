@@ -0,0 +1,146 @@
+# polls/tests/test_import.py
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from polls.imports import Importer, _copy_value
+from polls.models import Poll, Option, Vote
+
+
+class ImportPollsTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def ndjson(self, name, records):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        return path
+
+    def csv(self, name, header, rows):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path
+
+    def run_import(self, **files):
+        out = StringIO()
+        call_command("import_polls", stdout=out, batch_size=3, **files)
+        return out.getvalue()
+
+    def test_imports_polls_options_and_votes(self):
+        polls = self.ndjson("polls.ndjson", [
+            {"id": 10, "question": "Best language?", "pub_date": "2019-05-01T12:00:00Z"},
+            {"id": 11, "question": "Tabs or spaces?", "closes_at": "2019-06-01T00:00:00"},
+        ])
+        options = self.csv("options.csv", ["id", "poll", "text"], [
+            [100, 10, "Python"], [101, 10, "Go"], [110, 11, "Tabs"],
+        ])
+        votes = self.ndjson("votes.ndjson", [
+            {"option": 100, "session_key": f"old-{i}", "voted_at": "2019-05-02T08:00:00Z"}
+            for i in range(4)
+        ] + [{"option": 101, "session_key": "old-x"}, {"option": 110}])
+
+        out = self.run_import(polls=polls, options=options, votes=votes)
+
+        self.assertIn("Imported 2 polls", out)
+        self.assertIn("Imported 6 votes", out)
+        self.assertIn("rows/s", out)
+
+        poll = Poll.objects.get(pk=10)
+        self.assertEqual(poll.pub_date, datetime(2019, 5, 1, 12, tzinfo=dt_timezone.utc))
+        self.assertEqual(poll.total_votes, 5)
+        self.assertEqual(Poll.objects.get(pk=11).closes_at, datetime(2019, 6, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(Option.objects.get(pk=100).votes_count, 4)
+        self.assertEqual(Vote.objects.filter(poll_id=10).count(), 5)
+        self.assertIsNone(Vote.objects.get(option_id=110).session_key)
+
+    def test_new_rows_do_not_collide_with_imported_ids(self):
+        polls = self.ndjson("polls.ndjson", [{"id": 50, "question": "Imported?"}])
+        self.run_import(polls=polls)
+        self.assertGreater(Poll.objects.create(question="New?").pk, 50)
+
+    def test_votes_for_unknown_options_fail_with_the_line(self):
+        votes = self.csv("votes.csv", ["option", "session_key"], [["999", "a"]])
+        with self.assertRaisesMessage(CommandError, "votes.csv, line 2: option 999 does not exist"):
+            self.run_import(votes=votes)
+
+    def test_bad_fields_are_reported(self):
+        polls = self.ndjson("polls.ndjson", [{"id": 1, "question": "When?", "pub_date": "yesterday"}])
+        with self.assertRaisesMessage(CommandError, "pub_date must be an ISO 8601 datetime"):
+            self.run_import(polls=polls)
+
+    def test_a_bad_record_leaves_nothing_and_the_import_can_be_rerun(self):
+        polls = self.ndjson("polls.ndjson", [{"id": 20 + i, "question": f"Q{i}?"} for i in range(5)])
+        options = self.csv("options.csv", ["id", "poll", "text"], [[200, 20, "Yes"]])
+        # Two batches of 3 go in before the bad line 8.
+        votes = self.ndjson("votes.ndjson", [{"option": 200}] * 7 + [{"option": 999}])
+        with self.assertRaises(CommandError):
+            self.run_import(polls=polls, options=options, votes=votes)
+        self.assertFalse(Poll.objects.exists())
+        self.assertFalse(Vote.objects.exists())
+
+        self.ndjson("votes.ndjson", [{"option": 200}] * 7)
+        self.run_import(polls=polls, options=options, votes=votes)
+        self.assertEqual(Poll.objects.count(), 5)
+        self.assertEqual(Option.objects.get(pk=200).votes_count, 7)
+
+    def test_requires_a_file(self):
+        with self.assertRaises(CommandError):
+            call_command("import_polls", stdout=StringIO())
+
+
+@skipUnless(connection.vendor == "postgresql", "COPY needs PostgreSQL")
+class CopyImportTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def ndjson(self, name, records):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        return path
+
+    def test_nulls_and_special_characters_survive_copy(self):
+        importer = Importer()
+        self.assertTrue(importer.use_copy)
+        importer.run(
+            polls=self.ndjson("polls.ndjson", [{"id": 1, "question": 'Tab\there,\nline "two" \\ end?'}]),
+            options=self.ndjson("options.ndjson", [{"id": 10, "poll": 1, "text": ""}]),
+            votes=self.ndjson("votes.ndjson", [
+                {"option": 10}, {"option": 10}, {"option": 10, "session_key": ""},
+            ]),
+        )
+
+        poll = Poll.objects.get(pk=1)
+        self.assertEqual(poll.question, 'Tab\there,\nline "two" \\ end?')
+        self.assertIsNone(poll.closes_at)
+        self.assertEqual(Option.objects.get(pk=10).text, "")
+        self.assertEqual(Vote.objects.filter(session_key__isnull=True).count(), 2)
+        self.assertEqual(Vote.objects.filter(session_key="").count(), 1)
+
+
+class CopyValueTests(SimpleTestCase):
+    def test_null_is_distinct_from_the_empty_string(self):
+        self.assertEqual(_copy_value(None), "\\N")
+        self.assertEqual(_copy_value(""), "")
+        self.assertEqual(_copy_value("\\N"), "\\\\N")
+
+    def test_separators_are_escaped(self):
+        self.assertEqual(_copy_value("a\tb\nc\rd\\e"), "a\\tb\\nc\\rd\\\\e")
+        self.assertEqual(_copy_value(7), "7")
@@ -0,0 +1,26 @@
+# polls/tests/test_index_bench.py
+from django.db import connection
+from django.test import TestCase
+
+from polls.benchmarks.indexes import INDEXES, compare
+from polls.benchmarks.seed import seed
+
+
+class IndexBenchmarkTests(TestCase):
+    def test_compares_both_index_sets_and_cleans_up(self):
+        poll_ids = seed(polls=3, options_per_poll=2, votes=50)
+
+        report = compare(poll_ids, repeat=2)
+
+        self.assertIn("poll_results_group_by", report)
+        for row in report.values():
+            self.assertGreaterEqual(row["before_ms"], 0)
+            self.assertGreaterEqual(row["after_ms"], 0)
+        tables = connection.introspection.table_names()
+        self.assertFalse([name for name in tables if name.startswith("bench_")])
+
+    def test_before_is_the_pre_index_schema(self):
+        before = " ".join(INDEXES["before"])
+        self.assertNotIn("pub_date", before)
+        self.assertNotIn("voted_at", before)
+        self.assertNotIn("UNIQUE", before)
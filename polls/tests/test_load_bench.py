@@ -0,0 +1,52 @@
+# polls/tests/test_load_bench.py
+from django.core.cache import cache
+from django.test import TestCase
+
+from polls.benchmarks.load import (
+    SCENARIOS, in_process_client, in_process_settings, run, targets_from_db,
+)
+from polls.benchmarks.seed import seed
+from polls.models import Vote
+
+
+class LoadBenchmarkTests(TestCase):
+    """
+    The load scenarios at toy scale, single worker: every scenario must
+    succeed and report the fields `manage.py bench` compares across commits.
+    """
+
+    def setUp(self):
+        cache.clear()
+        seed(polls=3, options_per_poll=2, votes=20)
+
+    def test_every_scenario_reports_latency_and_queries(self):
+        rows = run(list(SCENARIOS), in_process_client, targets_from_db(), requests=10, concurrency=1, warmup=1)
+
+        self.assertEqual([row["scenario"] for row in rows], list(SCENARIOS))
+        for row in rows:
+            self.assertEqual((row["requests"], row["errors"]), (10, 0), row)
+            self.assertLessEqual(row["p50_ms"], row["p95_ms"])
+            self.assertLessEqual(row["p95_ms"], row["p99_ms"])
+            self.assertGreater(row["throughput_rps"], 0)
+            self.assertIsNotNone(row["queries_per_request"])
+
+    def test_each_vote_is_a_new_voter(self):
+        run(["vote"], in_process_client, targets_from_db(), requests=5, concurrency=1, warmup=2)
+        self.assertEqual(Vote.objects.count(), 20 + 5 + 2)
+
+    def test_votes_past_the_ip_limit_are_not_throttled(self):
+        # Every in-process request comes from one IP; 320 votes is past its 300/min.
+        with self.settings(VOTE_THROTTLE_RATES={"ip": "300/min"}), in_process_settings():
+            rows = run(["vote"], in_process_client, targets_from_db(), requests=320, concurrency=1, warmup=0)
+        self.assertEqual(rows[0]["errors"], 0)
+        self.assertEqual(Vote.objects.count(), 20 + 320)
+
+    def test_throttled_requests_are_reported(self):
+        # As against a --url server that still throttles.
+        with self.settings(VOTE_THROTTLE_RATES={"ip": "3/min"}):
+            rows = run(["vote"], in_process_client, targets_from_db(), requests=5, concurrency=1, warmup=0)
+        self.assertEqual((rows[0]["errors"], rows[0]["throttled"]), (2, 2))
+
+    def test_needs_polls_to_target(self):
+        with self.assertRaises(ValueError):
+            run(["poll_list"], in_process_client, [], requests=1, concurrency=1)
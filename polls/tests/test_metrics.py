@@ -0,0 +1,73 @@
+# polls/tests/test_metrics.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from polls.models import Poll, Option
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Best language?")
+        self.option = Option.objects.create(poll=self.poll, text="Python")
+
+    def test_requests_are_timed_per_view(self):
+        labels = {"view": "poll-detail", "method": "GET", "status": "2xx"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        self.client.get(reverse("poll-detail", args=[self.poll.id]))
+        self.client.get(reverse("poll-detail", args=[self.poll.id]))
+
+        self.assertEqual(sample("http_request_duration_seconds_count", **labels), before + 2)
+
+    def test_queries_are_counted_per_request(self):
+        labels = {"view": "vote-list", "method": "POST", "status": "2xx"}
+        before = sample("http_request_db_queries_sum", **labels)
+
+        self.client.post(reverse("vote-list"), {"option": self.option.id})
+
+        self.assertGreater(sample("http_request_db_queries_sum", **labels), before)
+        self.assertGreater(sample("http_request_db_duration_seconds_count", **labels), 0)
+
+    def test_unknown_urls_share_one_label(self):
+        labels = {"view": "<unmatched>", "method": "GET", "status": "4xx"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        self.client.get("/no/such/page/1/")
+        self.client.get("/no/such/page/2/")
+
+        self.assertEqual(sample("http_request_duration_seconds_count", **labels), before + 2)
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_endpoint_serves_prometheus_text(self):
+        self.client.get(reverse("poll-list"))
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{le="0.005",method="GET",status="2xx",view="poll-list"}', body)
+        self.assertIn("# TYPE http_request_db_queries histogram", body)
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_endpoint_needs_the_token_or_staff(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer sécret").status_code, 403)
+
+        user = get_user_model().objects.create_user(username="member", password="password")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    def test_no_token_configured_lets_no_one_in_by_token(self):
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer ").status_code, 403)
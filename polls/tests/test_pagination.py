@@ -0,0 +1,91 @@
+# polls/tests/test_pagination.py
+import base64
+from urllib.parse import urlencode
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option, Vote
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.option = Option.objects.create(poll=self.poll, text="Python")
+        Vote.objects.bulk_create(
+            Vote(poll=self.poll, option=self.option, session_key=f"session-{i}") for i in range(45)
+        )
+
+    def collect(self, url):
+        seen, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+            pages += 1
+        return seen, pages
+
+    def test_votes_page_through_whole_table_newest_first(self):
+        ids, pages = self.collect(reverse("vote-list"))
+        expected = list(
+            Vote.objects.order_by("-voted_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_page_size_query_param_is_capped(self):
+        Vote.objects.bulk_create(
+            Vote(poll=self.poll, option=self.option, session_key=f"more-{i}") for i in range(80)
+        )
+        response = self.client.get(reverse("vote-list"), {"page_size": 1000})
+        self.assertEqual(len(response.data["results"]), 100)
+
+        response = self.client.get(reverse("vote-list"), {"page_size": 10})
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_deep_pages_do_not_use_offset(self):
+        response = self.client.get(reverse("vote-list"), {"page_size": 5})
+        for _ in range(5):
+            next_url = response.data["next"]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(next_url)
+        self.assertFalse(any("OFFSET" in q["sql"] for q in ctx.captured_queries))
+
+    def test_polls_and_options_are_paginated(self):
+        Poll.objects.bulk_create(Poll(question=f"Q{i}?") for i in range(30))
+        ids, pages = self.collect(reverse("poll-list"))
+        self.assertEqual(len(ids), 31)
+        self.assertEqual(pages, 2)
+
+        response = self.client.get(reverse("option-list"))
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.option.id])
+        self.assertIsNone(response.data["next"])
+
+    def test_rows_tied_on_the_timestamp_are_neither_skipped_nor_repeated(self):
+        Vote.objects.update(voted_at=self.poll.pub_date)
+        url = reverse("vote-list") + "?page_size=7"
+        with CaptureQueriesContext(connection) as ctx:
+            ids, pages = self.collect(url)
+
+        self.assertEqual(ids, sorted(Vote.objects.values_list("id", flat=True), reverse=True))
+        self.assertEqual(pages, 7)
+        self.assertFalse(any("OFFSET" in q["sql"] for q in ctx.captured_queries))
+
+    def test_previous_link_returns_the_page_before(self):
+        first = self.client.get(reverse("vote-list"), {"page_size": 10}).data
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+
+        self.assertEqual(
+            [row["id"] for row in back["results"]], [row["id"] for row in first["results"]]
+        )
+        self.assertIsNone(back["previous"])
+
+    def test_malformed_cursor_is_a_404(self):
+        for position in ("not json", '["x"]', '["not a date", "1"]'):
+            cursor = base64.b64encode(urlencode({"p": position}).encode()).decode()
+            response = self.client.get(reverse("vote-list"), {"cursor": cursor})
+            self.assertEqual(response.status_code, 404)
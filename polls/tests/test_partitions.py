@@ -0,0 +1,123 @@
+# polls/tests/test_partitions.py
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from polls import partitions
+from polls.models import Poll, Option, Vote
+
+
+class PartitionHelperTests(TestCase):
+    def test_month_arithmetic(self):
+        self.assertEqual(partitions.month_start(date(2026, 10, 18)), date(2026, 10, 1))
+        self.assertEqual(partitions.add_months(date(2026, 11, 1), 2), date(2027, 1, 1))
+        self.assertEqual(partitions.add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+
+    def test_partition_names_and_bounds(self):
+        self.assertEqual(partitions.partition_name(date(2027, 1, 1)), "polls_vote_y2027m01")
+        self.assertIn(
+            "FOR VALUES FROM ('2027-01-01 00:00:00+00') TO ('2027-02-01 00:00:00+00')",
+            partitions.create_partition_statement(date(2027, 1, 1)),
+        )
+        self.assertEqual(partitions._parse_bound("'2026-11-01 00:00:00+00'"), date(2026, 11, 1))
+        self.assertIsNone(partitions._parse_bound("MINVALUE"))
+
+    def test_conversion_attaches_the_old_table_and_moves_uniqueness_to_claims(self):
+        sql = "\n".join(partitions.convert_statements(date(2026, 11, 1)))
+        self.assertIn("PARTITION BY RANGE (voted_at)", sql)
+        self.assertIn("PRIMARY KEY (id, voted_at)", sql)
+        self.assertIn(
+            "ATTACH PARTITION polls_vote_legacy FOR VALUES FROM (MINVALUE) "
+            "TO ('2026-11-01 00:00:00+00')",
+            sql,
+        )
+        self.assertIn("PRIMARY KEY (poll_id, session_key)", sql)
+        self.assertIn("AFTER INSERT OR DELETE OR UPDATE OF poll_id, session_key", sql)
+        self.assertNotIn("INSERT INTO polls_vote (", sql)  # no data copy
+
+    def test_rows_in_default_are_moved_before_the_month_is_attached(self):
+        sql = "\n".join(partitions.move_into_partition_statements(date(2027, 1, 1)))
+        self.assertIn("DELETE FROM polls_vote_default WHERE voted_at >= '2027-01-01 00:00:00+00'", sql)
+        self.assertIn("INSERT INTO polls_vote_y2027m01 SELECT * FROM moved", sql)
+        self.assertIn("ON CONFLICT DO NOTHING", sql)
+        self.assertIn(
+            "ATTACH PARTITION polls_vote_y2027m01 FOR VALUES FROM ('2027-01-01 00:00:00+00') "
+            "TO ('2027-02-01 00:00:00+00')",
+            sql,
+        )
+
+    def test_sqlite_keeps_the_single_table(self):
+        self.assertFalse(partitions.is_partitioned())
+        self.assertEqual(partitions.ensure_partitions(), [])
+        self.assertEqual(partitions.detach_partitions(date(2030, 1, 1)), [])
+        constraints = connection.introspection.get_constraints(connection.cursor(), Vote._meta.db_table)
+        self.assertIn("unique_vote_per_session", constraints)
+
+    @override_settings(VOTE_PARTITIONING=True)
+    def test_command_refuses_other_backends(self):
+        with self.assertRaisesMessage(CommandError, "needs PostgreSQL"):
+            call_command("vote_partitions", "ensure")
+
+
+@skipUnless(connection.vendor == "postgresql", "partitioning needs PostgreSQL")
+class PostgreSQLPartitioningTests(TestCase):
+    """Against a real partitioned table; the DDL rolls back with each test."""
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            # Deferred FK checks would leave trigger events pending on the
+            # tables the DDL below alters.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        partitions.convert(months_ahead=1)
+        self.this_month = partitions.month_start(timezone.now().date())
+        poll = Poll.objects.create(question="Partitioned?")
+        self.option = Option.objects.create(poll=poll, text="Yes")
+
+    def vote(self, session_key, voted_at=None):
+        return Vote.objects.create(
+            option=self.option, session_key=session_key, voted_at=voted_at or timezone.now()
+        )
+
+    def assertDuplicateRefused(self, session_key):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.vote(session_key)
+
+    def partition_of(self, vote):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM polls_vote WHERE id = %s", [vote.pk])
+            return cursor.fetchone()[0]
+
+    def test_convert_insert_ensure_and_detach(self):
+        self.assertTrue(partitions.is_partitioned())
+        current = self.vote("current")
+        self.assertNotEqual(self.partition_of(current), "polls_vote_default")
+
+        # Beyond the partitions created so far: DEFAULT takes it.
+        far = partitions.add_months(self.this_month, 4)
+        early = self.vote("early", datetime(far.year, far.month, 15, tzinfo=dt_timezone.utc))
+        self.assertEqual(self.partition_of(early), "polls_vote_default")
+        self.assertDuplicateRefused("current")
+        self.assertDuplicateRefused("early")
+
+        # ensure moves that row into its new month, keeping its claim.
+        self.assertIn(partitions.partition_name(far), partitions.ensure_partitions(months_ahead=4))
+        self.assertEqual(self.partition_of(early), partitions.partition_name(far))
+        self.assertDuplicateRefused("early")
+
+        # Detaching drops the vote but not the claim.
+        detached = partitions.detach_partitions(partitions.add_months(self.this_month, 1), drop=True)
+        self.assertTrue(detached)
+        self.assertFalse(Vote.objects.filter(pk=current.pk).exists())
+        self.assertDuplicateRefused("current")
+
+    def test_claims_of_truncated_polls_are_pruned(self):
+        self.vote("voter")
+        with connection.cursor() as cursor:
+            # What flush does: no row triggers fire.
+            cursor.execute("TRUNCATE polls_poll CASCADE")
+        self.assertEqual(partitions.prune_claims(), 1)
+        self.assertEqual(partitions.prune_claims(), 0)
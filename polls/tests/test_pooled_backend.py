@@ -0,0 +1,76 @@
+# polls/tests/test_pooled_backend.py
+from unittest import skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from django.db.utils import load_backend
+from django.test import SimpleTestCase
+
+
+class PooledPostgresBackendTests(SimpleTestCase):
+    """Pool configuration only: no PostgreSQL server is contacted."""
+
+    def wrapper(self, alias, **overrides):
+        settings_dict = {
+            "ENGINE": "online_poll_system.pooled_postgresql",
+            "NAME": "poll_db",
+            "USER": "poll_user",
+            "HOST": "localhost",
+            "CONN_MAX_AGE": 0,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {"pool": {"min_size": 1, "max_size": 3, "timeout": 2.5}},
+            **overrides,
+        }
+        settings_dict = connections.configure_settings({"default": settings_dict})["default"]
+        backend = load_backend(settings_dict["ENGINE"])
+        wrapper = backend.DatabaseWrapper(settings_dict, alias=alias)
+        self.addCleanup(wrapper.close_pool)
+        return wrapper
+
+    def test_pool_takes_its_size_and_timeout_from_options(self):
+        pool = self.wrapper("pool_sizes").pool
+
+        self.assertEqual((pool.min_size, pool.max_size, pool.timeout), (1, 3, 2.5))
+        self.assertIsNotNone(pool._check)
+        self.assertTrue(pool.closed)  # opened on first checkout, not at import
+
+    def test_pool_is_shared_per_alias(self):
+        self.assertIs(self.wrapper("pool_shared").pool, self.wrapper("pool_shared").pool)
+
+    def test_pool_option_is_not_a_connection_parameter(self):
+        params = self.wrapper("pool_params").get_connection_params()
+        self.assertNotIn("pool", params)
+        self.assertEqual(params["dbname"], "poll_db")
+
+    def test_persistent_connections_are_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.wrapper("pool_persistent", CONN_MAX_AGE=60).pool
+
+
+@skipUnless(connection.vendor == "postgresql", "needs a PostgreSQL server")
+class PooledPostgresCheckoutTests(SimpleTestCase):
+    """Against the test database's server, through a one-connection pool."""
+
+    def test_connection_goes_back_to_the_pool_and_is_reused(self):
+        settings_dict = {
+            **connection.settings_dict,
+            "ENGINE": "online_poll_system.pooled_postgresql",
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {"pool": {"min_size": 1, "max_size": 1, "timeout": 5}},
+        }
+        wrapper = load_backend(settings_dict["ENGINE"]).DatabaseWrapper(settings_dict, alias="pool_checkout")
+        self.addCleanup(wrapper.close_pool)
+
+        def backend_pid():
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT pg_backend_pid()")
+                return cursor.fetchone()[0]
+
+        first = backend_pid()
+        self.assertEqual(wrapper.pool.get_stats()["pool_available"], 0)
+        wrapper.close()  # what request_finished does with CONN_MAX_AGE = 0
+        self.assertIsNone(wrapper.connection)
+        self.assertEqual(wrapper.pool.get_stats()["pool_available"], 1)
+
+        self.assertEqual(backend_pid(), first)
+        wrapper.close()
@@ -0,0 +1,62 @@
+# polls/tests/test_query_budget.py
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option
+
+
+class PollQueryBudgetTests(APITestCase):
+    """
+    Read endpoints must cost a fixed number of queries however many polls
+    and options there are. A failure here usually means a serializer field
+    started touching a relation that the viewset queryset does not prefetch.
+    """
+
+    OPTIONS_PER_POLL = 4
+
+    def seed(self, poll_count):
+        polls = Poll.objects.bulk_create(
+            Poll(question=f"Question {i}?") for i in range(poll_count)
+        )
+        Option.objects.bulk_create(
+            Option(poll=poll, text=f"Option {j}")
+            for poll in polls
+            for j in range(self.OPTIONS_PER_POLL)
+        )
+        return polls
+
+    def assertPollListQueries(self, poll_count):
+        """Walk every page at the largest page size; each one must cost the same."""
+        self.seed(poll_count)
+        url, seen = reverse("poll-list") + "?page_size=100", 0
+        while url:
+            # 1 for polls + 1 for the prefetched options
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += len(response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(seen, poll_count)
+
+    def test_list_1_poll(self):
+        self.assertPollListQueries(1)
+
+    def test_list_100_polls(self):
+        self.assertPollListQueries(100)
+
+    def test_list_1000_polls(self):
+        self.assertPollListQueries(1000)
+
+    def test_detail(self):
+        poll = self.seed(1)[0]
+        # ETag version, poll, options
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("poll-detail", args=[poll.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["options"]), self.OPTIONS_PER_POLL)
+
+    def test_option_list(self):
+        self.seed(100)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("option-list"))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,98 @@
+# polls/tests/test_querylog.py
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from online_poll_system.querylog import detect_n_plus_one, query_shape
+from polls.models import Poll, Option, Vote
+
+User = get_user_model()
+
+
+class NPlusOneTests(APITestCase):
+    """
+    The hot read endpoints, with enough polls, options and votes on the
+    page that a per-row query would show up as a repeated shape.
+    """
+
+    def setUp(self):
+        cache.clear()
+        for i in range(6):
+            poll = Poll.objects.create(question=f"Question {i}?")
+            options = Option.objects.bulk_create(
+                Option(poll=poll, text=f"Option {j}") for j in range(3)
+            )
+            Vote.objects.bulk_create(
+                Vote(poll=poll, option=option, session_key=f"s-{poll.id}-{option.id}")
+                for option in options
+            )
+        self.poll = Poll.objects.first()
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", password="password", is_staff=True
+        )
+
+    def test_hot_endpoints_have_no_repeated_queries(self):
+        urls = [
+            reverse("poll-list"),
+            reverse("poll-detail", args=[self.poll.id]),
+            reverse("poll-results", args=[self.poll.id]),
+            reverse("option-list"),
+        ]
+        for url in urls:
+            with self.subTest(url=url), detect_n_plus_one():
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.client.force_authenticate(self.admin)
+        with detect_n_plus_one():
+            self.assertEqual(self.client.get(reverse("vote-list")).status_code, 200)
+
+    def test_detector_trips_on_a_per_row_query(self):
+        with self.assertRaisesMessage(AssertionError, "6x from polls/tests/test_querylog.py"):
+            with detect_n_plus_one():
+                for poll in Poll.objects.all():
+                    poll.options.count()
+
+    def test_in_lists_of_any_length_share_a_shape(self):
+        self.assertEqual(
+            query_shape('SELECT 1 FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            query_shape('SELECT 1 FROM "t" WHERE "id" IN (%s)'),
+        )
+
+
+class SQLCaptureMiddlewareTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Best language?")
+        Option.objects.create(poll=self.poll, text="Python")
+        self.url = reverse("poll-detail", args=[self.poll.id])
+
+    def test_staff_get_a_query_summary_on_request(self):
+        staff = User.objects.create_user(
+            username="admin", email="admin@example.com", password="password", is_staff=True
+        )
+        self.client.force_authenticate(staff)
+
+        response = self.client.get(self.url, HTTP_X_DEBUG_SQL="1")
+
+        self.assertEqual(response["X-SQL-Queries"], "3")
+        self.assertEqual(response["X-SQL-Repeated"], "0")
+        self.assertIn("X-SQL-Time-Ms", response)
+
+    def test_header_is_ignored_for_everyone_else(self):
+        response = self.client.get(self.url, HTTP_X_DEBUG_SQL="1")
+        self.assertNotIn("X-SQL-Queries", response)
+
+    @override_settings(SQL_CAPTURE_ENABLED=True, SQL_SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged_as_json(self):
+        with self.assertLogs("online_poll_system.sql", "WARNING") as logs:
+            self.client.get(self.url)
+
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["event"], "slow_query")
+        self.assertEqual(entry["path"], self.url)
+        self.assertIn("polls_poll", entry["sql"])
+        self.assertIn("ms", entry)
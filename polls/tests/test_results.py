@@ -0,0 +1,94 @@
+# polls/tests/test_results.py
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option, Vote
+from polls.results import get_poll_version
+
+User = get_user_model()
+
+
+class PollResultsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.rust = Option.objects.create(poll=self.poll, text="Rust")
+        for i, option in enumerate([self.python, self.python, self.python, self.go]):
+            Vote.objects.create(option=option, session_key=f"seed-{i}")
+        call_command("rebuild_vote_counters", stdout=StringIO())
+        self.url = reverse("poll-results", args=[self.poll.id])
+
+    def vote(self, option):
+        self.client.cookies.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse("vote-list"), {"option": option.id}, format="json")
+
+    def test_results_tally_votes_with_percentages(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            "poll": self.poll.id,
+            "question": "Best language?",
+            "total_votes": 4,
+            "options": [
+                {"id": self.python.id, "text": "Python", "votes": 3, "percentage": 75.0},
+                {"id": self.go.id, "text": "Go", "votes": 1, "percentage": 25.0},
+                {"id": self.rust.id, "text": "Rust", "votes": 0, "percentage": 0.0},
+            ],
+        })
+
+    def test_miss_costs_three_queries_and_hit_costs_one(self):
+        # version, snapshot lookup (none: the poll is open), then the GROUP BY tally
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["total_votes"], 4)
+
+    def test_vote_bumps_version_and_refreshes_results(self):
+        self.client.get(self.url)
+        version = get_poll_version(self.poll.id)
+
+        self.assertEqual(self.vote(self.rust).status_code, 201)
+
+        self.assertGreater(get_poll_version(self.poll.id), version)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["total_votes"], 5)
+        self.assertEqual(response.data["options"][2]["votes"], 1)
+
+    def test_deleted_vote_refreshes_results(self):
+        self.client.get(self.url)
+        vote = Vote.objects.filter(option=self.go).get()
+        self.client.force_authenticate(User.objects.create_user(
+            username="admin", email="admin@example.com", password="password"
+        ))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("vote-detail", args=[vote.id]))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["total_votes"], 3)
+        self.assertEqual(response.data["options"][0]["percentage"], 100.0)
+
+    def test_version_does_not_depend_on_the_cache(self):
+        # Another web process, with a cache of its own, must see the bump too.
+        version = get_poll_version(self.poll.id)
+        self.assertEqual(self.vote(self.rust).status_code, 201)
+        cache.clear()
+        self.assertGreater(get_poll_version(self.poll.id), version)
+
+    def test_poll_without_options(self):
+        poll = Poll.objects.create(question="Empty?")
+        response = self.client.get(reverse("poll-results", args=[poll.id]))
+        self.assertEqual(response.data["options"], [])
+        self.assertEqual(response.data["total_votes"], 0)
+
+    def test_unknown_poll_is_404(self):
+        response = self.client.get(reverse("poll-results", args=[self.poll.id + 100]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,122 @@
+# polls/tests/test_routers.py
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls import routers
+from polls.conditional import poll_etag
+from polls.models import Poll, Option
+from polls.routers import REPLICA, PrimaryReplicaRouter
+
+
+# A second SQLite file stands in for the replica. It is registered at
+# import so that the test runner creates its test database, and drops it
+# afterwards; only test cases that list it in ``databases`` can reach it.
+REPLICA_FILE = os.path.join(tempfile.gettempdir(), f"polls-test-replica-{os.getpid()}.sqlite3")
+connections.settings.setdefault(REPLICA, connections.configure_settings({
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": REPLICA_FILE,
+        "TEST": {"NAME": REPLICA_FILE},
+    },
+})["default"])
+
+
+@override_settings(
+    DB_REPLICA=True,
+    DATABASE_ROUTERS=["polls.routers.PrimaryReplicaRouter"],
+    DB_REPLICA_MAX_LAG_SECONDS=5,
+    VOTE_THROTTLE_RATES={},
+)
+class ReplicaRoutingTests(APITestCase):
+    """The test database is the primary; the replica holds an older copy of the same poll."""
+
+    databases = {"default", REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Fresh?")
+        self.option = Option.objects.create(poll=self.poll, text="Yes")
+        Poll.objects.using(REPLICA).create(pk=self.poll.pk, question="Stale?")
+        Option.objects.using(REPLICA).create(pk=self.option.pk, poll_id=self.poll.pk, text="Yes (stale)")
+
+    def get_poll(self):
+        return self.client.get(reverse("poll-detail", args=[self.poll.pk]))
+
+    def test_poll_and_option_reads_come_from_the_replica(self):
+        response = self.get_poll()
+        self.assertEqual(response.data["question"], "Stale?")
+        self.assertEqual(response["ETag"], poll_etag(self.poll.pk, 0))
+
+        response = self.client.get(reverse("option-detail", args=[self.option.pk]))
+        self.assertEqual(response.data["text"], "Yes (stale)")
+
+    def test_writes_go_to_the_primary(self):
+        admin = get_user_model().objects.create_user("admin", password="password", is_staff=True)
+        self.client.force_authenticate(admin)
+
+        response = self.client.post(reverse("poll-list"), {"question": "New?"}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Poll.objects.filter(question="New?").exists())
+        self.assertFalse(Poll.objects.using(REPLICA).filter(question="New?").exists())
+
+    def test_voters_read_their_own_vote_from_the_primary(self):
+        response = self.client.post(reverse("vote-list"), {"option": self.option.pk}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(routers.STICKY_COOKIE_NAME, response.cookies)
+
+        response = self.get_poll()
+        self.assertEqual(response.data["question"], "Fresh?")
+        self.assertIn("ETag", response)
+        results = self.client.get(reverse("poll-results", args=[self.poll.pk])).data
+        self.assertEqual(results["total_votes"], 1)
+
+    def test_async_vote_sticks_to_the_primary_too(self):
+        response = self.client.post(
+            reverse("async-vote-create"), {"option": self.option.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.get_poll().data["question"], "Fresh?")
+
+    def test_stickiness_ends_after_the_lag_window(self):
+        self.client.post(reverse("vote-list"), {"option": self.option.pk}, format="json")
+        now = routers.time.time()
+
+        with mock.patch("polls.routers.time.time", return_value=now + 6):
+            self.assertEqual(self.get_poll().data["question"], "Stale?")
+
+    def test_replica_results_are_not_served_to_the_voter(self):
+        url = reverse("poll-results", args=[self.poll.pk])
+        self.client.post(reverse("vote-list"), {"option": self.option.pk}, format="json")
+
+        # Another client reads and caches the tally of the lagging replica.
+        other = self.client_class()
+        stale = other.get(url)
+        self.assertEqual(stale.data["question"], "Stale?")
+        self.assertEqual(stale.data["total_votes"], 0)
+        self.assertEqual(stale["ETag"], poll_etag(self.poll.pk, 0))
+
+        fresh = self.client.get(url)
+        self.assertEqual(fresh.data["question"], "Fresh?")
+        self.assertEqual(fresh.data["total_votes"], 1)
+        self.assertEqual(fresh["ETag"], poll_etag(self.poll.pk, 1))
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_the_primary_outside_replica_reads(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Poll), "default")
+        self.assertEqual(router.db_for_write(Poll), "default")
+
+    def test_replica_reads_need_a_configured_replica(self):
+        with routers.replica_reads():
+            self.assertFalse(routers.reading_from_replica())
+            self.assertEqual(PrimaryReplicaRouter().db_for_read(Poll), "default")
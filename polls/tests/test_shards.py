@@ -0,0 +1,145 @@
+# polls/tests/test_shards.py
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls import counters, services
+from polls.management.commands.rebuild_vote_counters import Command
+from polls.models import Poll, Option, OptionCounterShard, Vote
+
+User = get_user_model()
+
+
+@override_settings(VOTE_COUNTER_SHARDS=4)
+class ShardedCounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", password="password"
+        )
+
+    def vote(self, option):
+        self.client.cookies.clear()
+        response = self.client.post(reverse("vote-list"), {"option": option.id}, format="json")
+        self.assertEqual(response.status_code, 201)
+
+    def test_votes_land_on_shards_not_columns(self):
+        self.vote(self.python)
+        self.vote(self.python)
+
+        self.python.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual(self.python.votes_count, 0)
+        self.assertEqual(self.poll.total_votes, 0)
+        shards = OptionCounterShard.objects.filter(option=self.python)
+        self.assertEqual(shards.count(), 4)
+        self.assertEqual(sum(shard.count for shard in shards), 2)
+
+    def test_reads_include_pending_shard_counts(self):
+        self.vote(self.python)
+        self.vote(self.go)
+        self.vote(self.go)
+
+        poll = self.client.get(reverse("poll-detail", args=[self.poll.id])).data
+        self.assertEqual(poll["total_votes"], 3)
+        self.assertEqual([o["votes_count"] for o in poll["options"]], [1, 2])
+
+        listed = self.client.get(reverse("poll-list")).data["results"][0]
+        self.assertEqual(listed["total_votes"], 3)
+
+        option = self.client.get(reverse("option-detail", args=[self.go.id])).data
+        self.assertEqual(option["votes_count"], 2)
+
+    def test_pending_counts_are_cached(self):
+        self.vote(self.python)
+        # Versions, then the shard sums; a hit only needs the versions.
+        with self.assertNumQueries(2):
+            counters.pending_counts([self.poll.id])
+        with self.assertNumQueries(1):
+            self.assertEqual(counters.pending_counts([self.poll.id]), {self.poll.id: {self.python.id: 1}})
+
+    def test_compaction_folds_shards_into_columns(self):
+        self.vote(self.python)
+        self.vote(self.python)
+        self.vote(self.go)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.compact_shards()
+
+        self.python.refresh_from_db()
+        self.go.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual((self.python.votes_count, self.go.votes_count), (2, 1))
+        self.assertEqual(self.poll.total_votes, 3)
+        self.assertFalse(OptionCounterShard.objects.exclude(count=0).exists())
+        # Nothing is counted twice once the pending cache is dropped.
+        poll = self.client.get(reverse("poll-detail", args=[self.poll.id])).data
+        self.assertEqual(poll["total_votes"], 3)
+
+    def test_deleted_votes_come_off_the_shards(self):
+        self.vote(self.python)
+        counters.compact_shards()
+        vote = Vote.objects.get()
+
+        self.client.force_authenticate(self.admin)
+        self.client.delete(reverse("vote-detail", args=[vote.id]))
+        counters.compact_shards()
+
+        self.python.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual((self.python.votes_count, self.poll.total_votes), (0, 0))
+
+    def test_deleting_an_option_keeps_poll_total_right(self):
+        self.vote(self.python)
+        self.vote(self.go)
+
+        self.client.force_authenticate(self.admin)
+        self.client.delete(reverse("option-detail", args=[self.python.id]))
+        counters.compact_shards()
+
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.total_votes, 1)
+
+    def test_bulk_votes_are_sharded(self):
+        self.client.force_authenticate(self.admin)
+        entries = [{"option": self.go.id, "voter": f"kiosk-{i}"} for i in range(5)]
+        self.client.post(reverse("vote-bulk"), entries, format="json")
+        counters.compact_shards()
+
+        self.go.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual((self.go.votes_count, self.poll.total_votes), (5, 5))
+
+    def test_rebuild_clears_shards(self):
+        self.vote(self.python)
+        call_command("rebuild_vote_counters", stdout=StringIO())
+
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.votes_count, 1)
+        self.assertFalse(OptionCounterShard.objects.exclude(count=0).exists())
+
+    def test_rebuild_keeps_votes_counted_after_its_recount(self):
+        self.vote(self.python)
+        release = Command._release_shards
+
+        def vote_then_release(command, held):
+            # A vote that lands between the recount and the shard reset.
+            services.cast_vote(self.python, "late-voter")
+            release(command, held)
+
+        with mock.patch.object(Command, "_release_shards", vote_then_release):
+            call_command("rebuild_vote_counters", stdout=StringIO())
+        counters.compact_shards()
+
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.votes_count, 2)
+        self.assertEqual(self.python.votes_count, Vote.objects.filter(option=self.python).count())
@@ -0,0 +1,41 @@
+# polls/tests/test_sqlite_pragmas.py
+import os
+import tempfile
+
+from django.db import connections
+from django.db.utils import load_backend
+from django.test import SimpleTestCase, override_settings
+
+
+class SQLitePragmaTests(SimpleTestCase):
+    def connect(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_dict = connections.configure_settings({
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": os.path.join(tmpdir.name, "tuned.sqlite3"),
+            },
+        })["default"]
+        wrapper = load_backend(settings_dict["ENGINE"]).DatabaseWrapper(settings_dict, alias="tuned")
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        return wrapper.connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def test_new_connections_are_tuned(self):
+        wrapper = self.connect()
+
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(wrapper, "synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 5000)
+        self.assertEqual(self.pragma(wrapper, "cache_size"), -32000)
+
+    @override_settings(SQLITE_PRAGMAS={"journal_mode": "delete", "busy_timeout": 250})
+    def test_pragmas_come_from_settings(self):
+        wrapper = self.connect()
+
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "delete")
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 250)
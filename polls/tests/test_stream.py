@@ -0,0 +1,140 @@
+# polls/tests/test_stream.py
+import asyncio
+import json
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Poll, Option
+from polls.realtime import InProcessChannel, PollHub, get_channel, get_hub
+
+
+class PollHubTests(TestCase):
+    async def test_burst_of_notifications_is_coalesced_into_one_fetch(self):
+        fetched = []
+
+        def fetch(poll_id):
+            fetched.append(poll_id)
+            return {"poll": poll_id, "fetch": len(fetched)}
+
+        channel = InProcessChannel()
+        hub = PollHub(channel, min_interval=0.05, fetch=fetch)
+        first, second = hub.subscribe(1), hub.subscribe(1)
+        other_poll = hub.subscribe(2)
+
+        for _ in range(50):
+            channel.publish(1)
+        results = await asyncio.wait_for(first.get(), timeout=1)
+
+        self.assertEqual(fetched, [1])
+        self.assertEqual(results, {"poll": 1, "fetch": 1})
+        self.assertEqual(await asyncio.wait_for(second.get(), timeout=1), results)
+        self.assertTrue(other_poll.empty())
+
+    async def test_slow_subscriber_only_keeps_latest_results(self):
+        fetched = []
+
+        def fetch(poll_id):
+            fetched.append(poll_id)
+            return {"fetch": len(fetched)}
+
+        channel = InProcessChannel()
+        hub = PollHub(channel, min_interval=0.01, fetch=fetch)
+        queue = hub.subscribe(1)
+
+        for _ in range(3):
+            channel.publish(1)
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(len(fetched), 3)
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(queue.get_nowait(), {"fetch": 3})
+
+    async def test_unsubscribed_polls_are_not_fetched(self):
+        fetched = []
+        channel = InProcessChannel()
+        hub = PollHub(channel, min_interval=0.01, fetch=fetched.append)
+        queue = hub.subscribe(1)
+        hub.unsubscribe(1, queue)
+
+        channel.publish(1)
+        await asyncio.sleep(0.05)
+        self.assertEqual(fetched, [])
+
+
+class PollStreamEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(question="Best language?")
+        Option.objects.create(poll=self.poll, text="Python")
+
+    async def test_stream_sends_current_results_on_connect(self):
+        response = await self.async_client.get(reverse("poll-stream", args=[self.poll.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = response.streaming_content
+        first = (await stream.__anext__()).decode()
+        await stream.aclose()
+
+        retry, event, data = first.strip().split("\n")
+        self.assertEqual(retry, "retry: 15000")
+        self.assertEqual(event, "event: results")
+        payload = json.loads(data[len("data: "):])
+        self.assertEqual(payload["poll"], self.poll.id)
+        self.assertEqual(payload["options"][0]["text"], "Python")
+
+    @override_settings(POLL_STREAM_MAX_SECONDS=0.2, POLL_STREAM_KEEPALIVE_SECONDS=0.05)
+    async def test_stream_of_a_disconnected_client_ends(self):
+        sent = []
+
+        async def receive():
+            if not sent:
+                return {"type": "http.request", "body": b"", "more_body": False}
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # Like uvicorn once the client has gone: accepted, never delivered.
+            sent.append(message["type"])
+
+        scope = {
+            "type": "http", "method": "GET", "path": reverse("poll-stream", args=[self.poll.id]),
+            "query_string": b"", "headers": [], "server": ("testserver", 80),
+        }
+        # As the test client does: keep the test transaction's connection open.
+        request_finished.disconnect(close_old_connections)
+        try:
+            await asyncio.wait_for(ASGIHandler()(scope, receive, send), timeout=5)
+        finally:
+            request_finished.connect(close_old_connections)
+
+        self.assertEqual(sent[-1], "http.response.body")
+        self.assertNotIn(asyncio.get_running_loop(), get_hub()._fanouts)
+
+    async def test_unknown_poll_is_404(self):
+        response = await self.async_client.get(reverse("poll-stream", args=[self.poll.id + 100]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_wsgi_falls_back_to_single_snapshot(self):
+        response = self.client.get(reverse("poll-stream", args=[self.poll.id]))
+        body = b"".join(response.streaming_content).decode()
+        self.assertTrue(body.startswith("retry: "))
+        self.assertIn("event: results", body)
+
+
+class VotePublishesUpdateTests(APITestCase):
+    def test_committed_vote_is_published_on_the_channel(self):
+        poll = Poll.objects.create(question="Best language?")
+        option = Option.objects.create(poll=poll, text="Python")
+        published = []
+        get_channel().subscribe(published.append)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("vote-list"), {"option": option.id}, format="json")
+
+        self.assertEqual(published, [poll.id])
@@ -0,0 +1,98 @@
+# polls/tests/test_throttling.py
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls import throttling
+from polls.models import Poll, Option, Vote
+
+
+@override_settings(VOTE_THROTTLE_RATES={"ip": "3/min", "voter": "2/min"})
+class VoteThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.polls = [Poll.objects.create(question=f"Question {i}?") for i in range(5)]
+        self.options = [Option.objects.create(poll=poll, text="Yes") for poll in self.polls]
+
+    def vote(self, option, ip="10.0.0.1", new_voter=True):
+        if new_voter:
+            self.client.cookies.clear()
+        return self.client.post(
+            reverse("vote-list"), {"option": option.id}, format="json", REMOTE_ADDR=ip
+        )
+
+    def test_ip_bucket_rejects_the_burst_overflow_with_429(self):
+        statuses = [self.vote(option).status_code for option in self.options[:4]]
+
+        self.assertEqual(statuses, [201, 201, 201, 429])
+        self.assertEqual(Vote.objects.count(), 3)
+
+    def test_rejection_says_when_to_retry(self):
+        for option in self.options[:3]:
+            self.vote(option)
+        response = self.vote(self.options[3])
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(int(response["Retry-After"]), range(1, 21))
+
+    def test_ips_have_separate_buckets(self):
+        for option in self.options[:3]:
+            self.vote(option, ip="10.0.0.1")
+        self.assertEqual(self.vote(self.options[3], ip="10.0.0.2").status_code, 201)
+
+    def test_voter_bucket_follows_the_session_across_ips(self):
+        # The first vote creates the session, so only its IP is charged.
+        self.assertEqual(self.vote(self.options[0], ip="10.0.0.1").status_code, 201)
+        self.assertEqual(self.vote(self.options[1], ip="10.0.0.2", new_voter=False).status_code, 201)
+        self.assertEqual(self.vote(self.options[2], ip="10.0.0.3", new_voter=False).status_code, 201)
+        self.assertEqual(self.vote(self.options[3], ip="10.0.0.4", new_voter=False).status_code, 429)
+
+    def test_throttled_votes_never_touch_the_database(self):
+        for option in self.options[:3]:
+            self.vote(option)
+        self.client.cookies.clear()
+        with self.assertNumQueries(0):
+            response = self.vote(self.options[3])
+        self.assertEqual(response.status_code, 429)
+
+    def test_tokens_refill_over_time(self):
+        with mock.patch("polls.throttling.time.time", return_value=1000.0):
+            for option in self.options[:3]:
+                self.vote(option)
+            self.assertEqual(self.vote(self.options[3]).status_code, 429)
+        # One token back every 20 seconds at 3/min.
+        with mock.patch("polls.throttling.time.time", return_value=1021.0):
+            self.assertEqual(self.vote(self.options[3]).status_code, 201)
+
+    def test_reads_are_not_throttled(self):
+        for option in self.options[:3]:
+            self.vote(option)
+        self.assertEqual(self.client.get(reverse("vote-list"), REMOTE_ADDR="10.0.0.1").status_code, 200)
+        self.assertEqual(self.client.get(reverse("poll-list"), REMOTE_ADDR="10.0.0.1").status_code, 200)
+
+    def test_async_vote_endpoint_is_throttled_too(self):
+        for option in self.options[:3]:
+            self.vote(option)
+        self.client.cookies.clear()
+        response = self.client.post(
+            reverse("async-vote-create"), {"option": self.options[3].id},
+            format="json", REMOTE_ADDR="10.0.0.1",
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+
+class RateParsingTests(TestCase):
+    def test_rates(self):
+        self.assertEqual(throttling.parse_rate("120/min"), (120, 60))
+        self.assertEqual(throttling.parse_rate("5/s"), (5, 1))
+        self.assertEqual(throttling.parse_rate("1000/day"), (1000, 86400))
+
+    @override_settings(VOTE_THROTTLE_RATES={"ip": "", "voter": None})
+    def test_empty_rates_turn_limits_off(self):
+        request = mock.Mock(META={"REMOTE_ADDR": "10.0.0.1"})
+        with self.assertNumQueries(0):
+            self.assertEqual(throttling.vote_wait(request), 0)
@@ -0,0 +1,85 @@
+# polls/tests/test_voters.py
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls import voters
+from polls.models import Poll, Option, Vote
+
+
+@override_settings(VOTER_IDENTITY="token")
+class VoterTokenTests(APITestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+        self.url = reverse("vote-list")
+
+    def test_first_vote_issues_a_signed_token_without_a_session(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"option": self.python.id}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(any(Session._meta.db_table in q["sql"] for q in ctx.captured_queries))
+        self.assertFalse(Session.objects.exists())
+        self.assertNotIn("sessionid", response.cookies)
+
+        token = response.cookies["voter"].value
+        self.assertEqual(response[voters.HEADER], token)
+        self.assertTrue(response.cookies["voter"]["httponly"])
+        self.assertEqual(Vote.objects.get().session_key, voters.read_token(token))
+
+    def test_cookie_identifies_returning_voter(self):
+        self.client.post(self.url, {"option": self.python.id}, format="json")
+        response = self.client.post(self.url, {"option": self.go.id}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"non_field_errors": ["You have already voted for this poll."]}
+        )
+        self.assertNotIn("voter", response.cookies)
+
+    def test_header_identifies_returning_voter(self):
+        token = self.client.post(self.url, {"option": self.python.id}, format="json")[voters.HEADER]
+        self.client.cookies.clear()
+
+        response = self.client.post(
+            self.url, {"option": self.go.id}, format="json", HTTP_X_VOTER_TOKEN=token
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_tampered_token_is_not_trusted(self):
+        key, token = voters.issue_token()
+        forged = token.replace(key, voters.KEY_PREFIX + "0" * 32)
+        self.assertIsNone(voters.read_token(forged))
+        self.assertIsNone(voters.read_token("not-a-token"))
+
+        self.client.cookies["voter"] = forged
+        response = self.client.post(self.url, {"option": self.python.id}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(Vote.objects.get().session_key, voters.KEY_PREFIX + "0" * 32)
+
+    def test_async_endpoint_uses_the_same_identity(self):
+        self.client.post(self.url, {"option": self.python.id}, format="json")
+        response = self.client.post(
+            reverse("async-vote-create"), {"option": self.go.id}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_voters_read_around_shared_caches(self):
+        self.client.post(self.url, {"option": self.python.id}, format="json")
+        response = self.client.get(reverse("poll-detail", args=[self.poll.id]))
+        self.assertIn("private", response["Cache-Control"])
+
+
+class SessionVoterTests(APITestCase):
+    def test_session_mode_is_the_default(self):
+        option = Option.objects.create(poll=Poll.objects.create(question="Q?"), text="A")
+        response = self.client.post(reverse("vote-list"), {"option": option.id}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("voter", response.cookies)
+        self.assertEqual(Vote.objects.get().session_key, Session.objects.get().session_key)
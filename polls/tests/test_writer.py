@@ -0,0 +1,129 @@
+# polls/tests/test_writer.py
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from polls import services, writer
+from polls.models import Poll, Option, Vote
+
+
+class VoteWriterBatchTests(APITestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.go = Option.objects.create(poll=self.poll, text="Go")
+
+    def test_batch_is_written_in_one_transaction_with_per_vote_answers(self):
+        Vote.objects.create(option=self.go, session_key="old")
+        batch = [
+            writer.PendingVote(self.python, "a"),
+            writer.PendingVote(self.go, "b"),
+            writer.PendingVote(self.go, "a"),  # same voter again in this batch
+            writer.PendingVote(self.python, "old"),  # voted before the batch
+        ]
+
+        writer.VoteWriter(batch_size=10).write(batch)
+
+        self.assertTrue(all(pending.done.is_set() for pending in batch))
+        self.assertEqual([p.vote.session_key for p in batch[:2]], ["a", "b"])
+        self.assertIsInstance(batch[2].error, services.DuplicateVote)
+        self.assertIsInstance(batch[3].error, services.DuplicateVote)
+        self.assertEqual(Vote.objects.filter(session_key__in=["a", "b"]).count(), 2)
+        self.python.refresh_from_db()
+        self.go.refresh_from_db()
+        self.assertEqual((self.python.votes_count, self.go.votes_count), (1, 1))
+
+    def test_failed_batch_fails_every_vote(self):
+        batch = [writer.PendingVote(self.python, "a"), writer.PendingVote(self.go, "b")]
+        self.python.delete()
+
+        writer.VoteWriter(batch_size=10).write(batch)
+
+        self.assertTrue(all(p.error is not None and p.vote is None for p in batch))
+        self.assertFalse(Vote.objects.exists())
+
+
+class VoteWriterThreadTests(SimpleTestCase):
+    def test_waiting_gives_up_after_the_timeout(self):
+        vote_writer = writer.VoteWriter(batch_size=10, timeout=0.05)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def stuck(batch):
+            release.wait()
+            for pending in batch:
+                pending.done.set()
+
+        with mock.patch.object(vote_writer, "write", stuck), mock.patch("polls.writer.close_old_connections"):
+            with self.assertRaises(writer.WriterTimeout):
+                vote_writer.submit(option=None, session_key="a")
+
+    def test_connection_cleanup_failure_fails_the_batch_not_the_thread(self):
+        vote_writer = writer.VoteWriter(batch_size=10, timeout=5)
+
+        def write(batch):
+            for pending in batch:
+                pending.vote = "written"
+                pending.done.set()
+
+        broken = [RuntimeError("connection is gone"), None, None]
+        with mock.patch.object(vote_writer, "write", write), \
+                mock.patch("polls.writer.close_old_connections", side_effect=broken):
+            with self.assertRaisesMessage(RuntimeError, "connection is gone"):
+                vote_writer.submit(option=None, session_key="a")
+            self.assertEqual(vote_writer.submit(option=None, session_key="b"), "written")
+
+
+@override_settings(VOTE_INGESTION_MODE="serialized")
+class SerializedVoteIngestionTests(APITransactionTestCase):
+    """The writer thread has its own connection, so data must be committed."""
+
+    def setUp(self):
+        self.poll = Poll.objects.create(question="Best language?")
+        self.python = Option.objects.create(poll=self.poll, text="Python")
+        self.url = reverse("vote-list")
+
+    def test_vote_is_written_before_the_response(self):
+        response = self.client.post(self.url, {"option": self.python.id}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Vote.objects.filter(pk=response.data["id"]).exists())
+        self.assertEqual(
+            self.client.post(self.url, {"option": self.python.id}, format="json").status_code, 400
+        )
+
+    def test_vote_the_writer_does_not_confirm_in_time_is_a_503(self):
+        with mock.patch.object(writer.VoteWriter, "submit", side_effect=writer.WriterTimeout):
+            response = self.client.post(self.url, {"option": self.python.id}, format="json")
+            self.assertEqual(response.status_code, 503)
+            response = self.client.post(
+                reverse("async-vote-create"), {"option": self.python.id}, format="json"
+            )
+            self.assertEqual(response.status_code, 503)
+
+    def test_async_vote_goes_through_the_writer(self):
+        response = self.client.post(
+            reverse("async-vote-create"), {"option": self.python.id}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Vote.objects.get().pk, response.json()["id"])
+
+    def test_concurrent_votes_all_commit(self):
+        votes = []
+
+        def vote(n):
+            votes.append(writer.get_vote_writer().submit(self.python, f"voter-{n}"))
+
+        threads = [threading.Thread(target=vote, args=(n,)) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(votes), 20)
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.votes_count, 20)
+        self.assertEqual(Vote.objects.count(), 20)
@@ -0,0 +1,140 @@
+# polls/throttling.py
+"""
+Token-bucket rate limits on casting votes, per client IP and per voter.
+
+Each bucket holds up to N tokens and refills at N per period, so a rate
+of "120/min" allows a burst of 120 votes and then two per second. A vote
+takes one token from every bucket that applies, or from none of them if
+any is empty, in which case the request is answered 429 with a
+Retry-After before any database work.
+
+With the Redis cache backend both buckets are checked and updated by one
+Lua script, atomically and in one round trip, on Redis's clock, so every
+web process shares them. Other cache backends (LocMem in development and
+tests) keep the buckets in the cache under a process-wide lock. If Redis
+is unreachable, votes are let through rather than blocked.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import BaseThrottle
+
+from . import voters
+
+KEY = "polls:throttle:vote:{scope}:{ident}"
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS: one bucket per key. ARGV: refill rate (tokens per ms) and capacity
+# for each key, in the same order. Returns 0 if a token was taken from
+# every bucket, else the milliseconds until all of them have one.
+TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        wait = math.max(wait, math.ceil((1 - tokens) / rate))
+    end
+end
+for i, key in ipairs(KEYS) do
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(tonumber(ARGV[2 * i]) / tonumber(ARGV[2 * i - 1])))
+end
+return wait
+"""
+TAKE_SCRIPT_SHA = hashlib.sha1(TAKE_SCRIPT.encode()).hexdigest()
+
+_local_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """``"120/min"`` -> ``(120, 60)``: capacity and refill period in seconds."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+def _take_redis(backend, buckets):
+    from redis.exceptions import NoScriptError, RedisError
+
+    keys = [key for key, _, _ in buckets]
+    args = []
+    for _, capacity, period in buckets:
+        args += [repr(capacity / (period * 1000)), capacity]
+    try:
+        client = backend._cache.get_client(keys[0], write=True)
+        try:
+            wait_ms = client.evalsha(TAKE_SCRIPT_SHA, len(keys), *keys, *args)
+        except NoScriptError:
+            wait_ms = client.eval(TAKE_SCRIPT, len(keys), *keys, *args)
+    except RedisError:
+        return 0.0
+    return wait_ms / 1000
+
+
+def _take_local(backend, buckets):
+    now = time.time()
+    with _local_lock:
+        stored = backend.get_many([key for key, _, _ in buckets])
+        levels, wait = {}, 0.0
+        for key, capacity, period in buckets:
+            tokens, ts = stored.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * capacity / period)
+            levels[key] = tokens
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) * period / capacity)
+        taken = 1 if wait == 0 else 0
+        backend.set_many(
+            {key: (levels[key] - taken, now) for key in levels},
+            max(period for _, _, period in buckets),
+        )
+    return wait
+
+
+def vote_wait(request):
+    """
+    Take a token from each of the vote buckets ``request`` falls in.
+    Returns 0 if the vote may go ahead, else the seconds to wait.
+    Works on Django and DRF requests alike.
+    """
+    idents = {
+        "ip": BaseThrottle().get_ident(request),
+        "voter": voters.peek_voter_key(request),
+    }
+    buckets = []
+    for scope, rate in settings.VOTE_THROTTLE_RATES.items():
+        if rate and idents.get(scope):
+            capacity, period = parse_rate(rate)
+            buckets.append((KEY.format(scope=scope, ident=idents[scope]), capacity, period))
+    if not buckets:
+        return 0.0
+    backend = caches["default"]
+    if isinstance(backend, RedisCache):
+        return _take_redis(backend, buckets)
+    return _take_local(backend, buckets)
+
+
+class VoteRateThrottle(BaseThrottle):
+    """DRF throttle for casting votes; see ``vote_wait``."""
+
+    def allow_request(self, request, view):
+        self._wait = vote_wait(request)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
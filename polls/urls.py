@@ -2,6 +2,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import PollViewSet, OptionViewSet, VoteViewSet, api_root
+from .async_views import poll_stream, poll_list, poll_detail, vote_create
 
 router = DefaultRouter()
 router.register(r"polls", PollViewSet, basename="poll")
@@ -12,6 +13,14 @@ urlpatterns = [
     # API root index
     path("", api_root, name="api-root"),
 
+    # Server-Sent Events results feed (async, served under ASGI)
+    path("polls/<int:pk>/stream/", poll_stream, name="poll-stream"),
+
+    # Native async poll reads and vote casting (see polls/async_views.py)
+    path("async/polls/", poll_list, name="async-poll-list"),
+    path("async/polls/<int:pk>/", poll_detail, name="async-poll-detail"),
+    path("async/votes/", vote_create, name="async-vote-create"),
+
     # Router-generated endpoints
     path("", include(router.urls)),
 ]
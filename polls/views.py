@@ -1,20 +1,39 @@
 # polls/views.py
-from rest_framework import viewsets, permissions, serializers
-from rest_framework.decorators import api_view, renderer_classes
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, permissions, serializers, status
+from rest_framework.decorators import action, api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import SAFE_METHODS, BasePermission
+from rest_framework.settings import api_settings
 
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
+    OpenApiParameter,
     OpenApiResponse,
     OpenApiExample,
 )
 
 from .models import Poll, Option, Vote
-from .serializers import PollSerializer, OptionSerializer, VoteSerializer, APIRootSerializer
+from .serializers import (
+    PollSerializer, OptionSerializer, VoteSerializer, APIRootSerializer, PollResultsSerializer,
+    BulkVoteItemSerializer, BulkVoteReportSerializer, DUPLICATE_VOTE_MESSAGE,
+)
+from .pagination import PollCursorPagination, OptionCursorPagination, VoteCursorPagination
+from .results import get_poll_results
+from .conditional import ConditionalRetrieveMixin
+from .cache_headers import CacheHeadersMixin
+from .throttling import VoteRateThrottle
+from .routers import ReplicaReadMixin
+from .exports import STREAMS, CSVRenderer, NDJSONRenderer, async_chunks, vote_rows
+from . import buffer, counters, routers, services, snapshots, voters, writer
 
 # -----------------------
 # API Root
@@ -41,17 +60,143 @@ def api_root(request, format=None):
         "votes": request.build_absolute_uri("/api/votes/"),
     })
 
+class PendingCountsMixin:
+    """
+    On reads, add vote counts still sitting in counter shards to the
+    instances being rendered (a no-op unless VOTE_COUNTER_SHARDS is set).
+    """
+
+    def counted_instances(self, objs):
+        """``(polls, options)`` whose counters render for ``objs``."""
+        raise NotImplementedError
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.request.method in SAFE_METHODS:
+            counters.apply_pending(*self.counted_instances(page))
+        return page
+
+    def get_object(self):
+        obj = super().get_object()
+        if self.request.method in SAFE_METHODS:
+            counters.apply_pending(*self.counted_instances([obj]))
+        return obj
+
+
 # -----------------------
 # Polls
 # -----------------------
 @extend_schema_view(
     list=extend_schema(summary="List all polls", tags=["Polls"]),
+    retrieve=extend_schema(
+        summary="Retrieve a poll",
+        tags=["Polls"],
+        description=(
+            "Send the `ETag` back as `If-None-Match` to get `304 Not Modified` "
+            "while the poll, its options and its votes are unchanged."
+        ),
+    ),
     create=extend_schema(summary="Create a new poll (auth required)", tags=["Polls"]),
 )
-class PollViewSet(viewsets.ModelViewSet):
-    queryset = Poll.objects.all().order_by('-pub_date')
+class PollViewSet(
+    ReplicaReadMixin, CacheHeadersMixin, ConditionalRetrieveMixin, PendingCountsMixin,
+    viewsets.ModelViewSet,
+):
+    # Options (and their stored vote counters) arrive in one extra query,
+    # so list and detail cost the same number of queries at any size.
+    queryset = Poll.objects.prefetch_related(
+        Prefetch('options', queryset=Option.objects.order_by('id'))
+    ).order_by('-pub_date')
     serializer_class = PollSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = PollCursorPagination
+
+    def counted_instances(self, polls):
+        return polls, [option for poll in polls for option in poll.options.all()]
+
+    def get_etag_poll_id(self):
+        try:
+            return int(self.kwargs["pk"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            poll = serializer.save()
+            snapshots.discard_if_reopened(poll)
+            services.poll_changed(poll.pk)
+
+    def perform_destroy(self, instance):
+        poll_id = instance.pk
+        instance.delete()
+        services.poll_changed(poll_id)
+
+    @extend_schema(
+        summary="Poll results",
+        tags=["Polls"],
+        description=(
+            "Per-option vote counts and percentages. Served from cache and "
+            "recomputed only after the poll receives or loses a vote.\n\n"
+            "Send the `ETag` back as `If-None-Match` to get `304 Not Modified` "
+            "while nothing has changed."
+        ),
+        responses=PollResultsSerializer,
+    )
+    @action(detail=True, methods=["get"])
+    def results(self, request, pk=None):
+        poll_id = self.get_etag_poll_id()
+        if poll_id is None:
+            raise NotFound()
+
+        def respond():
+            results = get_poll_results(poll_id, self.poll_version)
+            if results is None:
+                raise NotFound()
+            return Response(results)
+
+        return self.conditional(request, respond)
+
+    @extend_schema(
+        summary="Export a poll's votes (auth required)",
+        tags=["Polls"],
+        description=(
+            "Streams every vote of the poll, oldest first, as CSV or NDJSON "
+            "(`id`, `option`, `voted_at`). Memory use on the server is constant, "
+            "whatever the size of the poll."
+        ),
+        parameters=[OpenApiParameter("format", OpenApiTypes.STR, enum=["csv", "ndjson"])],
+        responses={
+            (200, "text/csv"): OpenApiTypes.STR,
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+            403: OpenApiResponse(description="Forbidden: authentication required"),
+        },
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="votes/export",
+        permission_classes=[permissions.IsAuthenticated],
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def export_votes(self, request, pk=None):
+        poll_id = self.get_etag_poll_id()
+        if poll_id is None or not Poll.objects.filter(pk=poll_id).exists():
+            raise NotFound()
+
+        renderer = request.accepted_renderer
+        chunk_size = settings.VOTE_EXPORT_CHUNK_SIZE
+        chunks = STREAMS[renderer.format](vote_rows(poll_id, chunk_size), chunk_size)
+        if isinstance(request._request, ASGIRequest):
+            chunks = async_chunks(chunks)
+        response = StreamingHttpResponse(
+            chunks, content_type=f"{renderer.media_type}; charset=utf-8"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="poll-{poll_id}-votes.{renderer.format}"'
+        )
+        # Also unbuffered behind an nginx without the export location.
+        response["X-Accel-Buffering"] = "no"
+        return response
 
 
 # -----------------------
@@ -59,12 +204,47 @@ class PollViewSet(viewsets.ModelViewSet):
 # -----------------------
 @extend_schema_view(
     list=extend_schema(summary="List all options", tags=["Options"]),
+    retrieve=extend_schema(
+        summary="Retrieve an option",
+        tags=["Options"],
+        description=(
+            "Send the `ETag` back as `If-None-Match` to get `304 Not Modified` "
+            "while the option's poll is unchanged."
+        ),
+    ),
     create=extend_schema(summary="Create a new option (auth required)", tags=["Options"]),
 )
-class OptionViewSet(viewsets.ModelViewSet):
+class OptionViewSet(
+    ReplicaReadMixin, ConditionalRetrieveMixin, PendingCountsMixin, viewsets.ModelViewSet
+):
     queryset = Option.objects.all()
     serializer_class = OptionSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = OptionCursorPagination
+
+    def counted_instances(self, options):
+        return (), options
+
+    def get_etag_poll_id(self):
+        try:
+            return (
+                Option.objects.filter(pk=self.kwargs["pk"])
+                .values_list("poll_id", flat=True)
+                .first()
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def perform_create(self, serializer):
+        option = serializer.save()
+        services.poll_changed(option.poll_id)
+
+    def perform_update(self, serializer):
+        option = serializer.save()
+        services.poll_changed(option.poll_id)
+
+    def perform_destroy(self, instance):
+        services.delete_option(instance)
 
 
 # -----------------------
@@ -89,16 +269,20 @@ class IsReadOnlyOrVoteAllowed(BasePermission):
     list=extend_schema(
         summary="List votes",
         tags=["Votes"],
-        description="Retrieve all votes. No authentication required."
+        description=(
+            "Retrieve votes, newest first. No authentication required.\n\n"
+            "Results are cursor-paginated: follow the `next` link to page through."
+        )
     ),
     create=extend_schema(
         summary="Cast a vote",
         tags=["Votes"],
         description=(
             "Cast a vote for a poll option.\n\n"
-            "- **No login required** — votes are tracked by session key.\n"
-            "- If no session exists, one is created automatically.\n"
-            "- Duplicate votes within the same session are blocked."
+            "- **No login required** — votes are tracked by session key, or with "
+            "`VOTER_IDENTITY=token` by a signed `voter` cookie / `X-Voter-Token` header.\n"
+            "- If the voter has neither yet, one is issued automatically.\n"
+            "- Duplicate votes from the same voter are blocked."
         ),
         examples=[
             OpenApiExample(
@@ -110,6 +294,7 @@ class IsReadOnlyOrVoteAllowed(BasePermission):
         ],
         responses={
             201: OpenApiResponse(description="Vote successfully created"),
+            202: OpenApiResponse(description="Vote queued (VOTE_INGESTION_MODE=buffered)"),
             400: OpenApiResponse(description="Invalid input or duplicate vote in this session"),
         },
     ),
@@ -143,16 +328,95 @@ class VoteViewSet(viewsets.ModelViewSet):
     queryset = Vote.objects.all()
     serializer_class = VoteSerializer
     permission_classes = [IsReadOnlyOrVoteAllowed]
+    pagination_class = VoteCursorPagination
+
+    def get_throttles(self):
+        if self.action == "create":
+            return [VoteRateThrottle()]
+        return super().get_throttles()
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        if buffer.buffering_enabled():
+            # Queued, not yet written: the row appears once the buffer is flushed.
+            response.status_code = status.HTTP_202_ACCEPTED
+        routers.stick_to_primary(response)
+        return voters.attach_token(request, response)
 
     def perform_create(self, serializer):
         option = serializer.validated_data.get('option')
-        request = self.request
 
         if not option:
             raise ValidationError("Option must be provided.")
 
-        # Ensure session exists
-        if not request.session.session_key:
-            request.session.create()
+        voter_key = voters.get_voter_key(self.request)
+
+        if buffer.buffering_enabled():
+            if not buffer.enqueue_vote(option, voter_key):
+                raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_VOTE_MESSAGE]})
+            return
+
+        try:
+            if writer.serializing_enabled():
+                serializer.instance = writer.get_vote_writer().submit(option, voter_key)
+            else:
+                serializer.instance = services.cast_vote(option, voter_key)
+        except services.DuplicateVote:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_VOTE_MESSAGE]})
+
+    def perform_update(self, serializer):
+        previous_option = serializer.instance.option
+        try:
+            with transaction.atomic():
+                vote = serializer.save()
+                services.move_vote(vote, previous_option)
+        except IntegrityError:
+            # Moved to a poll this voter has already voted on.
+            option = serializer.validated_data.get("option", previous_option)
+            if Vote.objects.filter(
+                poll_id=option.poll_id, session_key=serializer.instance.session_key
+            ).exclude(pk=serializer.instance.pk).exists():
+                raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_VOTE_MESSAGE]})
+            raise
+
+    def perform_destroy(self, instance):
+        services.delete_vote(instance)
+
+    @extend_schema(
+        summary="Submit a batch of votes (auth required)",
+        tags=["Votes"],
+        description=(
+            "Replay votes collected offline, e.g. by kiosks or partner integrations.\n\n"
+            "- Body is a JSON array of `{option, voter}` objects; `voter` takes the place "
+            "of the session key.\n"
+            "- Each entry is accepted or rejected on its own; the response lists the "
+            "outcome for every index.\n"
+            "- The usual one-vote-per-voter-per-poll rule applies, within the batch too."
+        ),
+        request=BulkVoteItemSerializer(many=True),
+        responses={
+            200: BulkVoteReportSerializer,
+            400: OpenApiResponse(description="Body is not a list, or has too many entries"),
+            403: OpenApiResponse(description="Forbidden: authentication required"),
+        },
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def bulk(self, request):
+        entries = request.data
+        if not isinstance(entries, list):
+            raise ValidationError("Expected a list of {option, voter} objects.")
+        if len(entries) > settings.VOTE_BULK_MAX_ITEMS:
+            raise ValidationError(f"At most {settings.VOTE_BULK_MAX_ITEMS} votes per request.")
 
-        serializer.save(session_key=request.session.session_key)
+        results = services.bulk_cast_votes(entries)
+        accepted = sum(1 for result in results if result["status"] == "accepted")
+        return Response({
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "results": results,
+        })
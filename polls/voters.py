@@ -0,0 +1,93 @@
+# polls/voters.py
+"""
+Anonymous voter identity.
+
+Votes are keyed on ``Vote.session_key``. In the default "session" mode
+that is the Django session key, which costs a django_session row per
+voter, written on the first vote and read back on every later request.
+In "token" mode (VOTER_IDENTITY = "token") the key is a random id that
+the client carries in a signed cookie, or in an ``X-Voter-Token`` header
+for clients without cookies, so voting touches no session storage.
+
+The signature (django.core.signing, keyed on SECRET_KEY) stops clients
+from picking someone else's id. As with a session cookie, a client that
+drops its token simply becomes a new voter.
+"""
+import uuid
+
+from django.conf import settings
+from django.core import signing
+
+HEADER = "X-Voter-Token"
+SALT = "polls.voters"
+# Distinguishes token voters from session keys in the Vote table (fits max_length=40).
+KEY_PREFIX = "v:"
+
+
+def token_mode():
+    return settings.VOTER_IDENTITY == "token"
+
+
+def issue_token():
+    """A fresh ``(voter_key, signed_token)`` pair."""
+    key = KEY_PREFIX + uuid.uuid4().hex
+    return key, signing.Signer(salt=SALT).sign(key)
+
+
+def read_token(token):
+    """The voter key inside ``token``, or None if it is not one we signed."""
+    try:
+        key = signing.Signer(salt=SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+    return key if key.startswith(KEY_PREFIX) else None
+
+
+def has_voter_credentials(request):
+    """Whether the request carries a voter token (in token mode only)."""
+    return token_mode() and bool(
+        request.headers.get(HEADER) or settings.VOTER_COOKIE_NAME in request.COOKIES
+    )
+
+
+def peek_voter_key(request):
+    """The voter key ``request`` already carries, or None. Never creates one."""
+    if not token_mode():
+        return request.session.session_key
+    token = request.headers.get(HEADER) or request.COOKIES.get(settings.VOTER_COOKIE_NAME)
+    return read_token(token) if token else None
+
+
+def get_voter_key(request):
+    """
+    The key identifying the anonymous voter behind ``request``. A voter
+    without one is given one: a new session in session mode, a new token
+    in token mode, which ``attach_token`` then sends back with the response.
+    Session mode may hit the session store; token mode does no I/O.
+    """
+    if not token_mode():
+        if not request.session.session_key:
+            request.session.create()
+        return request.session.session_key
+
+    token = request.headers.get(HEADER) or request.COOKIES.get(settings.VOTER_COOKIE_NAME)
+    key = read_token(token) if token else None
+    if key is None:
+        key, request.new_voter_token = issue_token()
+    return key
+
+
+def attach_token(request, response):
+    """Hand a token issued by ``get_voter_key`` for this request to the client."""
+    token = getattr(request, "new_voter_token", None)
+    if token:
+        response.set_cookie(
+            settings.VOTER_COOKIE_NAME,
+            token,
+            max_age=settings.VOTER_COOKIE_AGE,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite="Lax",
+        )
+        response[HEADER] = token
+    return response
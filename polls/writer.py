@@ -0,0 +1,144 @@
+# polls/writer.py
+"""
+Single-writer group commit for votes (VOTE_INGESTION_MODE = "serialized").
+
+SQLite takes one writer at a time, so concurrent vote requests that each
+open their own write transaction spend their time queueing on the write
+lock. In this mode a request hands its vote to the process's writer
+thread and waits for the answer. The writer takes every vote queued since
+its last commit, up to VOTE_WRITER_BATCH_SIZE, and inserts them in one
+transaction: a burst of N votes costs one commit instead of N, and holds
+the write lock once.
+
+Votes keep the "sync" semantics: the response is sent after the vote has
+committed, with its id, and a duplicate fails only its own savepoint and
+raises DuplicateVote in its own request. A request waits at most
+VOTE_WRITER_TIMEOUT_SECONDS for its batch, then gets a 503. Each
+web process has its own writer; between processes, SQLite's busy_timeout
+does the queueing.
+"""
+import queue
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Vote
+from . import services
+
+
+class WriterTimeout(APIException):
+    """The writer did not settle a vote in time; it may still be written."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The vote could not be confirmed in time; it may still be recorded."
+    default_code = "vote_not_confirmed"
+
+
+class PendingVote:
+    """A vote waiting for the writer; ``done`` is set once it is settled."""
+
+    __slots__ = ("option", "session_key", "done", "vote", "error")
+
+    def __init__(self, option, session_key):
+        self.option = option
+        self.session_key = session_key
+        self.done = threading.Event()
+        self.vote = None
+        self.error = None
+
+
+class VoteWriter:
+    def __init__(self, batch_size, timeout=None):
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, option, session_key):
+        """
+        Queue a vote and wait until its batch has committed. Returns the
+        Vote, or raises DuplicateVote like ``services.cast_vote``, or
+        WriterTimeout after ``timeout`` seconds.
+        """
+        pending = PendingVote(option, session_key)
+        self._ensure_running()
+        self._queue.put(pending)
+        if not pending.done.wait(self.timeout):
+            raise WriterTimeout()
+        if pending.error is not None:
+            raise pending.error
+        return pending.vote
+
+    def _ensure_running(self):
+        # Started on first use, so gunicorn workers each get their own
+        # thread after the fork.
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="vote-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                # Connection handling as for a request (request_started and
+                # request_finished): drop a broken or expired connection.
+                close_old_connections()
+                self.write(batch)
+                close_old_connections()
+            except Exception as exc:
+                # Keep the thread alive and leave no request waiting.
+                for pending in batch:
+                    if not pending.done.is_set():
+                        pending.vote, pending.error = None, exc
+                        pending.done.set()
+
+    def write(self, batch):
+        """Insert and count ``batch`` in one transaction, then settle each vote."""
+        try:
+            with transaction.atomic():
+                for pending in batch:
+                    try:
+                        with transaction.atomic():
+                            pending.vote = Vote.objects.create(
+                                option=pending.option, session_key=pending.session_key
+                            )
+                    except IntegrityError as exc:
+                        pending.error = exc
+                        if Vote.objects.filter(
+                            poll_id=pending.option.poll_id, session_key=pending.session_key
+                        ).exists():
+                            pending.error = services.DuplicateVote()
+                services.record_votes(
+                    (pending.vote.option_id, pending.vote.poll_id)
+                    for pending in batch if pending.vote is not None
+                )
+        except Exception as exc:
+            for pending in batch:
+                pending.vote, pending.error = None, exc
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+
+@lru_cache(maxsize=None)
+def _writer_for(batch_size, timeout):
+    return VoteWriter(batch_size, timeout)
+
+
+def get_vote_writer():
+    return _writer_for(settings.VOTE_WRITER_BATCH_SIZE, settings.VOTE_WRITER_TIMEOUT_SECONDS)
+
+
+def serializing_enabled():
+    return settings.VOTE_INGESTION_MODE == "serialized"